@@ -14,13 +14,14 @@ echo "🔄 Starting backup process..."
 echo "📊 Backing up PostgreSQL database..."
 sudo -u postgres pg_dump speechtotext_db | gzip > $BACKUP_DIR/db_backup_$DATE.sql.gz
 
-# Backup media files
+# Backup media files (hot tier only; originals are Opus-compressed after
+# transcription and cold-tier audio lives outside media/, see AUDIO_COLD_STORAGE_ROOT)
 echo "📁 Backing up media files..."
 tar -czf $BACKUP_DIR/media_backup_$DATE.tar.gz -C $APP_DIR media/
 
-# Backup application files (excluding venv and cache)
+# Backup application files (excluding venv, cache and media, which is backed up above)
 echo "💾 Backing up application files..."
-tar --exclude='venv' --exclude='__pycache__' --exclude='*.pyc' \
+tar --exclude='venv' --exclude='__pycache__' --exclude='*.pyc' --exclude='speechtotext/media' \
     -czf $BACKUP_DIR/app_backup_$DATE.tar.gz -C /var/www speechtotext/
 
 # Remove old backups (keep last 7 days)
@@ -15,6 +15,7 @@ apt update && apt upgrade -y
 echo "📦 Installing system dependencies..."
 apt install -y python3 python3-pip python3-venv python3-dev \
     postgresql postgresql-contrib \
+    redis-server \
     nginx \
     ffmpeg \
     libasound2-dev portaudio19-dev libportaudio2 libportaudiocpp0 \
@@ -77,7 +78,9 @@ chmod +x gunicorn_start
 echo "📁 Creating media and static directories..."
 mkdir -p /var/www/speechtotext/media
 mkdir -p /var/www/speechtotext/static
+mkdir -p /var/lib/speechtotext/cold_media
 chown -R www-data:www-data /var/www/speechtotext/media
+chown -R www-data:www-data /var/lib/speechtotext/cold_media
 chown -R www-data:www-data /var/www/speechtotext/static
 
 # Run Django migrations
@@ -90,9 +93,11 @@ python manage.py migrate
 echo "⚙️ Setting up systemd services..."
 cp speechtotext.socket /etc/systemd/system/
 cp speechtotext.service /etc/systemd/system/
+cp speechtotext-worker.service /etc/systemd/system/
 systemctl daemon-reload
 systemctl enable speechtotext.socket
 systemctl enable speechtotext.service
+systemctl enable speechtotext-worker.service
 
 # Set up Nginx
 echo "🌐 Setting up Nginx..."
@@ -107,6 +112,7 @@ nginx -t
 echo "🚀 Starting services..."
 systemctl start speechtotext.socket
 systemctl start speechtotext.service
+systemctl start speechtotext-worker.service
 systemctl restart nginx
 
 # Enable firewall
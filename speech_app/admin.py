@@ -1,29 +1,80 @@
 from django.contrib import admin
-from .models import AudioUpload
+from django.db.models import Sum
+from .models import AudioUpload, DailyUsage
 
 @admin.register(AudioUpload)
 class AudioUploadAdmin(admin.ModelAdmin):
-    list_display = ['title', 'language', 'status', 'get_file_size_mb', 'created_at']
-    list_filter = ['status', 'language', 'created_at']
+    list_display = ['title', 'language', 'status', 'quality_level', 'word_count', 'get_file_size_mb', 'created_at']
+    list_filter = ['status', 'language', 'quality_level', 'storage_tier', 'created_at']
     search_fields = ['title', 'transcription']
-    readonly_fields = ['created_at', 'updated_at', 'file_size']
+    readonly_fields = ['created_at', 'updated_at', 'file_size', 'stored_size', 'storage_tier', 'audio_compressed', 'speaker_count', 'detected_language', 'language_confidence', 'content_hash', 'heartbeat_at', 'attempts']
     
     fieldsets = (
         ('Genel Bilgiler', {
-            'fields': ('title', 'language', 'status')
+            'fields': ('title', 'language', 'detected_language', 'language_confidence', 'status')
         }),
         ('Dosya Bilgileri', {
-            'fields': ('audio_file', 'file_size', 'duration')
+            'fields': ('audio_file', 'file_size', 'duration', 'storage_tier', 'stored_size', 'audio_compressed',
+                       'content_hash')
         }),
         ('Transkripsiyon', {
-            'fields': ('transcription',)
+            'fields': ('transcription', 'speaker_count')
         }),
         ('Zaman Bilgileri', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('created_at', 'updated_at', 'heartbeat_at', 'attempts'),
             'classes': ('collapse',)
         }),
     )
     
+    def get_queryset(self, request):
+        # Dalga formu blob'u ve bölümler admin ekranlarında gösterilmez
+        return super().get_queryset(request).defer('waveform_peaks', 'segments')
+    
     def get_file_size_mb(self, obj):
         return f"{obj.get_file_size_mb()} MB" if obj.get_file_size_mb() else "Bilinmiyor"
     get_file_size_mb.short_description = "Dosya Boyutu"
+
+
+@admin.register(DailyUsage)
+class DailyUsageAdmin(admin.ModelAdmin):
+    """Günlük kullanım toplamları; özet yalnızca bu tablodan hesaplanır"""
+    list_display = ['date', 'user', 'uploads', 'jobs_completed', 'jobs_failed', 'get_audio_minutes',
+                    'chunks', 'engine_calls', 'get_cpu_minutes']
+    list_filter = ['date']
+    date_hierarchy = 'date'
+    search_fields = ['user__username']
+    list_select_related = ['user']
+    # Toplamlar worker ve yükleme akışında tutulur; elle değiştirilmez
+    readonly_fields = ['user', 'date', 'uploads', 'jobs_completed', 'jobs_failed', 'audio_seconds',
+                       'reserved_audio_seconds', 'chunks', 'engine_calls', 'cpu_seconds']
+    
+    # Özet tablosunda gösterilen en çok kullanan kullanıcı sayısı
+    SUMMARY_USERS = 20
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context=extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None:
+            # Filtrelenmiş gün aralığı için kullanıcı başına toplamlar
+            response.context_data['usage_summary'] = (
+                changelist.queryset.order_by()
+                .values('user__username')
+                .annotate(
+                    uploads=Sum('uploads'), jobs=Sum('jobs_completed'), failed=Sum('jobs_failed'),
+                    audio_seconds=Sum('audio_seconds'), chunks=Sum('chunks'),
+                    engine_calls=Sum('engine_calls'), cpu_seconds=Sum('cpu_seconds'),
+                )
+                .order_by('-audio_seconds')[:self.SUMMARY_USERS]
+            )
+        return response
+    
+    def get_audio_minutes(self, obj):
+        return obj.get_audio_minutes()
+    get_audio_minutes.short_description = "Ses (dk)"
+    
+    def get_cpu_minutes(self, obj):
+        return round(obj.cpu_seconds / 60, 1)
+    get_cpu_minutes.short_description = "CPU (dk)"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpeechAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'speech_app'
+
+    def ready(self):
+        from . import checks  # noqa: F401
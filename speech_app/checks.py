@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.checks import Warning, register
+
+# Web süreçlerinde yüklenmemesi gereken ses işleme kütüphaneleri
+DSP_MODULES = (
+    'numpy', 'scipy', 'librosa', 'numba', 'noisereduce',
+    'soundfile', 'soxr', 'speech_recognition', 'pocketsphinx', 'pydub',
+)
+
+# Temiz bir yorumlayıcıda web katmanını (URLconf, view'lar, admin) yükler
+WEB_IMPORT_PROBE = """
+import json, sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps(sorted(m for m in {modules!r} if m in sys.modules)))
+"""
+
+
+@register('performance', deploy=True)
+def check_web_tier_imports(app_configs, **kwargs):
+    """
+    Web katmanının ses işleme kütüphanelerini yüklemediğini doğrular.
+    Ayrı bir süreçte çalışır; mevcut süreçte önceden yüklenmiş modüller sonucu etkilemez.
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'speechtotext_project.settings')
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', WEB_IMPORT_PROBE.format(modules=DSP_MODULES)],
+            env=env, capture_output=True, text=True, timeout=60, check=True
+        )
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    except (subprocess.SubprocessError, ValueError, IndexError) as e:
+        return [Warning(
+            f'Web katmanı import denetimi çalıştırılamadı: {e}',
+            id='speech_app.W002',
+        )]
+
+    if loaded:
+        return [Warning(
+            f'Web katmanı ses işleme kütüphanelerini yüklüyor: {", ".join(loaded)}',
+            hint="Bu kütüphaneleri yalnızca speech_app.pipeline içinden ve worker'da import edin.",
+            id='speech_app.W001',
+        )]
+    return []
+
+
+# Yalnızca ayarları okur; 'database' etiketi --tag database verilmeden çalışmadığından
+# W001 gibi 'performance' etiketiyle kaydedilir
+@register('performance', deploy=True)
+def check_database_connection_reuse(app_configs, **kwargs):
+    """PostgreSQL'de her istek/kayıt için yeni bağlantı açılmadığını doğrular"""
+    from django.conf import settings
+
+    warnings = []
+    for alias, database in settings.DATABASES.items():
+        if 'postgresql' not in database.get('ENGINE', ''):
+            continue
+        if not database.get('CONN_MAX_AGE') and not database.get('OPTIONS', {}).get('pool'):
+            warnings.append(Warning(
+                f"'{alias}' veritabanı her istekte yeni bağlantı açıyor",
+                hint='DB_POOL=True (psycopg 3 havuzu) ya da DB_CONN_MAX_AGE > 0 ayarlayın.',
+                id='speech_app.W003',
+            ))
+    return warnings
@@ -0,0 +1,81 @@
+"""
+Veritabanı bağlantısı sağlık denetimi ve havuz istatistikleri
+"""
+import time
+
+from django.db import connections
+
+# psycopg_pool istatistiklerinden raporlananlar
+POOL_STAT_KEYS = (
+    'pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting',
+    'requests_num', 'requests_queued', 'requests_wait_ms', 'requests_errors',
+    'connections_num', 'connections_errors', 'connections_lost',
+)
+
+
+def connection_stats(alias='default'):
+    """
+    Bu sürecin bağlantı durumu. Havuz kullanılıyorsa psycopg_pool sayaçları
+    da eklenir (``pool_available``: boştaki, ``requests_waiting``: bağlantı
+    bekleyen istekler).
+    """
+    connection = connections[alias]
+    stats = {
+        'vendor': connection.vendor,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'connected': connection.connection is not None,
+        'pooled': False,
+    }
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        pool_stats = pool.get_stats()
+        stats['pooled'] = True
+        stats.update({key: pool_stats.get(key, 0) for key in POOL_STAT_KEYS})
+    return stats
+
+
+def ping(alias='default'):
+    """
+    Basit bir sorguyla bağlantıyı dener.
+
+    Döndürür: (başarılı mı, gecikme (ms), hata mesajı ya da None)
+    """
+    start = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception as e:
+        return False, (time.perf_counter() - start) * 1000, str(e)
+    return True, (time.perf_counter() - start) * 1000, None
+
+
+def render_metrics(alias='default'):
+    """Bağlantı durumunu Prometheus metin biçiminde döndürür"""
+    ok, latency_ms, _ = ping(alias)
+    stats = connection_stats(alias)
+    lines = [
+        '# TYPE speechtotext_db_up gauge',
+        f'speechtotext_db_up {int(ok)}',
+        '# TYPE speechtotext_db_ping_seconds gauge',
+        f'speechtotext_db_ping_seconds {latency_ms / 1000:.6f}',
+        '# TYPE speechtotext_db_pooled gauge',
+        f"speechtotext_db_pooled {int(stats['pooled'])}",
+    ]
+    if stats['pooled']:
+        for key in POOL_STAT_KEYS:
+            kind = 'counter' if key.endswith(('_num', '_ms', '_errors', '_lost', '_queued')) else 'gauge'
+            lines.append(f'# TYPE speechtotext_db_{key} {kind}')
+            lines.append(f'speechtotext_db_{key} {stats[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def close_all_connections():
+    """
+    Bu süreçteki bağlantıları ve havuzları kapatır. Süreç çatallanmadan önce
+    çağrılır; alt süreçler ebeveynin soketlerini ya da havuzunu devralmamalı.
+    """
+    connections.close_all()
+    for connection in connections.all(initialized_only=True):
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            connection.close_pool()
@@ -0,0 +1,184 @@
+"""
+Transkripsiyonların dışa aktarma biçimleri (TXT, SRT, VTT, JSON)
+
+Her biçim çıktıyı parça parça üreten bir fonksiyondur; bölümler
+AudioUpload.segments'tan okunur ve yanıt StreamingHttpResponse ile
+gönderilir, böylece büyük transkriptler bellekte tek bir metne
+dönüştürülmez. Küçük çıktılar kayıt başına önbelleğe alınır.
+"""
+import io
+import json
+import zipfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.utils.text import slugify
+
+from .text_processing import build_segments, timed_text_joining
+
+# Bu kelime sayısına kadar olan çıktılar önbelleğe alınır, üstü her seferinde akıtılır
+EXPORT_CACHE_MAX_WORDS = 20000
+# TXT çıktısında tek seferde gönderilen karakter sayısı
+TEXT_CHUNK_SIZE = 64 * 1024
+# Toplu ZIP akışında istemciye gönderilen parça boyutu (bayt)
+ZIP_CHUNK_SIZE = 64 * 1024
+# Toplu ZIP'te dışa aktarma için gereken alanlar (dalga formu blob'u yüklenmez)
+EXPORT_FIELDS = ('title', 'language', 'duration', 'created_at', 'updated_at', 'quality_score',
+                 'word_count', 'speaker_count', 'transcription', 'segments')
+
+
+def get_segments(audio_upload):
+    """
+    Kaydın zamanlı bölümleri. Bölümleri saklanmamış eski kayıtlarda metin
+    dosya süresine eşit aralıklarla yayılarak bölümlenir.
+    """
+    if audio_upload.segments:
+        return audio_upload.segments
+    if not audio_upload.transcription:
+        return []
+    duration = audio_upload.duration or 0.0
+    words = timed_text_joining([audio_upload.transcription], [0.0], [duration])
+    return build_segments(words)
+
+
+def format_timestamp(seconds, separator=','):
+    """Saniyeyi SRT zaman damgasına (SS:DD:ss,mmm) çevirir"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f'{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}'
+
+
+def speaker_label(segment):
+    """Bölümün konuşmacı etiketi (ayrıştırma yapılmadıysa None)"""
+    speaker = segment.get('speaker')
+    return f'Konuşmacı {speaker}' if speaker else None
+
+
+def iter_txt(audio_upload):
+    text = audio_upload.transcription or ''
+    for start in range(0, len(text), TEXT_CHUNK_SIZE):
+        yield text[start:start + TEXT_CHUNK_SIZE]
+    yield '\n'
+
+
+def iter_srt(audio_upload):
+    for index, segment in enumerate(get_segments(audio_upload), start=1):
+        label = speaker_label(segment)
+        yield (
+            f"{index}\n"
+            f"{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n"
+            f"{f'[{label}] ' if label else ''}{segment['text']}\n\n"
+        )
+
+
+def iter_vtt(audio_upload):
+    yield 'WEBVTT\n\n'
+    for segment in get_segments(audio_upload):
+        label = speaker_label(segment)
+        yield (
+            f"{format_timestamp(segment['start'], '.')} --> {format_timestamp(segment['end'], '.')}\n"
+            f"{f'<v {label}>' if label else ''}{segment['text']}\n\n"
+        )
+
+
+def iter_json(audio_upload):
+    header = json.dumps({
+        'id': audio_upload.pk,
+        'title': audio_upload.title,
+        'language': audio_upload.language,
+        'duration': audio_upload.duration,
+        'created_at': audio_upload.created_at.isoformat(),
+        'quality_score': audio_upload.quality_score,
+        'word_count': audio_upload.word_count,
+        'speaker_count': audio_upload.speaker_count,
+        'text': audio_upload.transcription,
+    }, ensure_ascii=False)
+    # Bölüm listesi nesnenin sonuna tek tek eklenir
+    yield header[:-1] + ', "segments": ['
+    for index, segment in enumerate(get_segments(audio_upload)):
+        yield (', ' if index else '') + json.dumps(segment, ensure_ascii=False)
+    yield ']}'
+
+
+# biçim -> (üretici, içerik tipi)
+EXPORT_FORMATS = {
+    'txt': (iter_txt, 'text/plain; charset=utf-8'),
+    'srt': (iter_srt, 'application/x-subrip; charset=utf-8'),
+    'vtt': (iter_vtt, 'text/vtt; charset=utf-8'),
+    'json': (iter_json, 'application/json'),
+}
+
+
+def export_filename(audio_upload, export_format):
+    base = slugify(audio_upload.title or '', allow_unicode=True) or f'transkripsiyon-{audio_upload.pk}'
+    return f'{base}.{export_format}'
+
+
+def export_response(audio_upload, export_format):
+    """
+    Dışa aktarma yanıtı. Küçük çıktılar kayıt başına önbelleğe alınır (anahtar
+    updated_at içerdiğinden kayıt değişince eski içerik kullanılmaz); büyükler
+    bellekte birleştirilmeden akıtılır.
+    """
+    generator, content_type = EXPORT_FORMATS[export_format]
+    key = audio_upload.cache_key('export', export_format)
+
+    body = cache.get(key)
+    if body is None and (audio_upload.word_count or 0) <= EXPORT_CACHE_MAX_WORDS:
+        body = ''.join(generator(audio_upload))
+        cache.set(key, body, getattr(settings, 'TRANSCRIPTION_CACHE_TIMEOUT', 24 * 3600))
+
+    if body is not None:
+        response = HttpResponse(body, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(generator(audio_upload), content_type=content_type)
+    response['Content-Disposition'] = content_disposition_header(True, export_filename(audio_upload, export_format))
+    return response
+
+
+class _ZipBuffer(io.RawIOBase):
+    """zipfile'ın yazdığı baytları toplayıp akışa verilmek üzere biriktirir"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def iter_zip(audio_uploads, export_format):
+    """
+    Kayıtların dışa aktarmalarını anlık üretilen bir ZIP olarak akıtır.
+    ``audio_uploads`` bir QuerySet.iterator() olmalıdır; bellekte aynı anda
+    yalnızca iterator'ın çektiği kayıtlar ve ~``ZIP_CHUNK_SIZE`` baytlık
+    sıkıştırılmış tampon bulunur.
+    """
+    generator, _ = EXPORT_FORMATS[export_format]
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for audio_upload in audio_uploads:
+            name = f'{audio_upload.pk}-{export_filename(audio_upload, export_format)}'
+            info = zipfile.ZipInfo(name, date_time=audio_upload.created_at.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as entry:
+                for part in generator(audio_upload):
+                    entry.write(part.encode('utf-8'))
+                    if buffer.size >= ZIP_CHUNK_SIZE:
+                        yield buffer.pop()
+    yield buffer.pop()
@@ -0,0 +1,271 @@
+"""
+Web ve yükleme yolları için yük testi
+
+Her sanal kullanıcı kendi oturumuyla (çerez kavanozu) giriş yapar, ardından
+ağırlıklı rastgele senaryo adımlarını (liste, detay, durum sorgulama, yükleme)
+bekleme süreleriyle tekrarlar. Gecikmeler uç nokta bazında toplanır;
+p50/p95/p99 ve saniyedeki istek sayısı kayıtlı bir referansla karşılaştırılır.
+"""
+import http.cookiejar
+import io
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import wave
+from collections import defaultdict
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+# Giriş sonrası tekrarlanan adımların varsayılan ağırlıkları
+DEFAULT_MIX = {'list': 4, 'detail': 3, 'status': 6, 'upload': 1}
+PERCENTILES = (50, 95, 99)
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+DETAIL_PATH_RE = re.compile(r'/transcription/(\d+)/$')
+
+
+def percentile(sorted_values, pct):
+    """En yakın sıra yöntemiyle yüzdelik (değerler sıralı olmalı)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def synthetic_wav(seconds=15.0, sample_rate=16000, frequency=220.0):
+    """
+    Yükleme adımı için sinüs WAV dosyası (ek bağımlılık olmadan). Pipeline
+    10 saniyeden kısa parçaları atladığından varsayılan süre bunun üzerindedir.
+    """
+    frames = int(seconds * sample_rate)
+    samples = (int(8000 * math.sin(2 * math.pi * frequency * i / sample_rate)) for i in range(frames))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f'<{frames}h', *samples))
+    return buffer.getvalue()
+
+
+def encode_multipart(fields, files):
+    """multipart/form-data gövdesi; files: {alan: (dosya adı, içerik, içerik türü)}"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class LoadTestStats:
+    """İş parçacıkları arasında paylaşılan ölçümler"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok, error=None):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.failures[endpoint] += 1
+                if error:
+                    self.errors[f'{endpoint}: {error}'] += 1
+
+    def mark_failed(self, endpoint, error):
+        """Başarılı yanıt dönen ama beklenen sonucu vermeyen son isteği hatalı sayar"""
+        with self.lock:
+            self.failures[endpoint] += 1
+            self.errors[f'{endpoint}: {error}'] += 1
+
+    def summary(self, elapsed):
+        """Uç nokta bazında istek sayısı, hata oranı, istek/s ve yüzdelikler (ms)"""
+        endpoints = {}
+        with self.lock:
+            for endpoint, values in sorted(self.latencies.items()):
+                ordered = sorted(values)
+                endpoints[endpoint] = {
+                    'requests': len(ordered),
+                    'failures': self.failures[endpoint],
+                    'rps': len(ordered) / elapsed if elapsed else 0.0,
+                    **{f'p{pct}': percentile(ordered, pct) * 1000 for pct in PERCENTILES},
+                }
+            total = sum(len(values) for values in self.latencies.values())
+            failures = sum(self.failures.values())
+            errors = dict(sorted(self.errors.items(), key=lambda item: -item[1])[:10])
+        return {
+            'duration': elapsed,
+            'requests': total,
+            'failures': failures,
+            'error_rate': failures / total if total else 0.0,
+            'rps': total / elapsed if elapsed else 0.0,
+            'endpoints': endpoints,
+            'errors': errors,
+        }
+
+
+class VirtualUser:
+    """Kendi oturumu olan tek bir kullanıcı"""
+
+    def __init__(self, base_url, username, password, stats, mix, think_time, audio, rng, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.mix = mix
+        self.think_time = think_time
+        self.audio = audio
+        self.rng = rng
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        self.uploads = []
+
+    def request(self, endpoint, path, data=None, content_type=None, expect_json=False):
+        """
+        İsteği gönderir ve ölçer (yönlendirmeler aynı ölçüme dahildir).
+
+        Döndürür: (başarılı mı, son URL, gövde)
+        """
+        request = Request(self.base_url + path, data=data)
+        if content_type:
+            request.add_header('Content-Type', content_type)
+        if data is not None:
+            # CSRF denetimi HTTPS olmayan isteklerde Referer'a bakmaz, yine de gerçekçi olsun
+            request.add_header('Referer', self.base_url + path)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                body = response.read()
+                final_url = response.geturl()
+            ok, error = True, None
+            if expect_json:
+                json.loads(body)
+        except HTTPError as e:
+            body, final_url, ok, error = b'', path, False, f'HTTP {e.code}'
+        except (URLError, OSError, ValueError) as e:
+            body, final_url, ok, error = b'', path, False, type(e).__name__
+        self.stats.record(endpoint, time.perf_counter() - start, ok, error)
+        return ok, final_url, body
+
+    def csrf_token(self, html):
+        match = CSRF_INPUT_RE.search(html.decode('utf-8', 'replace'))
+        if match:
+            return match.group(1)
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def login(self):
+        ok, _, body = self.request('login_page', '/login/')
+        if not ok:
+            return False
+        data = urlencode({
+            'csrfmiddlewaretoken': self.csrf_token(body),
+            'username': self.username,
+            'password': self.password,
+        }).encode()
+        ok, final_url, _ = self.request('login', '/login/', data, 'application/x-www-form-urlencoded')
+        # Başarısız girişte form yeniden gösterilir (200, /login/)
+        if ok and final_url.rstrip('/').endswith('/login'):
+            self.stats.mark_failed('login', 'kimlik doğrulama başarısız')
+            return False
+        return ok
+
+    def upload(self):
+        ok, _, body = self.request('upload_page', '/upload/')
+        if not ok:
+            return
+        data, content_type = encode_multipart(
+            {'csrfmiddlewaretoken': self.csrf_token(body), 'title': f'loadtest {self.username}', 'language': 'tr-TR'},
+            {'audio_file': ('loadtest.wav', self.audio, 'audio/wav')},
+        )
+        ok, final_url, _ = self.request('upload', '/upload/', data, content_type)
+        match = DETAIL_PATH_RE.search(final_url)
+        if ok and match:
+            self.uploads.append(int(match.group(1)))
+        elif ok:
+            # Kota ya da doğrulama hatasında yükleme sayfasına geri dönülür
+            self.stats.mark_failed('upload', 'yükleme reddedildi')
+
+    def step(self):
+        action = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if action in ('detail', 'status') and not self.uploads:
+            action = 'upload'
+        if action == 'list':
+            self.request('list', '/transcriptions/')
+        elif action == 'detail':
+            self.request('detail', f'/transcription/{self.rng.choice(self.uploads)}/')
+        elif action == 'status':
+            self.request('status', f'/transcription/{self.uploads[-1]}/status/', expect_json=True)
+        else:
+            self.upload()
+
+    def run(self, deadline, should_stop):
+        if not self.login():
+            return
+        while time.monotonic() < deadline and not should_stop():
+            self.step()
+            if self.think_time:
+                time.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+
+def run_load_test(base_url, credentials, duration=30.0, ramp_up=5.0, think_time=0.5, mix=None,
+                  seed=0, should_stop=lambda: False):
+    """
+    ``credentials`` listesindeki her kullanıcı için bir iş parçacığı başlatır;
+    kullanıcılar ``ramp_up`` saniyeye yayılarak devreye girer.
+    """
+    stats = LoadTestStats()
+    audio = synthetic_wav()
+    mix = mix or DEFAULT_MIX
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    threads = []
+    for i, (username, password) in enumerate(credentials):
+        user = VirtualUser(base_url, username, password, stats, mix, think_time, audio, random.Random(seed + i))
+        thread = threading.Thread(target=user.run, args=(deadline, should_stop), daemon=True)
+        threads.append(thread)
+        delay = start + ramp_up * i / max(len(credentials), 1) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats.summary(time.monotonic() - start)
+
+
+def compare_with_baseline(summary, baseline, max_regression=0.25, min_delta_ms=5.0):
+    """
+    Referansa göre gerilemeleri listeler: bir yüzdelik (1 + max_regression)
+    katından ve en az ``min_delta_ms`` kadar yavaşsa ya da toplam istek/s
+    (1 - max_regression) katının altına düştüyse.
+    """
+    regressions = []
+    for endpoint, reference in baseline.get('endpoints', {}).items():
+        current = summary['endpoints'].get(endpoint)
+        if current is None:
+            regressions.append(f'{endpoint}: bu çalıştırmada hiç istek yok')
+            continue
+        for pct in PERCENTILES:
+            key = f'p{pct}'
+            limit = reference[key] * (1 + max_regression)
+            if current[key] > limit and current[key] - reference[key] >= min_delta_ms:
+                regressions.append(
+                    f'{endpoint} {key}: {current[key]:.1f} ms > {reference[key]:.1f} ms (+%{max_regression * 100:.0f} sınırı)'
+                )
+    if summary['rps'] < baseline['rps'] * (1 - max_regression):
+        regressions.append(f"toplam istek/s: {summary['rps']:.1f} < {baseline['rps']:.1f} (-%{max_regression * 100:.0f} sınırı)")
+    return regressions
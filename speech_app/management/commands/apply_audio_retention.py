@@ -0,0 +1,48 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from speech_app.models import AudioUpload
+from speech_app.storage import FINISHED_STATUSES, apply_retention
+
+
+class Command(BaseCommand):
+    help = ("Ses dosyalarına saklama politikasını uygular: eskiyenleri soğuk katmana "
+            "taşır, süresi dolanları siler")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Değişiklik yapmadan etkilenecek kayıtları say')
+        parser.add_argument('--compress-existing', action='store_true',
+                            help='Sıcak katmandaki sıkıştırılmamış orijinalleri Opus\'a dönüştür')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if options['compress_existing']:
+            self.compress_existing(dry_run)
+
+        result = apply_retention(dry_run=dry_run)
+        prefix = '[dry-run] ' if dry_run else ''
+        self.stdout.write(
+            f"{prefix}{result['moved']} dosya soğuk katmana taşındı, {result['deleted']} dosya silindi"
+        )
+
+    def compress_existing(self, dry_run):
+        from speech_app.worker import compress_original
+
+        pending = (
+            AudioUpload.objects.filter(status__in=FINISHED_STATUSES, storage_tier='hot', audio_compressed=False)
+            .exclude(audio_file='')
+        )
+        compressed = 0
+        for audio_upload in pending.iterator(chunk_size=100):
+            if dry_run:
+                compressed += 1
+                continue
+            try:
+                compressed += compress_original(audio_upload)
+            except Exception as e:
+                logging.warning(f"#{audio_upload.pk} sıkıştırılamadı: {str(e)}")
+        prefix = '[dry-run] ' if dry_run else ''
+        self.stdout.write(f"{prefix}{compressed} dosya sıkıştırıldı")
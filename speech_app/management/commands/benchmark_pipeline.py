@@ -0,0 +1,360 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from speech_app.pipeline.audio import RESAMPLE_QUALITIES, get_target_sample_rate, resample, to_int16
+
+
+def synthetic_audio(seconds, sample_rate, seed=0):
+    """Konuşmaya benzer zarflı ton + gürültü karışımı üretir"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    tone = np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 1250 * t)
+    noise = rng.normal(0, 0.05, t.shape).astype(np.float32)
+    return (0.3 * envelope * tone + noise).astype(np.float32)
+
+
+def synthetic_conversation(seconds, sample_rate, speakers=2, seed=0):
+    """
+    Sırayla konuşan sentetik konuşmacılar üretir; her konuşmacının temel
+    frekansı ve formant yapısı farklıdır, dönüşler arasında sessizlik vardır.
+
+    Döndürür: (örnekler, [(başlangıç, bitiş, konuşmacı), ...])
+    """
+    rng = np.random.default_rng(seed)
+    voices = [(110, (700, 1200, 2600)), (210, (400, 2200, 3000)), (160, (550, 1600, 2800))]
+    samples = rng.normal(0, 0.005, int(seconds * sample_rate)).astype(np.float32)
+    turns = []
+    position, speaker = 0.3, 0
+    while True:
+        length = rng.uniform(2.0, 6.0)
+        if position + length > seconds:
+            break
+        f0, formants = voices[speaker % len(voices)]
+        start = int(position * sample_rate)
+        t = np.arange(int(length * sample_rate), dtype=np.float32) / sample_rate
+        # Hafif titreşen temel frekansın formantlarla ağırlıklandırılmış harmonikleri
+        phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 0.7 * t))) / sample_rate
+        voice = np.zeros_like(t)
+        for harmonic in range(1, int(3800 / f0)):
+            frequency = harmonic * f0
+            gain = sum(np.exp(-((frequency - formant) / 150.0) ** 2) for formant in formants) + 0.05
+            voice += gain * np.sin(harmonic * phase)
+        syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+        samples[start:start + len(t)] += (0.1 * syllables * voice / np.abs(voice).max()).astype(np.float32)
+        turns.append((position, position + length, speaker))
+        position += length + rng.uniform(0.4, 1.0)
+        speaker = (speaker + 1) % speakers
+    return samples, turns
+
+
+def cpu_seconds(func, *args, repeat=3, **kwargs):
+    """En iyi çalıştırmanın CPU süresini ve sonucunu döndürür"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = func(*args, **kwargs)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# Yeni bir yorumlayıcıda Django'yu kurup verilen kodu çalıştırır, süreyi ve
+# sürecin kendi en yüksek RSS değerini JSON olarak yazar. ru_maxrss Linux'ta
+# fork/exec ile üst süreçten devralındığından /proc/self/status'taki VmHWM
+# (exec ile sıfırlanır) okunur.
+STARTUP_PROBE = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+{code}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in ('numpy', 'scipy', 'librosa', 'noisereduce', 'speech_recognition', 'numba') if m in sys.modules)
+try:
+    with open('/proc/self/status') as status:
+        rss_kb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    # /proc olmayan sistemlerde (macOS ru_maxrss bayt cinsindendir)
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_kb = rss_kb / 1024 if sys.platform == 'darwin' else rss_kb
+print(json.dumps({{'seconds': elapsed, 'rss_mb': rss_kb / 1024, 'heavy': heavy}}))
+"""
+
+
+def measure_startup(code):
+    """Kodu ayrı bir süreçte çalıştırıp başlangıç süresini ve belleğini ölçer"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'speechtotext_project.settings'))
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_PROBE.format(code=code)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def synthetic_transcript_chunks(rng, chunk_count, chunk_seconds=60, overlap_seconds=5,
+                                words_per_second=2.5, corrupt_edges=True):
+    """
+    Örtüşen parçalara bölünmüş sentetik transkript üretir.
+    Parça kenarındaki kelimeler tanıyıcıdaki gibi kesilebilir/bozulabilir.
+
+    Döndürür: (beklenen kelimeler, parça metinleri)
+    """
+    vocabulary = [''.join(rng.choice('abcçdefgğhıijklmnoöprsştuüvyz') for _ in range(rng.randint(2, 9)))
+                  for _ in range(800)]
+    step = chunk_seconds - overlap_seconds
+    total_seconds = step * chunk_count + overlap_seconds
+    words = [rng.choice(vocabulary) for _ in range(int(total_seconds * words_per_second))]
+
+    segments = []
+    for i in range(chunk_count):
+        start = int(i * step * words_per_second)
+        end = int((i * step + chunk_seconds) * words_per_second)
+        chunk_words = list(words[start:end])
+        if corrupt_edges and chunk_words:
+            if i > 0 and rng.random() < 0.5:
+                chunk_words.pop(0)  # ilk kelime yarım kaldı
+            if i < chunk_count - 1 and rng.random() < 0.5:
+                chunk_words[-1] = chunk_words[-1][:-1] or 'x'  # son kelime bozuldu
+        segments.append(' '.join(chunk_words))
+    return words, segments
+
+
+class Command(BaseCommand):
+    help = "Transkripsiyon pipeline'ı için CPU maliyeti ölçümleri"
+
+    SUITES = ('resample', 'sphinx', 'merge', 'normalize', 'peaks', 'diarization', 'engines', 'imports')
+
+    def add_arguments(self, parser):
+        parser.add_argument('suites', nargs='*',
+                            help=f"Çalıştırılacak ölçümler: {', '.join(self.SUITES)} (varsayılan: hepsi)")
+        parser.add_argument('--seconds', type=float, default=120,
+                            help='Sentetik ses uzunluğu (saniye)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Her ölçüm için tekrar sayısı')
+
+    def handle(self, *args, **options):
+        suites = options['suites'] or self.SUITES
+        unknown = set(suites) - set(self.SUITES)
+        if unknown:
+            raise CommandError(f"Bilinmeyen ölçüm: {', '.join(sorted(unknown))}")
+
+        for suite in suites:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {suite} =='))
+            getattr(self, f'bench_{suite}')(options)
+
+    def report(self, label, cpu, audio_seconds):
+        per_hour = cpu / audio_seconds * 3600 if audio_seconds else 0.0
+        self.stdout.write(f'{label:<40} {cpu * 1000:9.1f} ms  {per_hour:8.2f} CPU-s / ses-saati')
+
+    def bench_resample(self, options):
+        seconds = options['seconds']
+        target_sr = get_target_sample_rate()
+        for source_sr in (44100, 48000):
+            samples = synthetic_audio(seconds, source_sr)
+            for quality in RESAMPLE_QUALITIES:
+                cpu, _ = cpu_seconds(resample, samples, source_sr, target_sr, quality,
+                                     repeat=options['repeat'])
+                self.report(f'{source_sr}Hz -> {target_sr}Hz [{quality}]', cpu, seconds)
+
+    def bench_sphinx(self, options):
+        import speech_recognition as sr
+        from speech_app.pipeline.recognition import OfflineRecognizer
+
+        sample_rate = 16000
+        chunk_seconds = 10
+        chunk_count = max(int(options['seconds'] // chunk_seconds), 1)
+        chunks = [
+            sr.AudioData(to_int16(synthetic_audio(chunk_seconds, sample_rate, seed=i)).tobytes(), sample_rate, 2)
+            for i in range(chunk_count)
+        ]
+
+        try:
+            start = time.perf_counter()
+            offline = OfflineRecognizer()
+            startup = time.perf_counter() - start
+        except sr.RequestError as e:
+            raise CommandError(f'Sphinx kullanılamıyor: {e}')
+
+        self.stdout.write(f'{"model yükleme (bir kez)":<40} {startup * 1000:9.1f} ms')
+
+        # Eski yol: her çağrıda decoder ve modeller yeniden yüklenir
+        recognizer = sr.Recognizer()
+        start = time.perf_counter()
+        for audio_data in chunks:
+            try:
+                recognizer.recognize_sphinx(audio_data)
+            except sr.UnknownValueError:
+                pass
+        legacy = (time.perf_counter() - start) / chunk_count
+
+        start = time.perf_counter()
+        for audio_data in chunks:
+            offline.recognize(audio_data)
+        shared = (time.perf_counter() - start) / chunk_count
+
+        self.stdout.write(f'{chunk_count} x {chunk_seconds}s parça, parça başına gecikme:')
+        self.stdout.write(f'{"  recognize_sphinx (her çağrıda yükleme)":<40} {legacy * 1000:9.1f} ms')
+        self.stdout.write(f'{"  paylaşılan decoder":<40} {shared * 1000:9.1f} ms')
+
+    def bench_merge(self, options):
+        from speech_app.text_processing import intelligent_text_joining
+
+        rng = random.Random(0)
+
+        # Doğruluk: kenarları bozulmuş sentetik örtüşmelerde birleşik metin beklenene eşit mi?
+        trials = 200
+        exact = 0
+        duplicated = 0
+        for _ in range(trials):
+            words, segments = synthetic_transcript_chunks(rng, chunk_count=3)
+            merged = intelligent_text_joining(segments).split()
+            exact += merged == words
+            duplicated += max(len(merged) - len(words), 0)
+        self.stdout.write(f'{"doğruluk (3 parçalık örnekler)":<40} {exact / trials * 100:8.1f} %  '
+                          f'(fazladan kelime ort.: {duplicated / trials:.2f})')
+
+        # Hız: toplam kelime sayısıyla doğrusal ölçeklenmeli
+        for chunk_count in (10, 100, 1000):
+            words, segments = synthetic_transcript_chunks(rng, chunk_count, corrupt_edges=False)
+            start = time.perf_counter()
+            intelligent_text_joining(segments)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{chunk_count:>5} parça / {len(words):>7} kelime{"":<16} {elapsed * 1000:9.1f} ms  '
+                              f'{len(words) / elapsed / 1e6:6.2f} M kelime/s')
+
+    def bench_normalize(self, options):
+        from speech_app.text_processing import clean_and_improve_text
+
+        rng = random.Random(0)
+        vocabulary = ['istanbul', 'ılık', 'şehir', 'güzel', 'öğrenci', 'çalışma', 'İzmir', 've', 'bir',
+                      '150000', '2024', ',', '!', 'kişi', 'yüzde', 'toplantı', 'i\u0307lk', 'g\u0306']
+        # 60 saniyelik parçalara denk (~150 kelime) metinler
+        chunk_texts = [' '.join(rng.choice(vocabulary) for _ in range(150)) for _ in range(2000)]
+        total_mb = sum(len(text.encode('utf-8')) for text in chunk_texts) / (1024 * 1024)
+
+        for language_code in ('tr-TR', 'en-US'):
+            cpu, _ = cpu_seconds(lambda: [clean_and_improve_text(text, language_code) for text in chunk_texts],
+                                 repeat=options['repeat'])
+            self.stdout.write(f'{language_code} ({len(chunk_texts)} parça, {total_mb:.1f} MB){"":<13} '
+                              f'{cpu * 1000:9.1f} ms  {total_mb / cpu:8.1f} MB/s')
+
+    def bench_peaks(self, options):
+        from speech_app.pipeline.waveform import compute_peaks, decode_peaks, encode_peaks
+
+        sample_rate = get_target_sample_rate()
+        for seconds in (options['seconds'], 3600):
+            samples = synthetic_audio(seconds, sample_rate)
+            cpu, levels = cpu_seconds(compute_peaks, samples, repeat=options['repeat'])
+            blob = encode_peaks(levels, sample_rate)
+            _, decoded = decode_peaks(blob)
+            assert all((a[1] == b[1]).all() and (a[2] == b[2]).all() for a, b in zip(levels, decoded))
+            self.report(f'{seconds:.0f}s tepe değerleri', cpu, seconds)
+            self.stdout.write(
+                f"  {len(levels)} seviye ({', '.join(str(len(mins)) for _, mins, _ in levels)} tepe), "
+                f"{len(blob) / 1024:.1f} KB"
+            )
+
+    def bench_diarization(self, options):
+        from speech_app.pipeline.diarization import HOP_SECONDS, diarize
+
+        sample_rate = get_target_sample_rate()
+        seconds = options['seconds']
+        for speakers in (1, 2):
+            samples, truth = synthetic_conversation(seconds, sample_rate, speakers=speakers)
+            cpu, turns = cpu_seconds(diarize, samples, sample_rate, max_speakers=2, repeat=options['repeat'])
+
+            # Çerçeve düzeyinde doğruluk (konuşmacı numaralarının en iyi eşleşmesiyle)
+            frames = int(seconds / HOP_SECONDS)
+            expected = np.full(frames, -1)
+            found = np.full(frames, -1)
+            for start, end, speaker in truth:
+                expected[int(start / HOP_SECONDS):int(end / HOP_SECONDS)] = speaker
+            for start, end, speaker in turns:
+                found[int(start / HOP_SECONDS):int(end / HOP_SECONDS)] = speaker
+            speech = expected >= 0
+            accuracy = max(
+                np.mean(found[speech] == expected[speech]),
+                np.mean(np.where(found[speech] >= 0, 1 - found[speech], -1) == expected[speech]),
+            )
+            detected = len({speaker for _, _, speaker in turns})
+            self.stdout.write(
+                f'{speakers} konuşmacı, {seconds:.0f}s{"":<24} {cpu * 1000:9.1f} ms  '
+                f'{seconds / cpu:8.1f} ses-dk / CPU-dk'
+            )
+            self.stdout.write(f'  {detected} konuşmacı bulundu, {len(turns)} dönüş, çerçeve doğruluğu %{accuracy * 100:.1f}')
+
+    def bench_engines(self, options):
+        import tempfile
+
+        import speech_recognition as sr
+        from speech_app.management.commands.recognizer_stub_server import make_stub_server, stub_endpoint
+        from speech_app.pipeline.engines import EngineGuard, EngineUnavailable
+
+        sample_rate = 16000
+        chunk_count = 20
+        audio_data = sr.AudioData(to_int16(synthetic_audio(1, sample_rate)).tobytes(), sample_rate, 2)
+        scenarios = [
+            ('sağlıklı', {}),
+            ('%100 zaman aşımı', {'timeout_rate': 1.0}),
+            ('%50 hata (500)', {'error_rate': 0.5}),
+            ('hız sınırı (429)', {'throttle_rate': 1.0}),
+        ]
+
+        for label, faults in scenarios:
+            server = make_stub_server(hang_seconds=2.0, seed=0, **faults)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            recognizer = sr.Recognizer()
+            recognizer.operation_timeout = 1.0
+
+            def recognize():
+                return recognizer.recognize_google(audio_data, language='tr-TR', show_all=True,
+                                                   endpoint=stub_endpoint(server))
+
+            try:
+                for guarded in (False, True):
+                    with tempfile.TemporaryDirectory() as state_dir:
+                        guard = EngineGuard('stub', config={
+                            'rate': 50.0, 'burst': 50, 'timeout': 1.0, 'endpoint': None, 'failure_threshold': 3,
+                            'cooldown': 60, 'max_cooldown': 60, 'max_wait': 0,
+                        }, state_dir=state_dir)
+                        outcomes = {'ok': 0, 'failed': 0, 'deferred': 0}
+                        start = time.perf_counter()
+                        for _ in range(chunk_count):
+                            try:
+                                guard.call(recognize) if guarded else recognize()
+                                outcomes['ok'] += 1
+                            except EngineUnavailable:
+                                outcomes['deferred'] += 1
+                            except (sr.RequestError, sr.UnknownValueError, OSError):
+                                outcomes['failed'] += 1
+                        elapsed = time.perf_counter() - start
+                    mode = 'devre kesici' if guarded else 'korumasız'
+                    self.stdout.write(
+                        f'{label + " / " + mode:<40} {elapsed * 1000:9.1f} ms  '
+                        f"{outcomes['ok']} başarılı, {outcomes['failed']} hata, {outcomes['deferred']} ertelendi"
+                    )
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    def bench_imports(self, options):
+        probes = [
+            ('web (URLconf + views)', 'from django.urls import get_resolver; get_resolver().url_patterns'),
+            ('worker (import)', 'import speech_app.pipeline.transcription'),
+            ('worker (import + ısınma)', 'from speech_app.worker import warm_up; warm_up()'),
+        ]
+        for label, code in probes:
+            results = [measure_startup(code) for _ in range(options['repeat'])]
+            best = min(results, key=lambda result: result['seconds'])
+            heavy = ', '.join(best['heavy']) or '-'
+            self.stdout.write(f'{label:<40} {best["seconds"] * 1000:9.1f} ms  {best["rss_mb"]:7.1f} MB RSS  [{heavy}]')
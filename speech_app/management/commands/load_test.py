@@ -0,0 +1,211 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from speech_app.loadtest import DEFAULT_MIX, PERCENTILES, compare_with_baseline, run_load_test
+
+LOADTEST_USER_PREFIX = 'loadtest-'
+
+
+def parse_mix(value):
+    """'list=4,status=6' biçimindeki adım ağırlıkları"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise CommandError(f"Geçersiz adım ağırlığı: {item} (adımlar: {', '.join(DEFAULT_MIX)})")
+        mix[name] = int(weight)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = ("Giriş, yükleme, liste, detay ve durum sorgulama yollarına eşzamanlı kullanıcılarla yük "
+            "bindirir; uç nokta bazında p50/p95/p99 ve istek/s raporlar, kayıtlı referansa göre "
+            "gerileme varsa hata ile çıkar. --serve ile gunicorn ve sahte tanıyıcıya bağlı bir "
+            "transkripsiyon worker'ı yerelde başlatılır.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Hedef adres (ör. http://127.0.0.1:8001); --serve ile gerekmez')
+        parser.add_argument('--serve', action='store_true',
+                            help="gunicorn'u ve sahte tanıyıcıyla çalışan worker'ı yerelde başlat")
+        parser.add_argument('--web-workers', type=int,
+                            default=int(os.environ.get('WEB_CONCURRENCY', 3)),
+                            help='--serve ile gunicorn worker sayısı (gunicorn_start ile aynı varsayılan)')
+        parser.add_argument('--transcription-workers', type=int, default=1,
+                            help='--serve ile başlatılan transkripsiyon worker sayısı')
+        parser.add_argument('--users', type=int, default=10, help='Eşzamanlı sanal kullanıcı sayısı')
+        parser.add_argument('--duration', type=float, default=30, help='Tam yükte süre (saniye)')
+        parser.add_argument('--ramp-up', type=float, default=5, help='Kullanıcıların devreye girme süresi')
+        parser.add_argument('--think-time', type=float, default=0.5, help='Adımlar arası ortalama bekleme')
+        parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                            help="Adım ağırlıkları, ör. 'list=4,detail=3,status=6,upload=1'")
+        parser.add_argument('--password', default='loadtest-password',
+                            help='Yük testi kullanıcılarının parolası')
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'loadtest_baseline.json'),
+                            help='Referans sonuç dosyası')
+        parser.add_argument('--save-baseline', action='store_true', help='Bu çalıştırmayı referans olarak kaydet')
+        parser.add_argument('--max-regression', type=float, default=0.25,
+                            help='İzin verilen gerileme oranı (0.25: %%25)')
+        parser.add_argument('--max-error-rate', type=float, default=0.01, help='İzin verilen hata oranı')
+        parser.add_argument('--output', help='Raporu JSON olarak bu dosyaya yaz')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Bitince yük testi kullanıcılarının yüklemelerini sil')
+
+    def handle(self, *args, **options):
+        if not options['url'] and not options['serve']:
+            raise CommandError('--url ya da --serve gerekli')
+
+        credentials = self.ensure_users(options['users'], options['password'])
+        self.stopping = False
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        processes, stub = [], None
+        try:
+            if options['serve']:
+                base_url, processes, stub = self.serve(options)
+            else:
+                base_url = options['url']
+            self.stdout.write(
+                f"{base_url}: {options['users']} kullanıcı, {options['ramp_up']:.0f}s artış + "
+                f"{options['duration']:.0f}s yük"
+            )
+            summary = run_load_test(
+                base_url, credentials, duration=options['duration'], ramp_up=options['ramp_up'],
+                think_time=options['think_time'], mix=options['mix'], should_stop=lambda: self.stopping,
+            )
+        finally:
+            self.stop_servers(processes, stub)
+            if options['cleanup']:
+                self.cleanup_uploads()
+
+        self.report(summary)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(summary, f, indent=2)
+
+        if summary['error_rate'] > options['max_error_rate']:
+            raise CommandError(f"Hata oranı %{summary['error_rate'] * 100:.1f} "
+                               f"(sınır %{options['max_error_rate'] * 100:.1f})")
+
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as f:
+                json.dump({key: summary[key] for key in ('rps', 'endpoints')}, f, indent=2)
+            self.stdout.write(f"Referans kaydedildi: {options['baseline']}")
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(f"Referans yok ({options['baseline']}); karşılaştırma yapılmadı")
+            return
+        with open(options['baseline']) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(summary, baseline, options['max_regression'])
+        if regressions:
+            raise CommandError('Referansa göre gerileme:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Referansa göre gerileme yok'))
+
+    def ensure_users(self, count, password):
+        """Yük testi kullanıcılarını oluşturur; parolaları her çalıştırmada eşitlenir"""
+        credentials = []
+        for i in range(count):
+            username = f'{LOADTEST_USER_PREFIX}{i}'
+            user, created = User.objects.get_or_create(username=username)
+            if created or not user.check_password(password):
+                user.set_password(password)
+                user.save(update_fields=['password'])
+            credentials.append((username, password))
+        return credentials
+
+    def cleanup_uploads(self):
+        from speech_app.models import AudioUpload
+        from speech_app.storage import release_audio_file
+
+        uploads = AudioUpload.objects.filter(user__username__startswith=LOADTEST_USER_PREFIX).only('audio_file')
+        names = {audio_upload.audio_file.name for audio_upload in uploads if audio_upload.audio_file}
+        deleted, _ = uploads.delete()
+        # Aynı baytlar kullanıcılar arasında paylaşılır; başka kayıt göstermeyen dosyalar silinir
+        for name in names:
+            release_audio_file(name, exclude_pk=None)
+        self.stdout.write(f'{deleted} yük testi kaydı silindi')
+
+    def serve(self, options):
+        """gunicorn'u ve sahte tanıyıcıya yönlendirilmiş worker'ları başlatır"""
+        from speech_app.management.commands.recognizer_stub_server import make_stub_server, stub_endpoint
+
+        stub = make_stub_server()
+        threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+        port = free_port()
+        env = dict(os.environ, PYTHONPATH=str(settings.BASE_DIR), GOOGLE_SPEECH_ENDPOINT=stub_endpoint(stub),
+                   DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'speechtotext_project.settings'))
+        processes = [subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'speechtotext_project.wsgi:application',
+             '--workers', str(options['web_workers']), '--timeout', '300',
+             '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR, env=env,
+        )]
+        for _ in range(options['transcription_workers']):
+            processes.append(subprocess.Popen(
+                [sys.executable, '-m', 'django', 'transcription_worker'],
+                cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+
+        base_url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                with urlopen(f'{base_url}/health/', timeout=5):
+                    return base_url, processes, stub
+            except (URLError, OSError):
+                time.sleep(0.5)
+        self.stop_servers(processes, stub)
+        raise CommandError('gunicorn 60 saniyede hazır olmadı')
+
+    def stop_servers(self, processes, stub):
+        # Worker'lar ellerindeki işi bitirip çıkar
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process in processes:
+            try:
+                process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if stub is not None:
+            stub.shutdown()
+            stub.server_close()
+
+    def report(self, summary):
+        header = f"{'uç nokta':<14} {'istek':>7} {'hata':>6} {'istek/s':>8}" + ''.join(
+            f" {f'p{pct} ms':>9}" for pct in PERCENTILES)
+        self.stdout.write(header)
+        for endpoint, stats in summary['endpoints'].items():
+            self.stdout.write(
+                f"{endpoint:<14} {stats['requests']:>7} {stats['failures']:>6} {stats['rps']:>8.1f}"
+                + ''.join(f" {stats[f'p{pct}']:>9.1f}" for pct in PERCENTILES)
+            )
+        self.stdout.write(
+            f"Toplam: {summary['requests']} istek, {summary['rps']:.1f} istek/s, "
+            f"hata oranı %{summary['error_rate'] * 100:.2f} ({summary['duration']:.0f}s)"
+        )
+        for error, count in summary['errors'].items():
+            self.stdout.write(f'  {count} x {error}')
+
+    def request_stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,110 @@
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandError
+
+STUB_TRANSCRIPT = 'merhaba bu bir deneme kaydıdır'
+
+
+class FaultInjectingHandler(BaseHTTPRequestHandler):
+    """
+    Google v2 tanıma API'sinin yanıt biçimini taklit eder; ayarlanan oranlarda
+    500, 429 ve yanıt vermeme (zaman aşımı) hataları üretir.
+    """
+
+    def do_POST(self):
+        faults = self.server.faults
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        with self.server.stats_lock:
+            self.server.stats['requests'] += 1
+        if faults['latency']:
+            time.sleep(faults['latency'])
+
+        roll = self.server.rng.random()
+        if roll < faults['timeout_rate']:
+            self.count('timeouts')
+            # İstemcinin operation_timeout'undan uzun beklenir
+            time.sleep(faults['hang_seconds'])
+            return
+        roll -= faults['timeout_rate']
+        if roll < faults['throttle_rate']:
+            self.count('throttled')
+            self.send_error(429, 'Too Many Requests')
+            return
+        roll -= faults['throttle_rate']
+        if roll < faults['error_rate']:
+            self.count('errors')
+            self.send_error(500, 'Internal Server Error')
+            return
+
+        self.count('ok')
+        result = {'result': [{'alternative': [{'transcript': faults['transcript'], 'confidence': 0.92}],
+                              'final': True}], 'result_index': 0}
+        body = ('{"result":[]}\n' + json.dumps(result) + '\n').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def count(self, key):
+        with self.server.stats_lock:
+            self.server.stats[key] += 1
+
+    def log_message(self, format, *args):
+        logging.debug(f"stub: {format % args}")
+
+
+def make_stub_server(port=0, error_rate=0.0, throttle_rate=0.0, timeout_rate=0.0,
+                     latency=0.0, hang_seconds=30.0, transcript=STUB_TRANSCRIPT, seed=None):
+    """Hata enjekte eden sahte tanıma sunucusu (port 0: boş bir port seçilir)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FaultInjectingHandler)
+    server.daemon_threads = True
+    server.faults = {
+        'error_rate': error_rate, 'throttle_rate': throttle_rate, 'timeout_rate': timeout_rate,
+        'latency': latency, 'hang_seconds': hang_seconds, 'transcript': transcript,
+    }
+    server.rng = random.Random(seed)
+    server.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0, 'timeouts': 0}
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def stub_endpoint(server):
+    return f'http://127.0.0.1:{server.server_address[1]}/speech-api/v2/recognize'
+
+
+class Command(BaseCommand):
+    help = ("Hız sınırı ve devre kesiciyi denemek için Google tanıma API'sini taklit eden, "
+            "hata enjekte eden yerel sunucu. Worker'ı GOOGLE_SPEECH_ENDPOINT ile bu adrese yönlendirin.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--error-rate', type=float, default=0.0, help='500 yanıtı oranı (0-1)')
+        parser.add_argument('--throttle-rate', type=float, default=0.0, help='429 yanıtı oranı (0-1)')
+        parser.add_argument('--timeout-rate', type=float, default=0.0, help='Yanıt vermeme oranı (0-1)')
+        parser.add_argument('--latency', type=float, default=0.0, help='Her yanıta eklenen gecikme (saniye)')
+        parser.add_argument('--hang-seconds', type=float, default=30.0,
+                            help='Yanıt verilmeyen isteklerde bekleme süresi')
+        parser.add_argument('--seed', type=int, help='Tekrarlanabilir hata dizisi için tohum')
+
+    def handle(self, *args, **options):
+        if options['error_rate'] + options['throttle_rate'] + options['timeout_rate'] > 1:
+            raise CommandError("Hata oranlarının toplamı 1'i geçemez")
+        server = make_stub_server(
+            port=options['port'], error_rate=options['error_rate'], throttle_rate=options['throttle_rate'],
+            timeout_rate=options['timeout_rate'], latency=options['latency'],
+            hang_seconds=options['hang_seconds'], seed=options['seed'],
+        )
+        self.stdout.write(f"Sahte tanıma sunucusu: GOOGLE_SPEECH_ENDPOINT={stub_endpoint(server)}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"İstatistikler: {server.stats}")
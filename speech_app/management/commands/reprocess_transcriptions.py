@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import signal
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from speech_app.database import close_all_connections
+from speech_app.models import AudioUpload
+from speech_app.storage import FINISHED_STATUSES
+from speech_app.worker import REPROCESS_FIELDS, REPROCESS_LOAD_FIELDS, init_reprocess_process, reprocess_job
+
+
+def parse_date(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise CommandError(f"Geçersiz tarih: {value} (YYYY-AA-GG bekleniyor)")
+
+
+class Command(BaseCommand):
+    help = ("Seçilen kayıtları güncel pipeline ile yeniden işler. Kayıtlar tüm çekirdeklere "
+            "dağıtılır, sonuçlar toplu olarak yazılır; ilerleme bir kontrol noktası dosyasına "
+            "kaydedildiğinden iş kesilip --resume ile sürdürülebilir. Yeniden işlemesi başarısız "
+            "olan kayıtların mevcut sonuçlarına dokunulmaz.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', choices=FINISHED_STATUSES,
+                            help='Yalnızca bu durumdaki kayıtlar (tekrarlanabilir, varsayılan: hepsi)')
+        parser.add_argument('--since', type=parse_date, help='Bu tarihte ya da sonra yüklenenler (YYYY-AA-GG)')
+        parser.add_argument('--until', type=parse_date, help='Bu tarihten önce yüklenenler (YYYY-AA-GG)')
+        parser.add_argument('--method', action='append',
+                            help="processing_method değeri (tekrarlanabilir; boş değer için '')")
+        parser.add_argument('--limit', type=int, help='En fazla bu kadar kayıt işle')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Süreç sayısı (varsayılan: çekirdek sayısı)')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='bulk_update ve kontrol noktası başına kayıt sayısı')
+        parser.add_argument('--checkpoint', default='reprocess_checkpoint.json',
+                            help='Kontrol noktası dosyası')
+        parser.add_argument('--resume', action='store_true',
+                            help='Kontrol noktasındaki son kayıttan devam et')
+        parser.add_argument('--no-warmup', action='store_true',
+                            help='Süreçlerde ses işleme yığınını önceden ısıtma')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='İşlemeden seçilen kayıtları say')
+
+    def handle(self, *args, **options):
+        filters = {
+            'status': sorted(options['status'] or FINISHED_STATUSES),
+            'since': options['since'].date().isoformat() if options['since'] else None,
+            'until': options['until'].date().isoformat() if options['until'] else None,
+            'method': sorted(options['method']) if options['method'] is not None else None,
+        }
+        queryset = self.build_queryset(options)
+
+        checkpoint = {'filters': filters, 'last_pk': 0, 'processed': 0, 'failed': 0}
+        if options['resume']:
+            checkpoint = self.load_checkpoint(options['checkpoint'], filters)
+            queryset = queryset.filter(pk__gt=checkpoint['last_pk'])
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f"[dry-run] {queryset.count()} kayıt yeniden işlenecek")
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+
+        # Alt süreçler ana sürecin veritabanı bağlantısını ya da havuzunu devralmamalı;
+        # süreçler ebeveyn sorgulara başlamadan, bağlantılar kapalıyken başlatılır
+        close_all_connections()
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_reprocess_process,
+                                 initargs=(not options['no_warmup'],)) as executor:
+            executor.submit(os.getpid).result()
+            self.run(executor, queryset, checkpoint, options)
+
+        self.stdout.write(
+            f"{checkpoint['processed']} kayıt yeniden işlendi, {checkpoint['failed']} kayıt başarısız "
+            f"(son kayıt #{checkpoint['last_pk']})"
+        )
+        if self.stopping:
+            self.stdout.write(f"Kesildi; devam etmek için --resume --checkpoint {options['checkpoint']}")
+
+    def build_queryset(self, options):
+        queryset = AudioUpload.objects.filter(status__in=options['status'] or FINISHED_STATUSES)
+        queryset = queryset.exclude(audio_file='')
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=options['since'])
+        if options['until']:
+            queryset = queryset.filter(created_at__lt=options['until'])
+        if options['method'] is not None:
+            condition = Q(processing_method__in=[method for method in options['method'] if method])
+            if '' in options['method']:
+                condition |= Q(processing_method__isnull=True) | Q(processing_method='')
+            queryset = queryset.filter(condition)
+        # Kontrol noktası pk sırasına dayanır
+        return queryset.only(*REPROCESS_LOAD_FIELDS).order_by('pk')
+
+    def run(self, executor, queryset, checkpoint, options):
+        """
+        Kayıtları havuza akıtır. Havuzun önünde en fazla iki tur iş bekletilir;
+        sonuçlar gönderim sırasıyla alınır, böylece kontrol noktası yalnızca
+        tamamı biten kayıtlara kadar ilerler.
+        """
+        in_flight = deque()
+        pending = []
+        collected = 0
+        max_in_flight = options['workers'] * 2
+
+        def collect():
+            nonlocal collected
+            audio_upload, future = in_flight.popleft()
+            pk, values, error = future.result()
+            if values is None:
+                logging.warning(f"#{pk} yeniden işlenemedi: {error}")
+                checkpoint['failed'] += 1
+            else:
+                for field, value in values.items():
+                    setattr(audio_upload, field, value)
+                pending.append(audio_upload)
+            checkpoint['last_pk'] = pk
+            collected += 1
+            if collected % options['batch_size'] == 0:
+                self.flush(pending, checkpoint, options)
+
+        for audio_upload in queryset.iterator(chunk_size=options['batch_size']):
+            if self.stopping:
+                break
+            in_flight.append((audio_upload, executor.submit(reprocess_job, audio_upload)))
+            if len(in_flight) >= max_in_flight:
+                collect()
+        # Kesilse bile gönderilmiş işler bitirilip yazılır
+        while in_flight:
+            collect()
+        self.flush(pending, checkpoint, options)
+
+    def flush(self, pending, checkpoint, options):
+        """Biriken sonuçları toplu yazar ve kontrol noktasını günceller"""
+        if pending:
+            now = timezone.now()
+            for audio_upload in pending:
+                # bulk_update auto_now alanlarını güncellemez; önbellek anahtarları updated_at'e bağlı
+                audio_upload.updated_at = now
+            AudioUpload.objects.bulk_update(pending, REPROCESS_FIELDS + ['updated_at'],
+                                            batch_size=options['batch_size'])
+            checkpoint['processed'] += len(pending)
+            pending.clear()
+        self.save_checkpoint(options['checkpoint'], checkpoint)
+        logging.info(
+            f"Kontrol noktası: #{checkpoint['last_pk']} ({checkpoint['processed']} işlendi, "
+            f"{checkpoint['failed']} başarısız)"
+        )
+
+    def load_checkpoint(self, path, filters):
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"Kontrol noktası bulunamadı: {path}")
+        if checkpoint.get('filters') != filters:
+            raise CommandError("Kontrol noktası farklı filtrelerle oluşturulmuş; aynı seçeneklerle çalıştırın")
+        return checkpoint
+
+    def save_checkpoint(self, path, checkpoint):
+        # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yazılır
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def request_stop(self, signum, frame):
+        logging.info("Durdurma sinyali alındı, gönderilen işler bitince çıkılacak")
+        self.stopping = True
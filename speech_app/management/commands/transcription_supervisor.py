@@ -0,0 +1,43 @@
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from speech_app.supervisor import WorkerSupervisor, get_autoscale_settings, serve_metrics
+
+
+class Command(BaseCommand):
+    help = ("Transkripsiyon worker süreçlerini kuyruktaki ses süresine ve CPU kullanımına göre "
+            "ölçekler; küçültmede worker'lar elindeki işi bitirip çıkar")
+
+    def add_arguments(self, parser):
+        config = get_autoscale_settings()
+        parser.add_argument('--min-workers', type=int, default=config['min_workers'])
+        parser.add_argument('--max-workers', type=int, default=config['max_workers'])
+        parser.add_argument('--interval', type=float,
+                            default=getattr(settings, 'TRANSCRIPTION_SUPERVISOR_INTERVAL', 10.0),
+                            help='Ölçek kararları arası süre (saniye)')
+        parser.add_argument('--metrics-port', type=int,
+                            default=getattr(settings, 'TRANSCRIPTION_SUPERVISOR_METRICS_PORT', 9105),
+                            help='Prometheus metrik portu (0: kapalı)')
+
+    def handle(self, *args, **options):
+        config = get_autoscale_settings()
+        config.update(min_workers=options['min_workers'], max_workers=options['max_workers'])
+        if not 0 <= config['min_workers'] <= config['max_workers'] or config['max_workers'] < 1:
+            raise CommandError("Geçersiz worker sınırları: 0 <= min <= max ve max >= 1 olmalı")
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        supervisor = WorkerSupervisor(config)
+        if options['metrics_port']:
+            serve_metrics(supervisor, options['metrics_port'])
+        logging.info(f"Denetleyici başladı ({config['min_workers']}-{config['max_workers']} worker)")
+        supervisor.run(interval=options['interval'], should_stop=lambda: self.stopping)
+
+    def request_stop(self, signum, frame):
+        logging.info("Durdurma sinyali alındı, worker'lar boşaltılıyor")
+        self.stopping = True
@@ -0,0 +1,42 @@
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from speech_app.worker import run_worker, warm_up
+
+
+class Command(BaseCommand):
+    help = "Bekleyen ses dosyalarını kuyruktan alıp transkripsiyonunu yapar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Kuyruk boşalınca çık')
+        parser.add_argument('--poll-interval', type=float,
+                            default=getattr(settings, 'TRANSCRIPTION_WORKER_POLL_INTERVAL', 2.0),
+                            help='Kuyruk boşken bekleme süresi (saniye)')
+        parser.add_argument('--no-warmup', action='store_true',
+                            help='Başlangıçta ses işleme yığınını ısıtma')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        if not options['no_warmup']:
+            timings = warm_up()
+            summary = ', '.join(f'{name}: {seconds:.2f}s' for name, seconds in timings.items())
+            logging.info(f"Worker ısındı ({summary})")
+
+        processed = run_worker(
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            should_stop=lambda: self.stopping,
+        )
+        self.stdout.write(f'{processed} kayıt işlendi')
+
+    def request_stop(self, signum, frame):
+        # Elindeki iş bittikten sonra çıkılır
+        logging.info("Durdurma sinyali alındı, mevcut iş bitince çıkılacak")
+        self.stopping = True
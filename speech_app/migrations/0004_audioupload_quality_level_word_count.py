@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+# Migrasyon anındaki eşikler (models.QUALITY_LEVELS ile aynı)
+QUALITY_THRESHOLDS = [(90, 'excellent'), (75, 'good'), (60, 'medium'), (0, 'low')]
+
+
+def backfill_quality_level_and_word_count(apps, schema_editor):
+    AudioUpload = apps.get_model('speech_app', 'AudioUpload')
+    batch = []
+    for upload in AudioUpload.objects.only('quality_score', 'transcription').iterator(chunk_size=500):
+        if upload.quality_score:
+            upload.quality_level = next(
+                code for threshold, code in QUALITY_THRESHOLDS if upload.quality_score >= threshold
+            )
+        if upload.transcription:
+            upload.word_count = len(upload.transcription.split())
+        batch.append(upload)
+        if len(batch) >= 500:
+            AudioUpload.objects.bulk_update(batch, ['quality_level', 'word_count'])
+            batch = []
+    if batch:
+        AudioUpload.objects.bulk_update(batch, ['quality_level', 'word_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0003_audioupload_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='quality_level',
+            field=models.CharField(blank=True, choices=[('excellent', 'Mükemmel'), ('good', 'İyi'), ('medium', 'Orta'), ('low', 'Düşük')], max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='word_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_quality_level_and_word_count, migrations.RunPython.noop),
+    ]
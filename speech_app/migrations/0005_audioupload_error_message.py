@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0004_audioupload_quality_level_word_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='error_message',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:21
+
+import speech_app.storage
+from django.db import migrations, models
+
+
+def backfill_stored_size(apps, schema_editor):
+    # Mevcut dosyalar sıkıştırılmamış orijinallerdir
+    AudioUpload = apps.get_model('speech_app', 'AudioUpload')
+    AudioUpload.objects.exclude(audio_file='').update(stored_size=models.F('file_size'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0005_audioupload_error_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='audio_compressed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='storage_tier',
+            field=models.CharField(choices=[('hot', 'Sıcak'), ('cold', 'Soğuk'), ('deleted', 'Silindi')], default='hot', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='stored_size',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='audioupload',
+            name='audio_file',
+            field=models.FileField(blank=True, storage=speech_app.storage.get_audio_storage, upload_to='audio_files/'),
+        ),
+        migrations.RunPython(backfill_stored_size, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0006_audioupload_storage_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='waveform_peaks',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0007_audioupload_waveform_peaks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='segments',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0008_audioupload_segments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='speaker_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0009_audioupload_speaker_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='detected_language',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='language_confidence',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
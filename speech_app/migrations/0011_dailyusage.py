@@ -0,0 +1,68 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_daily_usage(apps, schema_editor):
+    # Mevcut kayıtlardan bir kez toplanır; CPU süresi ve motor istekleri geçmişte tutulmadı
+    from django.db.models import Count, Q, Sum
+    from django.db.models.functions import Coalesce, TruncDate
+
+    AudioUpload = apps.get_model('speech_app', 'AudioUpload')
+    DailyUsage = apps.get_model('speech_app', 'DailyUsage')
+
+    usage = {}
+    uploads = (AudioUpload.objects.annotate(day=TruncDate('created_at'))
+               .values('user_id', 'day').annotate(count=Count('pk')))
+    for row in uploads:
+        usage[row['user_id'], row['day']] = DailyUsage(user_id=row['user_id'], date=row['day'], uploads=row['count'])
+
+    jobs = (AudioUpload.objects.filter(status__in=['completed', 'error'])
+            .annotate(day=TruncDate('updated_at')).values('user_id', 'day')
+            .annotate(completed=Count('pk', filter=Q(status='completed')),
+                      failed=Count('pk', filter=Q(status='error')),
+                      audio_seconds=Coalesce(Sum('duration'), 0.0),
+                      chunks=Coalesce(Sum('total_chunks'), 0)))
+    for row in jobs:
+        row_usage = usage.setdefault((row['user_id'], row['day']),
+                                     DailyUsage(user_id=row['user_id'], date=row['day']))
+        row_usage.jobs_completed = row['completed']
+        row_usage.jobs_failed = row['failed']
+        row_usage.audio_seconds = row['audio_seconds']
+        row_usage.chunks = row['chunks']
+    DailyUsage.objects.bulk_create(usage.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0010_audioupload_detected_language'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('uploads', models.PositiveIntegerField(default=0)),
+                ('jobs_completed', models.PositiveIntegerField(default=0)),
+                ('jobs_failed', models.PositiveIntegerField(default=0)),
+                ('audio_seconds', models.FloatField(default=0)),
+                ('chunks', models.PositiveIntegerField(default=0)),
+                ('engine_calls', models.PositiveIntegerField(default=0)),
+                ('cpu_seconds', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Günlük Kullanım',
+                'verbose_name_plural': 'Günlük Kullanım',
+                'ordering': ['-date', 'user'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_usage')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0011_dailyusage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='audioupload',
+            constraint=models.UniqueConstraint(fields=('user', 'content_hash'), name='unique_user_content_hash'),
+        ),
+    ]
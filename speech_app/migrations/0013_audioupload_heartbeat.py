@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0012_audioupload_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speech_app', '0013_audioupload_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioupload',
+            name='reserved_audio_seconds',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='audioupload',
+            name='reserved_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dailyusage',
+            name='reserved_audio_seconds',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -2,20 +2,38 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .storage import get_audio_storage
+
 # Create your models here.
 
+# Kalite seviyeleri: (alt sınır, kod, etiket, Bootstrap rengi)
+QUALITY_LEVELS = [
+    (90, 'excellent', 'Mükemmel', 'success'),
+    (75, 'good', 'İyi', 'info'),
+    (60, 'medium', 'Orta', 'warning'),
+    (0, 'low', 'Düşük', 'danger'),
+]
+QUALITY_LEVEL_LABELS = {code: label for _, code, label, _ in QUALITY_LEVELS}
+QUALITY_LEVEL_COLORS = {code: color for _, code, _, color in QUALITY_LEVELS}
+
 class AudioUpload(models.Model):
     """
     Model for storing uploaded audio files and their transcriptions
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='audio_uploads', default=1)
     title = models.CharField(max_length=200, blank=True, null=True)
-    audio_file = models.FileField(upload_to='audio_files/')
+    audio_file = models.FileField(upload_to='audio_files/', storage=get_audio_storage, blank=True)
     transcription = models.TextField(blank=True, null=True)
-    language = models.CharField(max_length=10, default='tr-TR')  # Varsayılan olarak Türkçe
+    language = models.CharField(max_length=10, default='tr-TR')  # Varsayılan olarak Türkçe ('auto': worker algılar)
+    # Worker'ın işlemden önce algıladığı dil (bkz. pipeline/language.py); kararsızsa boş
+    detected_language = models.CharField(max_length=10, blank=True, null=True)
+    language_confidence = models.FloatField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     file_size = models.IntegerField(blank=True, null=True)  # Bytes cinsinden
+    # Yüklenen baytların SHA-256 özeti (yükleme sırasında hesaplanır, bkz. uploads.py);
+    # aynı içerik aynı kullanıcıda bir kez bulunur, kullanıcılar arasında dosya paylaşılır
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     duration = models.FloatField(blank=True, null=True)  # Saniye cinsinden
     
     # Gelişmiş kalite ve istatistik alanları
@@ -24,6 +42,35 @@ class AudioUpload(models.Model):
     total_chunks = models.IntegerField(blank=True, null=True)  # Toplam parça sayısı
     successful_chunks = models.IntegerField(blank=True, null=True)  # Başarılı parça sayısı
     processing_method = models.CharField(max_length=50, blank=True, null=True)  # İşleme yöntemi
+    error_message = models.TextField(blank=True, null=True)  # Worker'ın bildirdiği hata
+    
+    # Listelemelerde yeniden hesaplanmaması için transkripsiyon bittiğinde yazılır
+    word_count = models.IntegerField(blank=True, null=True)  # Kelime sayısı
+    quality_level = models.CharField(
+        max_length=20,
+        blank=True,
+        null=True,
+        choices=[(code, label) for _, code, label, _ in QUALITY_LEVELS]
+    )
+    
+    # Orijinal dosyanın depolanma durumu (bkz. storage.py)
+    storage_tier = models.CharField(
+        max_length=10,
+        choices=[
+            ('hot', 'Sıcak'),
+            ('cold', 'Soğuk'),
+            ('deleted', 'Silindi')
+        ],
+        default='hot'
+    )
+    audio_compressed = models.BooleanField(default=False)  # Opus'a dönüştürüldü mü
+    stored_size = models.IntegerField(blank=True, null=True)  # Depodaki boyut (bytes)
+    # Oynatıcı için çok çözünürlüklü min/max tepe değerleri (bkz. pipeline/waveform.py);
+    # listelerde yüklenmemesi için sorgularda defer edilir
+    waveform_peaks = models.BinaryField(blank=True, null=True)
+    # Dışa aktarma için zamanlı metin bölümleri: [{'start', 'end', 'text'[, 'speaker']}, ...]
+    segments = models.JSONField(blank=True, null=True)
+    speaker_count = models.PositiveSmallIntegerField(blank=True, null=True)  # Ayrıştırılan konuşmacı sayısı
     
     status = models.CharField(
         max_length=20,
@@ -35,15 +82,31 @@ class AudioUpload(models.Model):
         ],
         default='pending'
     )
+    # İşleyen worker bu alanı düzenli yeniler; eskiyen 'processing' kayıtlar
+    # (çöken ya da öldürülen worker) yeniden sıraya alınır (bkz. worker.py)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)  # Worker'ın kaydı kaç kez aldığı
+    # Yüklemede kotadan ayrılan tahmini ses süresi ve ayrıldığı gün; iş bitince
+    # gerçek süreyle değiştirilir (bkz. usage.py)
+    reserved_audio_seconds = models.FloatField(default=0)
+    reserved_on = models.DateField(blank=True, null=True)
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Ses Dosyası'
         verbose_name_plural = 'Ses Dosyaları'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'content_hash'], name='unique_user_content_hash'),
+        ]
 
     def __str__(self):
         return self.title if self.title else f"Audio {self.id}"
 
+    def cache_key(self, *parts):
+        """Kayda özel önbellek anahtarı; kayıt kaydedildikçe (updated_at) değişir"""
+        version = self.updated_at.timestamp() if self.updated_at else 0
+        return ':'.join(['audioupload', str(self.pk), f'{version:.6f}', *parts])
+
     def get_file_size_mb(self):
         """File size in MB"""
         if self.file_size:
@@ -58,33 +121,44 @@ class AudioUpload(models.Model):
             return f"{minutes:02d}:{seconds:02d}"
         return None
 
+    def has_language_mismatch(self):
+        """Seçilen dil algılanan dilden farklı mı (bölge kodu yok sayılır)"""
+        if not self.detected_language or self.language == 'auto':
+            return False
+        return self.language.split('-')[0].lower() != self.detected_language.split('-')[0].lower()
+
+    def get_stored_size_mb(self):
+        """Stored (compressed) file size in MB"""
+        if self.stored_size:
+            return round(self.stored_size / (1024 * 1024), 2)
+        return None
+
+    @staticmethod
+    def quality_level_for(score):
+        """Kalite skoruna karşılık gelen seviye kodu"""
+        if not score:
+            return None
+        for threshold, code, _, _ in QUALITY_LEVELS:
+            if score >= threshold:
+                return code
+        return QUALITY_LEVELS[-1][1]
+
+    def set_quality(self, score):
+        """Kalite skorunu ve türetilen seviyeyi birlikte ayarlar"""
+        self.quality_score = score
+        self.quality_level = self.quality_level_for(score)
+
+    def _get_quality_level_code(self):
+        # Eski kayıtlarda seviye yazılmamış olabilir
+        return self.quality_level or self.quality_level_for(self.quality_score)
+
     def get_quality_level(self):
         """Get quality level description"""
-        if not self.quality_score:
-            return "Bilinmiyor"
-        
-        if self.quality_score >= 90:
-            return "Mükemmel"
-        elif self.quality_score >= 75:
-            return "İyi"
-        elif self.quality_score >= 60:
-            return "Orta"
-        else:
-            return "Düşük"
+        return QUALITY_LEVEL_LABELS.get(self._get_quality_level_code(), "Bilinmiyor")
 
     def get_quality_color(self):
         """Get Bootstrap color class for quality"""
-        if not self.quality_score:
-            return "secondary"
-        
-        if self.quality_score >= 90:
-            return "success"
-        elif self.quality_score >= 75:
-            return "info"
-        elif self.quality_score >= 60:
-            return "warning"
-        else:
-            return "danger"
+        return QUALITY_LEVEL_COLORS.get(self._get_quality_level_code(), "secondary")
 
     def get_processing_stats(self):
         """Get processing statistics"""
@@ -93,6 +167,38 @@ class AudioUpload(models.Model):
                 'total': self.total_chunks,
                 'successful': self.successful_chunks,
                 'failed': self.total_chunks - self.successful_chunks,
-                'success_rate': (self.successful_chunks / self.total_chunks) * 100
+                'success_rate': self.success_rate if self.success_rate is not None
+                else (self.successful_chunks / self.total_chunks) * 100
             }
         return None
+
+
+class DailyUsage(models.Model):
+    """
+    Kullanıcı başına günlük kullanım toplamları. Yüklemede ve iş bittiğinde
+    artırılır (bkz. usage.py); admin paneli ve kotalar yalnızca bu tabloyu okur.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_usage')
+    date = models.DateField()
+    uploads = models.PositiveIntegerField(default=0)
+    jobs_completed = models.PositiveIntegerField(default=0)
+    jobs_failed = models.PositiveIntegerField(default=0)
+    audio_seconds = models.FloatField(default=0)  # İşlenen ses süresi
+    reserved_audio_seconds = models.FloatField(default=0)  # Bekleyen yüklemelerin tahmini süresi
+    chunks = models.PositiveIntegerField(default=0)
+    engine_calls = models.PositiveIntegerField(default=0)  # Harici tanıma motoru istekleri
+    cpu_seconds = models.FloatField(default=0)  # Worker CPU süresi
+
+    class Meta:
+        ordering = ['-date', 'user']
+        verbose_name = 'Günlük Kullanım'
+        verbose_name_plural = 'Günlük Kullanım'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_usage'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date}"
+
+    def get_audio_minutes(self):
+        return round(self.audio_seconds / 60, 1)
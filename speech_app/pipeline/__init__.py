@@ -0,0 +1,8 @@
+"""
+Transkripsiyon worker'larına ait ses işleme paketi
+
+Buradaki modüller numpy, scipy, librosa, noisereduce, soundfile, soxr ve
+speech_recognition gibi ağır kütüphaneleri yükler. Web tarafı (views,
+urls, admin, templatetags) bu paketi import etmemelidir; bu kural
+``manage.py check --deploy`` ile denetlenir (speech_app.checks).
+"""
@@ -0,0 +1,183 @@
+"""
+Ses çözme ve yeniden örnekleme yardımcıları
+
+Dosya tek seferde çözülür, mono'ya indirilir ve tanıyıcının beklediği
+örnekleme hızına tek bir yeniden örnekleme adımıyla getirilir. Pipeline'ın
+geri kalanı bu float32 buffer üzerinde çalışır.
+"""
+import logging
+
+import numpy as np
+import soundfile as sf
+import soxr
+from django.conf import settings
+
+# speech_recognition'ın enerji ölçümünde kullandığı çerçeve boyu ve eşik oranı
+ENERGY_FRAME_LENGTH = 1024
+ENERGY_THRESHOLD_RATIO = 1.5
+# Gürültü tabanı olarak alınacak çerçeve RMS yüzdeliği
+NOISE_FLOOR_PERCENTILE = 10
+# Dosyanın yüksek sesli kısmı olarak alınacak çerçeve RMS yüzdeliği
+LOUD_PERCENTILE = 95
+# Parçanın tanımaya gönderilmesi için eşiği aşması gereken çerçeve oranı
+MIN_ACTIVE_FRAME_RATIO = 0.02
+
+# soxr kalite ön ayarları: QQ en hızlı, VHQ en kaliteli
+RESAMPLE_QUALITIES = ('QQ', 'LQ', 'MQ', 'HQ', 'VHQ')
+
+# soundfile'ın açamadığı formatlarda (m4a, bazı mp3'ler) ffmpeg'in soxr
+# yeniden örnekleyicisine verilecek hassasiyet (bit). QQ için ffmpeg'in
+# varsayılan (swr) yeniden örnekleyicisi kullanılır.
+FFMPEG_SOXR_PRECISION = {
+    'QQ': None,
+    'LQ': 16,
+    'MQ': 16,
+    'HQ': 20,
+    'VHQ': 28,
+}
+
+# Arşivlenen orijinaller için Opus ayarları. libsndfile Opus bit hızını
+# compression_level'dan kanal başına 6-256 kbit/s aralığında doğrusal türetir.
+OPUS_SAMPLE_RATE = 48000
+OPUS_MIN_BITRATE = 6
+OPUS_MAX_BITRATE = 256
+
+
+def get_target_sample_rate():
+    """Tanıyıcıların beklediği örnekleme hızı"""
+    return getattr(settings, 'TRANSCRIPTION_SAMPLE_RATE', 16000)
+
+
+def get_resample_quality(quality=None):
+    """Geçerli yeniden örnekleme kalitesini döndürür"""
+    quality = (quality or getattr(settings, 'AUDIO_RESAMPLE_QUALITY', 'HQ')).upper()
+    if quality not in RESAMPLE_QUALITIES:
+        raise ValueError(f"Geçersiz yeniden örnekleme kalitesi: {quality}")
+    return quality
+
+
+def resample(samples, orig_sr, target_sr, quality=None):
+    """Tek adımlı yeniden örnekleme (hız aynıysa kopyalamadan döner)"""
+    if orig_sr == target_sr:
+        return samples
+    resampled = soxr.resample(samples, orig_sr, target_sr, quality=get_resample_quality(quality))
+    return resampled.astype(np.float32, copy=False)
+
+
+def _decode_with_soundfile(path):
+    samples, native_sr = sf.read(path, dtype='float32', always_2d=True)
+    return samples, native_sr
+
+
+def _decode_with_ffmpeg(path, target_sr, quality):
+    import ffmpeg
+
+    output_args = {'format': 'f32le', 'ac': 1, 'ar': target_sr}
+    precision = FFMPEG_SOXR_PRECISION[quality]
+    if precision:
+        output_args['af'] = f'aresample=resampler=soxr:precision={precision}'
+
+    stdout, _ = (
+        ffmpeg
+        .input(path)
+        .output('pipe:', **output_args)
+        .run(capture_stdout=True, capture_stderr=True, cmd=['ffmpeg', '-nostdin'])
+    )
+    return np.frombuffer(stdout, dtype=np.float32).copy()
+
+
+def decode_audio(path, target_sr=None, quality=None):
+    """
+    Ses dosyasını hedef örnekleme hızında mono float32 buffer olarak çözer.
+
+    Döndürür: (samples, sample_rate)
+    """
+    target_sr = target_sr or get_target_sample_rate()
+    quality = get_resample_quality(quality)
+
+    try:
+        samples, native_sr = _decode_with_soundfile(path)
+    except (sf.LibsndfileError, RuntimeError) as e:
+        # soundfile desteklemiyorsa ffmpeg doğrudan hedef hıza ve mono'ya çözer
+        logging.info(f"soundfile çözemedi, ffmpeg kullanılıyor: {str(e)}")
+        return _decode_with_ffmpeg(path, target_sr, quality), target_sr
+
+    if samples.shape[1] > 1:
+        mono = samples.mean(axis=1, dtype=np.float32)
+    else:
+        mono = samples[:, 0]
+
+    return resample(np.ascontiguousarray(mono), native_sr, target_sr, quality), target_sr
+
+
+def to_int16(samples):
+    """float32 [-1, 1] buffer'ı kırparak int16 PCM'e çevirir"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def frame_rms(samples, frame_length=ENERGY_FRAME_LENGTH):
+    """Çerçeve bazında RMS (int16 biriminde); kısa buffer tek çerçevedir"""
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        frames = samples[np.newaxis, :]
+    else:
+        frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)) * 32767
+
+
+def estimate_energy_threshold(samples, frame_length=ENERGY_FRAME_LENGTH,
+                              percentile=NOISE_FLOOR_PERCENTILE, ratio=ENERGY_THRESHOLD_RATIO):
+    """
+    Tüm buffer üzerinde tek vektörel geçişle gürültü tabanını bulur ve
+    int16 RMS biriminde konuşma eşiği döndürür.
+
+    Dosyanın yüksek sesli kısmı bile eşiği aşmıyorsa (sürekli aynı seviyede
+    ses) sessizlik ayırt edilemez ve 0 döner.
+    """
+    if samples.size == 0:
+        return 0.0
+
+    rms = frame_rms(samples, frame_length)
+    threshold = float(np.percentile(rms, percentile) * ratio)
+    if np.percentile(rms, LOUD_PERCENTILE) <= threshold:
+        return 0.0
+    return threshold
+
+
+def has_speech_energy(samples, threshold, frame_length=ENERGY_FRAME_LENGTH, min_ratio=MIN_ACTIVE_FRAME_RATIO):
+    """Parçada eşiği aşan çerçevelerin oranı ``min_ratio`` ve üzerindeyse True"""
+    if not threshold:
+        return True
+    if samples.size == 0:
+        return False
+    return float(np.mean(frame_rms(samples, frame_length) > threshold)) >= min_ratio
+
+
+def dbfs(samples):
+    """RMS seviyesini tam ölçeğe göre dB cinsinden döndürür"""
+    if samples.size == 0:
+        return -np.inf
+    rms = np.sqrt(np.mean(np.square(samples, dtype=np.float64)))
+    if rms == 0:
+        return -np.inf
+    return 20 * np.log10(rms)
+
+
+def apply_gain(samples, gain_db):
+    """dB cinsinden kazanç uygular"""
+    return np.clip(samples * np.float32(10 ** (gain_db / 20)), -1.0, 1.0)
+
+
+def transcode_to_opus(source_path, target_path, bitrate=None):
+    """
+    Ses dosyasını mono Ogg/Opus olarak ``target_path``'e yazar.
+
+    ``bitrate`` kbit/s cinsindendir (varsayılan: settings.AUDIO_COMPRESSION_BITRATE).
+    """
+    bitrate = bitrate or getattr(settings, 'AUDIO_COMPRESSION_BITRATE', 32)
+    bitrate = min(max(bitrate, OPUS_MIN_BITRATE), OPUS_MAX_BITRATE)
+    compression_level = 1 - (bitrate - OPUS_MIN_BITRATE) / (OPUS_MAX_BITRATE - OPUS_MIN_BITRATE)
+
+    samples, sample_rate = decode_audio(source_path, target_sr=OPUS_SAMPLE_RATE)
+    sf.write(target_path, samples, sample_rate, format='OGG', subtype='OPUS',
+             compression_level=compression_level)
@@ -0,0 +1,302 @@
+"""
+CPU üzerinde konuşmacı ayrıştırma (diarization)
+
+Çözülmüş buffer üzerinde:
+1. Enerji tabanlı VAD ile konuşma bölgeleri bulunur.
+2. Konuşma bölgeleri kayan pencerelere bölünür; her pencere için MFCC
+   ortalama/std vektörü (gömme) kümülatif toplamlarla tek geçişte hesaplanır.
+3. Gömmeler küresel k-means ile kümelenir; birbirinden yeterince
+   ayrışmayan kümeler birleştirilir (tek konuşmacılı kayıtlar için).
+4. Pencere etiketleri yumuşatılıp konuşmacı dönüşlerine çevrilir.
+
+Tüm adımlar NumPy ile vektörel çalışır; model ya da GPU gerekmez.
+"""
+import logging
+
+import numpy as np
+from django.conf import settings
+
+# VAD çerçevesi ve adımı (saniye)
+FRAME_SECONDS = 0.032
+HOP_SECONDS = 0.010
+# Konuşma eşiği: gürültü tabanının (çerçeve RMS yüzdeliği) bu katı
+VAD_NOISE_PERCENTILE = 10
+VAD_THRESHOLD_RATIO = 3.0
+# Bu sürelerden kısa sessizlikler doldurulur, kısa konuşmalar atılır
+VAD_MIN_SILENCE_SECONDS = 0.3
+VAD_MIN_SPEECH_SECONDS = 0.25
+# Çerçeve enerjisi bu kadar çerçevelik bloklarla hesaplanır (~1 dakika)
+VAD_BLOCK_FRAMES = 6000
+
+# Gömme penceresi ve adımı (saniye); daha kısa konuşma bölgeleri tek pencere olur
+WINDOW_SECONDS = 1.5
+WINDOW_HOP_SECONDS = 0.75
+MIN_WINDOW_SECONDS = 0.5
+N_MFCC = 20
+
+KMEANS_ITERATIONS = 20
+# İki kümenin ayrı konuşmacı sayılması için gereken en az Fisher oranı
+# (merkezler arası uzaklık / küme içi std). Tek modlu bir dağılımı ikiye
+# bölen k-means çok pencerede ~3 verir; pencere sayısı gömme boyutuna
+# yaklaştıkça bu değer büyür (10 pencerede ~6, %95'lik dilimi ~10). Eşik bu
+# yüzden 1 + boyut / pencere katıyla ölçeklenir (bkz. separation_threshold).
+MIN_SPEAKER_SEPARATION = 4.0
+# Pencerelerin bu oranından azını alan küme ayrı konuşmacı sayılmaz
+MIN_SPEAKER_SHARE = 0.05
+# Etiket yumuşatma (pencere sayısı, tek)
+SMOOTHING_WINDOWS = 3
+
+
+def get_max_speakers():
+    return getattr(settings, 'DIARIZATION_MAX_SPEAKERS', 2)
+
+
+def mask_runs(mask):
+    """Boolean dizideki True bölgelerinin (başlangıç, bitiş) indeksleri"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def detect_speech(samples, sample_rate):
+    """
+    Enerji tabanlı VAD.
+
+    Döndürür: (konuşma maskesi (çerçeve başına), çerçeve adımı (örnek))
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    if len(samples) < frame:
+        return np.zeros(0, dtype=bool), hop
+
+    # Çerçeve enerjisi kümülatif kare toplamından alınır; örtüşen çerçeveler
+    # ayrı ayrı kopyalanmaz ve toplam bloklar halinde hesaplandığı için ek
+    # bellek kayıt uzunluğundan bağımsızdır
+    starts = np.arange(0, len(samples) - frame + 1, hop)
+    rms = np.empty(len(starts), dtype=np.float32)
+    for block in range(0, len(starts), VAD_BLOCK_FRAMES):
+        block_starts = starts[block:block + VAD_BLOCK_FRAMES]
+        offset = block_starts[0]
+        energy = np.zeros(block_starts[-1] + frame - offset + 1, dtype=np.float64)
+        np.cumsum(np.square(samples[offset:block_starts[-1] + frame], dtype=np.float64), out=energy[1:])
+        local = block_starts - offset
+        rms[block:block + len(block_starts)] = np.sqrt(np.maximum(energy[local + frame] - energy[local], 0.0) / frame)
+    noise_floor = max(np.percentile(rms, VAD_NOISE_PERCENTILE), 1e-4)
+    mask = rms > noise_floor * VAD_THRESHOLD_RATIO
+
+    # Kısa sessizlikleri doldur
+    starts, ends = mask_runs(~mask)
+    short = (ends - starts) < VAD_MIN_SILENCE_SECONDS / HOP_SECONDS
+    for start, end in zip(starts[short], ends[short]):
+        if start > 0 and end < len(mask):
+            mask[start:end] = True
+
+    # Kısa konuşmaları at
+    starts, ends = mask_runs(mask)
+    for start, end in zip(starts, ends):
+        if end - start < VAD_MIN_SPEECH_SECONDS / HOP_SECONDS:
+            mask[start:end] = False
+    return mask, hop
+
+
+def _windows(speech_mask):
+    """Konuşma bölgelerini kayan pencerelere böler (çerçeve indeksleri)"""
+    window = int(WINDOW_SECONDS / HOP_SECONDS)
+    step = int(WINDOW_HOP_SECONDS / HOP_SECONDS)
+    minimum = int(MIN_WINDOW_SECONDS / HOP_SECONDS)
+
+    window_starts, window_ends = [], []
+    for start, end in zip(*mask_runs(speech_mask)):
+        if end - start < minimum:
+            continue
+        if end - start <= window:
+            window_starts.append(start)
+            window_ends.append(end)
+            continue
+        region_starts = np.arange(start, end - window + 1, step)
+        window_starts.extend(region_starts)
+        window_ends.extend(region_starts + window)
+        if region_starts[-1] + window < end:
+            # Bölgenin sonu son pencereye sığmadıysa sona hizalı bir pencere eklenir
+            window_starts.append(end - window)
+            window_ends.append(end)
+    return np.array(window_starts, dtype=np.int64), np.array(window_ends, dtype=np.int64)
+
+
+def embed_windows(samples, sample_rate, window_starts, window_ends, hop):
+    """
+    Pencere başına MFCC ortalama/std gömmesi. MFCC bir kez hesaplanır; pencere
+    istatistikleri kümülatif toplamlardan tek vektörel işlemle çıkarılır.
+    """
+    import librosa
+
+    mfcc = librosa.feature.mfcc(
+        y=samples, sr=sample_rate, n_mfcc=N_MFCC, n_fft=2 * int(FRAME_SECONDS * sample_rate),
+        hop_length=hop
+    )[1:].T  # c0 (enerji) konuşmacıdan çok ses seviyesini yansıtır
+    cumulative = np.vstack([np.zeros((1, mfcc.shape[1])), np.cumsum(mfcc, axis=0, dtype=np.float64)])
+    cumulative_sq = np.vstack([np.zeros((1, mfcc.shape[1])), np.cumsum(np.square(mfcc, dtype=np.float64), axis=0)])
+
+    ends = np.minimum(window_ends, len(mfcc))
+    starts = np.minimum(window_starts, ends - 1)
+    counts = (ends - starts)[:, None]
+    mean = (cumulative[ends] - cumulative[starts]) / counts
+    variance = (cumulative_sq[ends] - cumulative_sq[starts]) / counts - np.square(mean)
+    embeddings = np.hstack([mean, np.sqrt(np.maximum(variance, 0))])
+
+    # Dosya içi standardizasyon
+    embeddings -= embeddings.mean(axis=0)
+    embeddings /= embeddings.std(axis=0) + 1e-8
+    return embeddings
+
+
+def _spherical_kmeans(embeddings, k):
+    """Kosinüs benzerliğiyle k-means; ilk merkezler en uzak nokta yöntemiyle seçilir"""
+    normalized = embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
+    centroids = [normalized[0]]
+    for _ in range(1, k):
+        similarity = np.max(normalized @ np.array(centroids).T, axis=1)
+        centroids.append(normalized[np.argmin(similarity)])
+    centroids = np.array(centroids)
+
+    labels = np.zeros(len(normalized), dtype=np.int64)
+    for _ in range(KMEANS_ITERATIONS):
+        new_labels = np.argmax(normalized @ centroids.T, axis=1)
+        if np.array_equal(new_labels, labels) and _ > 0:
+            break
+        labels = new_labels
+        for cluster in range(k):
+            members = normalized[labels == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[cluster] = centroid / (np.linalg.norm(centroid) + 1e-8)
+    return labels
+
+
+def _separation(embeddings, labels, a, b):
+    """İki küme arasındaki Fisher oranı (merkezleri birleştiren eksen üzerinde)"""
+    first, second = embeddings[labels == a], embeddings[labels == b]
+    axis = first.mean(axis=0) - second.mean(axis=0)
+    distance = np.linalg.norm(axis)
+    if distance == 0:
+        return 0.0
+    axis /= distance
+    within = np.sqrt((np.var(first @ axis) * len(first) + np.var(second @ axis) * len(second))
+                     / (len(first) + len(second)))
+    return distance / (within + 1e-8)
+
+
+def separation_threshold(window_count, dimensions):
+    """Kısa kayıtlarda k-means'in tek konuşmacıyı bölmesini önleyen Fisher oranı eşiği"""
+    return MIN_SPEAKER_SEPARATION * (1 + dimensions / max(window_count, 1))
+
+
+def cluster_speakers(embeddings, max_speakers):
+    """
+    Gömmeleri en fazla ``max_speakers`` konuşmacıya kümeler.
+
+    Döndürür: pencere başına 0'dan başlayan konuşmacı etiketi
+    """
+    if len(embeddings) < 2 or max_speakers < 2:
+        return np.zeros(len(embeddings), dtype=np.int64)
+
+    labels = _spherical_kmeans(embeddings, min(max_speakers, len(embeddings)))
+    min_separation = separation_threshold(*embeddings.shape)
+
+    # Küçük ya da ayrışmayan kümeleri en yakın kümeyle birleştir
+    while True:
+        clusters = np.unique(labels)
+        if len(clusters) < 2:
+            break
+        shares = np.array([np.mean(labels == cluster) for cluster in clusters])
+        pairs = [(a, b) for i, a in enumerate(clusters) for b in clusters[i + 1:]]
+        scores = [_separation(embeddings, labels, a, b) for a, b in pairs]
+        weakest = int(np.argmin(scores))
+        if shares.min() >= MIN_SPEAKER_SHARE and scores[weakest] >= min_separation:
+            break
+        if shares.min() < MIN_SPEAKER_SHARE:
+            small = clusters[np.argmin(shares)]
+            others = [c for c in clusters if c != small]
+            target = others[int(np.argmax([-_separation(embeddings, labels, small, c) for c in others]))]
+            labels[labels == small] = target
+        else:
+            a, b = pairs[weakest]
+            labels[labels == b] = a
+
+    # Etiketleri konuşma sırasına göre 0, 1, ... olarak yeniden numaralandır
+    _, first_seen = np.unique(labels, return_index=True)
+    order = np.unique(labels)[np.argsort(first_seen)]
+    remap = {old: new for new, old in enumerate(order)}
+    return np.array([remap[label] for label in labels], dtype=np.int64)
+
+
+def _smooth(labels):
+    """Tekil etiket sıçramalarını çoğunluk oyu ile düzeltir"""
+    if len(labels) < SMOOTHING_WINDOWS:
+        return labels
+    half = SMOOTHING_WINDOWS // 2
+    padded = np.pad(labels, half, mode='edge')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, SMOOTHING_WINDOWS)
+    counts = np.apply_along_axis(np.bincount, 1, windows, minlength=labels.max() + 1)
+    return np.argmax(counts, axis=1)
+
+
+def diarize(samples, sample_rate, max_speakers=None):
+    """
+    Buffer'daki konuşmacı dönüşlerini bulur.
+
+    Döndürür: [(başlangıç, bitiş, konuşmacı), ...] (saniye, konuşmacı 0'dan başlar)
+    """
+    max_speakers = max_speakers or get_max_speakers()
+    speech_mask, hop = detect_speech(samples, sample_rate)
+    window_starts, window_ends = _windows(speech_mask)
+    if len(window_starts) == 0:
+        return []
+
+    embeddings = embed_windows(samples, sample_rate, window_starts, window_ends, hop)
+    labels = _smooth(cluster_speakers(embeddings, max_speakers))
+
+    # Örtüşen pencerelerde her çerçeve, merkezi en yakın pencerenin etiketini alır
+    frame_labels = np.full(len(speech_mask), -1, dtype=np.int64)
+    centers = (window_starts + window_ends) / 2
+    speech_frames = np.flatnonzero(speech_mask)
+    nearest = np.clip(np.searchsorted(centers, speech_frames), 1, len(centers) - 1) if len(centers) > 1 else None
+    if nearest is None:
+        frame_labels[speech_frames] = labels[0]
+    else:
+        left_closer = (speech_frames - centers[nearest - 1]) < (centers[nearest] - speech_frames)
+        frame_labels[speech_frames] = labels[np.where(left_closer, nearest - 1, nearest)]
+
+    turns = []
+    changes = np.flatnonzero(np.diff(frame_labels)) + 1
+    boundaries = np.concatenate(([0], changes, [len(frame_labels)]))
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        speaker = int(frame_labels[start])
+        if speaker >= 0:
+            turns.append((round(start * HOP_SECONDS, 3), round(end * HOP_SECONDS, 3), speaker))
+
+    logging.info(f"Diarization: {len(set(t[2] for t in turns))} konuşmacı, {len(turns)} dönüş")
+    return turns
+
+
+def assign_speakers(timed_words, turns):
+    """
+    Kelimeleri, orta noktalarının düştüğü (ya da en yakın) konuşmacı dönüşüne atar.
+
+    Döndürür: kelime başına 1'den başlayan konuşmacı listesi (dönüş yoksa None)
+    """
+    if not turns or not timed_words:
+        return None
+    turn_starts = np.array([start for start, _, _ in turns])
+    turn_ends = np.array([end for _, end, _ in turns])
+    turn_speakers = np.array([speaker for _, _, speaker in turns])
+    midpoints = np.array([(start + end) / 2 for _, start, end in timed_words])
+
+    index = np.clip(np.searchsorted(turn_starts, midpoints, side='right') - 1, 0, len(turns) - 1)
+    # Dönüş dışında kalan kelime (sessizlik) bir sonraki dönüş daha yakınsa ona atanır
+    following = np.minimum(index + 1, len(turns) - 1)
+    use_following = (midpoints > turn_ends[index]) & (
+        turn_starts[following] - midpoints < midpoints - turn_ends[index]
+    )
+    index = np.where(use_following, following, index)
+    return (turn_speakers[index] + 1).tolist()
@@ -0,0 +1,216 @@
+"""
+Harici tanıma motorları için süreçler arası hız sınırı ve devre kesici
+
+Her motorun durumu (token kovası ve devre durumu) ``ENGINE_STATE_DIR``
+altındaki küçük bir JSON dosyasında tutulur ve ``fcntl.flock`` ile
+kilitlenir; aynı makinedeki tüm worker süreçleri aynı kovayı ve devreyi
+paylaşır.
+
+Devre durumları:
+    closed     istekler geçer; ardışık hata sayısı eşiği aşarsa ya da motor
+               hız sınırı (429) bildirirse devre açılır
+    open       soğuma süresince istek gönderilmez, çağıran hemen
+               EngineUnavailable alır (yedek motora yönlendirir ya da erteler)
+    half_open  soğuma bitince tek bir deneme isteği geçer; başarılıysa devre
+               kapanır, başarısızsa soğuma süresi ikiye katlanarak yeniden açılır
+"""
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import speech_recognition as sr
+from django.conf import settings
+
+# Motorun hız sınırına takıldığımızı gösteren hata metinleri
+THROTTLE_MARKERS = ('429', 'too many requests', 'quota', 'rate limit')
+
+# Bu süreçte motorlara gönderilen istek sayısı (kullanım muhasebesi için)
+_request_count = 0
+_request_count_lock = threading.Lock()
+
+
+class EngineUnavailable(Exception):
+    """Motor şu an kullanılamıyor (devre açık ya da token beklemesi çok uzun)"""
+
+    def __init__(self, engine, retry_after, reason):
+        super().__init__(f"{engine} kullanılamıyor ({reason}), {retry_after:.1f}s sonra denenebilir")
+        self.engine = engine
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def get_engine_config(name):
+    engines = getattr(settings, 'RECOGNITION_ENGINES', {})
+    config = {
+        'rate': 5.0, 'burst': 10, 'timeout': 15, 'endpoint': None,
+        'failure_threshold': getattr(settings, 'ENGINE_FAILURE_THRESHOLD', 5),
+        'cooldown': getattr(settings, 'ENGINE_COOLDOWN_SECONDS', 30),
+        'max_cooldown': getattr(settings, 'ENGINE_MAX_COOLDOWN_SECONDS', 600),
+        'max_wait': getattr(settings, 'ENGINE_MAX_WAIT_SECONDS', 5),
+    }
+    config.update(engines.get(name, {}))
+    return config
+
+
+def get_state_dir():
+    return getattr(settings, 'ENGINE_STATE_DIR', None) or os.path.join(tempfile.gettempdir(), 'speechtotext-engines')
+
+
+class EngineGuard:
+    """Tek bir motorun paylaşılan token kovası ve devre kesicisi"""
+
+    def __init__(self, name, config=None, state_dir=None):
+        self.name = name
+        self.config = config or get_engine_config(name)
+        state_dir = state_dir or get_state_dir()
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f'{name}.json')
+
+    def _initial_state(self):
+        return {
+            'tokens': float(self.config['burst']), 'refilled_at': time.time(),
+            'circuit': 'closed', 'failures': 0, 'open_count': 0,
+            'opened_at': 0.0, 'cooldown': 0.0, 'probe_until': 0.0,
+        }
+
+    @contextmanager
+    def _state(self):
+        """Durumu dosya kilidi altında okur; blok sonunda geri yazar"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o660)
+        with os.fdopen(fd, 'r+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(f.read() or 'null') or self._initial_state()
+                except ValueError:
+                    state = self._initial_state()
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state['refilled_at'])
+        state['tokens'] = min(float(self.config['burst']), state['tokens'] + elapsed * self.config['rate'])
+        state['refilled_at'] = now
+
+    def acquire(self, max_wait=None):
+        """
+        Bir istek hakkı alır. Devre açıksa ya da token için ``max_wait``
+        saniyeden uzun beklemek gerekiyorsa EngineUnavailable fırlatır.
+        """
+        max_wait = self.config['max_wait'] if max_wait is None else max_wait
+        waited = 0.0
+        while True:
+            with self._state() as state:
+                now = time.time()
+                if state['circuit'] == 'open' and now < state['opened_at'] + state['cooldown']:
+                    raise EngineUnavailable(self.name, state['opened_at'] + state['cooldown'] - now, 'open')
+                if state['circuit'] == 'half_open' and now < state['probe_until']:
+                    raise EngineUnavailable(self.name, state['probe_until'] - now, 'half_open')
+
+                self._refill(state, now)
+                if state['tokens'] >= 1:
+                    state['tokens'] -= 1
+                    if state['circuit'] != 'closed':
+                        # Soğuma bitti: bu istek deneme isteğidir, diğerleri sonucu bekler
+                        state['circuit'] = 'half_open'
+                        state['probe_until'] = now + self.config['timeout'] + 1
+                    return
+                wait = (1 - state['tokens']) / self.config['rate']
+
+            if waited + wait > max_wait:
+                raise EngineUnavailable(self.name, wait, 'rate')
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self):
+        with self._state() as state:
+            if state['circuit'] != 'closed':
+                logging.info(f"{self.name} devresi kapandı")
+            state.update(circuit='closed', failures=0, open_count=0)
+
+    def record_failure(self, throttled=False):
+        with self._state() as state:
+            now = time.time()
+            state['failures'] += 1
+            if throttled:
+                # Sınıra takıldıysak kovadaki birikmiş hak da kullanılmamalı
+                state['tokens'] = 0.0
+                state['refilled_at'] = now
+            if throttled or state['circuit'] == 'half_open' or state['failures'] >= self.config['failure_threshold']:
+                state['open_count'] += 1
+                state['cooldown'] = min(self.config['max_cooldown'],
+                                        self.config['cooldown'] * 2 ** (state['open_count'] - 1))
+                state.update(circuit='open', opened_at=now, failures=0)
+                logging.warning(
+                    f"{self.name} devresi açıldı ({'hız sınırı' if throttled else 'ardışık hatalar'}), "
+                    f"{state['cooldown']:.0f}s istek gönderilmeyecek"
+                )
+
+    def snapshot(self):
+        with self._state() as state:
+            self._refill(state, time.time())
+            return dict(state)
+
+    def reset(self):
+        with self._state() as state:
+            state.clear()
+            state.update(self._initial_state())
+
+    def call(self, func, *args, **kwargs):
+        """
+        ``func``'ı hız sınırı ve devre kesici altında çağırır. Motorun
+        ulaşılamaması/zaman aşımı hata sayılır; sesin anlaşılamaması
+        (UnknownValueError) motorun çalıştığını gösterir.
+        """
+        global _request_count
+
+        self.acquire()
+        with _request_count_lock:
+            _request_count += 1
+        try:
+            result = func(*args, **kwargs)
+        except sr.UnknownValueError:
+            self.record_success()
+            raise
+        except sr.RequestError as e:
+            message = str(e).lower()
+            self.record_failure(throttled=any(marker in message for marker in THROTTLE_MARKERS))
+            raise
+        except OSError as e:
+            # Yanıt okunurken oluşan zaman aşımı urllib tarafından sarılmaz
+            self.record_failure()
+            raise sr.RequestError(f"recognition connection failed: {str(e)}")
+        self.record_success()
+        return result
+
+
+def request_count():
+    """Süreç başladığından beri gönderilen harici tanıma isteği sayısı"""
+    return _request_count
+
+
+@lru_cache(maxsize=None)
+def get_engine_guard(name):
+    return EngineGuard(name)
+
+
+def recognize_google(audio_data, language, show_all=False):
+    """Google tanıma isteği (zaman aşımı, uç nokta ve koruma ayarlarıyla)"""
+    config = get_engine_config('google')
+    recognizer = sr.Recognizer()
+    recognizer.operation_timeout = config['timeout']
+    kwargs = {'endpoint': config['endpoint']} if config['endpoint'] else {}
+    return get_engine_guard('google').call(
+        recognizer.recognize_google, audio_data, language=language, show_all=show_all, **kwargs
+    )
@@ -0,0 +1,210 @@
+"""
+Kayıt dilinin otomatik algılanması
+
+Tam işlemden önce VAD ile seçilen birkaç saniyelik konuşma, aday dillerin
+her biriyle paralel olarak tanınır. Her aday, tanıyıcının güveni ve
+metnin o dile ait görünme oranıyla puanlanır. Sonuç dosya içeriğinin
+özetiyle önbelleğe alınır; aynı dosya yeniden yüklendiğinde tanıyıcıya
+gidilmez. Kullanıcı dili kendisi seçtiyse tanıyıcıya algılama isteği
+gönderilmez, yalnızca önbellekteki sonuç kullanılır.
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import speech_recognition as sr
+from django.conf import settings
+from django.core.cache import cache
+
+from .audio import to_int16
+from .diarization import HOP_SECONDS, detect_speech, mask_runs
+from .engines import EngineUnavailable, recognize_google
+
+AUTO_LANGUAGE = 'auto'
+
+# Google güven skoru döndürmediğinde kullanılan değer
+DEFAULT_CONFIDENCE = 0.5
+# Kazananın ikinciyi en az bu kadar geçmesi gerekir
+MIN_SCORE_MARGIN = 0.1
+# Seçilen konuşma bölgelerinin arasına konan sessizlik (saniye)
+CLIP_GAP_SECONDS = 0.2
+
+# Metnin dile ait görünme oranı için sık kelimeler
+LANGUAGE_HINT_WORDS = {
+    'tr': {'ve', 'bir', 'bu', 'da', 'de', 'ne', 'için', 'ile', 'ben', 'sen', 'o', 'biz', 'çok', 'var',
+           'yok', 'evet', 'hayır', 'ama', 'gibi', 'daha', 'şey', 'olarak', 'mi', 'mı', 'değil', 'kadar',
+           'nasıl', 'şimdi', 'tamam', 'merhaba', 'teşekkürler', 'sonra', 'önce', 'her', 'yani'},
+    'en': {'the', 'and', 'a', 'to', 'of', 'is', 'in', 'it', 'you', 'that', 'i', 'we', 'for', 'on',
+           'with', 'this', 'be', 'are', 'was', 'have', 'not', 'but', 'what', 'so', 'yes', 'no', 'can',
+           'do', 'will', 'my', 'your', 'they', 'there', 'hello', 'thanks', 'okay', 'just', 'about'},
+}
+TURKISH_CHARACTERS_RE = re.compile('[çğıöşüÇĞİÖŞÜ]')
+WORD_RE = re.compile(r'\w+')
+
+
+def get_candidates():
+    return list(getattr(settings, 'LANGUAGE_DETECTION_CANDIDATES', ['tr-TR', 'en-US']))
+
+
+def base_language(language_code):
+    return (language_code or '').split('-')[0].lower()
+
+
+def select_speech(samples, sample_rate, seconds):
+    """
+    VAD ile bulunan en uzun konuşma bölgelerinden toplam ``seconds`` saniyelik
+    bir klip oluşturur (bölgeler zaman sırasıyla, araya kısa sessizlik konarak).
+    """
+    speech_mask, hop = detect_speech(samples, sample_rate)
+    starts, ends = mask_runs(speech_mask)
+    if len(starts) == 0:
+        return samples[:int(seconds * sample_rate)]
+
+    budget = int(seconds / HOP_SECONDS)
+    selected = []
+    for index in np.argsort(starts - ends, kind='stable'):  # en uzun bölge önce
+        if budget <= 0:
+            break
+        length = min(ends[index] - starts[index], budget)
+        selected.append((starts[index], starts[index] + length))
+        budget -= length
+
+    gap = np.zeros(int(CLIP_GAP_SECONDS * sample_rate), dtype=samples.dtype)
+    parts = []
+    for start, end in sorted(selected):
+        parts.extend([samples[start * hop:end * hop], gap])
+    return np.concatenate(parts[:-1])
+
+
+def text_language_score(text, language_code):
+    """Metindeki kelimelerin ``language_code`` diline ait görünme oranı (0-1)"""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return 0.0
+    language = base_language(language_code)
+    own = LANGUAGE_HINT_WORDS.get(language, set())
+    others = set().union(*(hints for code, hints in LANGUAGE_HINT_WORDS.items() if code != language))
+    score = 0.0
+    for word in words:
+        if word in own or (language == 'tr' and TURKISH_CHARACTERS_RE.search(word)):
+            score += 1
+        elif word in others:
+            score -= 1
+    return max(0.0, min(1.0, 0.5 + score / (2 * len(words))))
+
+
+def _probe(audio_data, language_code):
+    """
+    Klibi tek bir dille tanır.
+
+    Döndürür: (puan, metin); tanıyıcıya ulaşılamazsa None
+    """
+    try:
+        response = recognize_google(audio_data, language_code, show_all=True)
+    except sr.UnknownValueError:
+        # Boş sonuç: tanıyıcı çalışıyor ama bu dilde konuşma bulamadı
+        return 0.0, ''
+    except (EngineUnavailable, sr.RequestError) as e:
+        logging.warning(f"Dil algılama ({language_code}) isteği başarısız: {str(e)}")
+        return None
+    alternatives = response.get('alternative', []) if isinstance(response, dict) else []
+    if not alternatives or not alternatives[0].get('transcript'):
+        return 0.0, ''
+    text = alternatives[0]['transcript']
+    confidence = alternatives[0].get('confidence', DEFAULT_CONFIDENCE)
+    return confidence * (0.5 + 0.5 * text_language_score(text, language_code)), text
+
+
+def detect_language(samples, sample_rate, candidates=None):
+    """
+    Kaydın dilini aday diller arasından seçer.
+
+    Döndürür: {'language': ... ya da None (kararsız), 'confidence': ..., 'scores': {...}};
+    tanıyıcıya hiç ulaşılamazsa None
+    """
+    candidates = candidates or get_candidates()
+    seconds = getattr(settings, 'LANGUAGE_DETECTION_SECONDS', 8.0)
+    clip = select_speech(samples, sample_rate, seconds)
+    audio_data = sr.AudioData(to_int16(clip).tobytes(), sample_rate, 2)
+
+    with ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix='language') as executor:
+        probes = dict(zip(candidates, executor.map(lambda code: _probe(audio_data, code), candidates)))
+
+    scores = {code: probe[0] for code, probe in probes.items() if probe is not None}
+    if not scores:
+        return None
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    min_confidence = getattr(settings, 'LANGUAGE_DETECTION_MIN_CONFIDENCE', 0.5)
+    confident = best_score >= min_confidence and best_score - runner_up >= MIN_SCORE_MARGIN
+    return {
+        'language': best if confident else None,
+        'confidence': round(best_score, 3),
+        'scores': {code: round(score, 3) for code, score in scores.items()},
+    }
+
+
+def detection_cache_key(audio_upload, candidates):
+    """
+    Algılama sonucunun önbellek anahtarı. Yüklemede hesaplanan içerik özeti
+    yoksa dosya yeniden okunmaz; anahtar kayda ve son güncellemesine bağlanır.
+    """
+    if audio_upload.content_hash:
+        identity = audio_upload.content_hash
+    else:
+        updated_at = audio_upload.updated_at.timestamp() if audio_upload.updated_at else ''
+        identity = f"upload:{audio_upload.pk}:{updated_at}"
+    return f"language:{identity}:{','.join(candidates)}"
+
+
+def _cached_detection(audio_upload, samples, sample_rate, probe=True):
+    """
+    ``detect_language`` sonucu, önbellekten ya da (``probe`` ise) yeniden.
+    Önbellekte yoksa ve ``probe`` False ise None döner.
+    """
+    candidates = get_candidates()
+    key = detection_cache_key(audio_upload, candidates)
+    result = cache.get(key)
+    if result is not None:
+        logging.info("Dil algılama sonucu önbellekten alındı")
+        return result
+    if not probe:
+        return None
+
+    result = detect_language(samples, sample_rate, candidates)
+    # Tanıyıcıya ulaşılamadıysa (None) sonuç önbelleğe alınmaz, sonraki iş yeniden dener
+    if result is not None:
+        cache.set(key, result, getattr(settings, 'LANGUAGE_DETECTION_CACHE_TIMEOUT', 30 * 24 * 3600))
+    return result
+
+
+def apply_language_detection(audio_upload, samples, sample_rate):
+    """
+    Algılanan dili kayda yazar. 'auto' seçilmişse kaydın dili algılanan dil
+    (kararsızsa LANGUAGE_DETECTION_DEFAULT) olur. Kullanıcı dil seçtiyse
+    tanıyıcıya algılama isteği gönderilmez ve seçim korunur; aynı içerik için
+    önbellekte sonuç varsa uyuşmazlık detay sayfasında uyarı olarak gösterilir.
+    """
+    result = None
+    if getattr(settings, 'LANGUAGE_DETECTION_ENABLED', True):
+        result = _cached_detection(audio_upload, samples, sample_rate,
+                                   probe=audio_upload.language == AUTO_LANGUAGE)
+
+    if result is not None:
+        audio_upload.detected_language = result['language']
+        audio_upload.language_confidence = result['confidence']
+        logging.info(f"Algılanan dil: {result['language'] or 'kararsız'} (puanlar: {result['scores']})")
+
+    if audio_upload.language == AUTO_LANGUAGE:
+        audio_upload.language = audio_upload.detected_language or getattr(
+            settings, 'LANGUAGE_DETECTION_DEFAULT', 'tr-TR'
+        )
+    elif audio_upload.has_language_mismatch():
+        logging.warning(
+            f"#{audio_upload.pk} seçilen dil ({audio_upload.language}) algılanan dille "
+            f"({audio_upload.detected_language}) uyuşmuyor"
+        )
+    return result
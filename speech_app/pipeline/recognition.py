@@ -0,0 +1,114 @@
+"""
+Tanıma motorları için süreç başına paylaşılan kaynaklar
+
+Sphinx decoder'ı akustik model, dil modeli ve sözlüğü her oluşturulduğunda
+diskten yükler. Bu yüzden her süreçte bir kez oluşturulur ve parçalar ile
+işler arasında yeniden kullanılır.
+"""
+import logging
+import os
+import threading
+import time
+
+import speech_recognition as sr
+from django.conf import settings
+
+# Sphinx modelleri 16kHz, 16-bit mono PCM bekler
+SPHINX_SAMPLE_RATE = 16000
+SPHINX_SAMPLE_WIDTH = 2
+
+_recognizers = {}
+_recognizers_pid = None
+_recognizers_lock = threading.Lock()
+
+
+def get_sphinx_model_paths(language):
+    """
+    Dil koduna ait (akustik model, dil modeli, sözlük) yollarını döndürür.
+    ``language`` doğrudan bu üç yolu içeren bir tuple da olabilir.
+    """
+    if isinstance(language, tuple):
+        return language
+
+    language_directory = os.path.join(
+        os.path.dirname(os.path.realpath(sr.__file__)), 'pocketsphinx-data', language
+    )
+    return (
+        os.path.join(language_directory, 'acoustic-model'),
+        os.path.join(language_directory, 'language-model.lm.bin'),
+        os.path.join(language_directory, 'pronounciation-dictionary.dict'),
+    )
+
+
+class OfflineRecognizer:
+    """
+    Modelleri bir kez yükleyip tekrar kullanan Sphinx tanıyıcısı
+    """
+
+    def __init__(self, language='en-US'):
+        try:
+            from pocketsphinx import pocketsphinx
+        except ImportError:
+            raise sr.RequestError("missing PocketSphinx module: ensure that PocketSphinx is set up correctly.")
+
+        acoustic_model, language_model, dictionary = get_sphinx_model_paths(language)
+        for path in (acoustic_model, language_model, dictionary):
+            if not os.path.exists(path):
+                raise sr.RequestError(f"missing PocketSphinx data: \"{path}\"")
+
+        start = time.perf_counter()
+        config = pocketsphinx.Decoder.default_config()
+        config.set_string('-hmm', acoustic_model)
+        config.set_string('-lm', language_model)
+        config.set_string('-dict', dictionary)
+        config.set_string('-logfn', os.devnull)
+        self.decoder = pocketsphinx.Decoder(config)
+        self.load_seconds = time.perf_counter() - start
+
+        self.language = language
+        # Decoder thread-safe değil; aynı süreçteki thread'ler sırayla kullanır
+        self._lock = threading.Lock()
+        logging.info(f"Sphinx modelleri yüklendi ({language}, {self.load_seconds:.2f}s)")
+
+    def _decode(self, raw_data):
+        self.decoder.start_utt()
+        self.decoder.process_raw(raw_data, False, True)
+        self.decoder.end_utt()
+        hypothesis = self.decoder.hyp()
+        return hypothesis.hypstr if hypothesis is not None and hypothesis.hypstr else None
+
+    @staticmethod
+    def _raw_data(audio_data):
+        return audio_data.get_raw_data(convert_rate=SPHINX_SAMPLE_RATE, convert_width=SPHINX_SAMPLE_WIDTH)
+
+    def recognize(self, audio_data):
+        """Tek bir ``AudioData`` için metni döndürür (tanınamazsa None)"""
+        raw_data = self._raw_data(audio_data)
+        with self._lock:
+            return self._decode(raw_data)
+
+
+def get_offline_recognizer(language=None):
+    """
+    Bu süreç için paylaşılan ``OfflineRecognizer`` örneğini döndürür.
+    Fork sonrası (ör. gunicorn --preload) alt süreç kendi decoder'ını oluşturur.
+    """
+    global _recognizers_pid
+
+    language = language or getattr(settings, 'SPHINX_LANGUAGE', 'en-US')
+    with _recognizers_lock:
+        if _recognizers_pid != os.getpid():
+            _recognizers.clear()
+            _recognizers_pid = os.getpid()
+
+        recognizer = _recognizers.get(language)
+        if recognizer is None:
+            recognizer = OfflineRecognizer(language)
+            _recognizers[language] = recognizer
+        return recognizer
+
+
+def has_offline_fallback(language):
+    """Sphinx modeli bu dil için anlamlı sonuç verebilir mi (ana dil kodu eşleşmesi)"""
+    offline_language = getattr(settings, 'SPHINX_LANGUAGE', 'en-US')
+    return language.split('-')[0].lower() == offline_language.split('-')[0].lower()
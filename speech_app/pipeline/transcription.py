@@ -0,0 +1,366 @@
+"""
+Transkripsiyon pipeline'ı
+
+Bu modül ses işleme kütüphanelerini (numpy, librosa, noisereduce,
+speech_recognition) yükler ve yalnızca transkripsiyon worker'ları
+tarafından içe aktarılır (bkz. speech_app.pipeline).
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import librosa
+import noisereduce as nr
+import numpy as np
+import speech_recognition as sr
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .audio import decode_audio, dbfs, apply_gain, estimate_energy_threshold, has_speech_energy, to_int16
+from .diarization import assign_speakers, diarize
+from .engines import EngineUnavailable, recognize_google
+from .language import apply_language_detection
+from .recognition import get_offline_recognizer, has_offline_fallback
+from .waveform import compute_peaks, encode_peaks
+from ..text_processing import (
+    CHUNK_OVERLAP_SECONDS, build_segments, clean_and_improve_text, timed_text_joining,
+    text_statistics, calculate_quality_score
+)
+
+def enhance_audio_quality(samples, sample_rate):
+    """
+    Ses kalitesini iyileştiren fonksiyon
+    """
+    try:
+        # 1. Gürültü azaltma
+        reduced_noise = nr.reduce_noise(y=samples, sr=sample_rate, prop_decrease=0.8)
+        
+        # 2. Ses normalizasyonu
+        normalized_audio = librosa.util.normalize(reduced_noise)
+        
+        # 3. Sessizlik temizleme
+        trimmed_audio, _ = librosa.effects.trim(normalized_audio, top_db=20)
+        
+        # 4. Ses seviyesi dengeleme
+        # RMS tabanlı ses seviyesi ayarı
+        rms = librosa.feature.rms(y=trimmed_audio)[0]
+        mean_rms = np.mean(rms)
+        if mean_rms > 0:
+            trimmed_audio = trimmed_audio / mean_rms * 0.1
+        
+        return trimmed_audio, True
+        
+    except Exception as e:
+        logging.error(f"Ses iyileştirme hatası: {str(e)}")
+        return samples, False
+
+def prepare_audio_data(samples, sample_rate):
+    """
+    Parçayı iyileştirip tanıyıcıların kullanacağı AudioData'ya çevirir
+    """
+    # Ses kalitesini iyileştir (buffer üzerinde, ek dosya yazmadan)
+    enhanced_samples, _ = enhance_audio_quality(samples, sample_rate)
+    
+    # Parçanın tamamı kullanılır (ortam gürültüsü ölçümü için ses tüketilmez)
+    return sr.AudioData(to_int16(enhanced_samples).tobytes(), sample_rate, 2)
+
+def transcribe_with_multiple_engines(audio_data, language_code):
+    """
+    Birden fazla speech recognition engine kullanarak transkripsiyon yapar
+    
+    Sphinx yalnızca modeli parçanın dilini kapsıyorsa çalıştırılır.
+    Google kullanılamıyorsa ve dil için offline yedek yoksa EngineUnavailable
+    fırlatılır; çağıran parçayı erteler.
+    """
+    results = []
+    
+    google_unavailable = None
+    try:
+        # 1. Google Speech Recognition (tek istek; en iyi sonuç ve alternatifler
+        # aynı yanıttan alınır, hız sınırı ve devre kesici engines.py'de)
+        try:
+            google_response = recognize_google(audio_data, language_code, show_all=True)
+            alternatives = [alt for alt in google_response.get('alternative', []) if alt.get('transcript')]
+            if alternatives:
+                results.append({
+                    'engine': 'Google',
+                    'text': alternatives[0]['transcript'],
+                    'confidence': 0.9  # Google için varsayılan güven skoru
+                })
+                logging.info(f"Google başarılı: {len(alternatives[0]['transcript'])} karakter")
+            for alt in alternatives[:2]:  # İlk 2 alternatif
+                results.append({
+                    'engine': 'Google_Alt',
+                    'text': alt['transcript'],
+                    'confidence': alt.get('confidence', 0.7)
+                })
+        except EngineUnavailable as e:
+            google_unavailable = e
+            logging.info(f"Google atlandı: {str(e)}")
+        except sr.UnknownValueError:
+            logging.info("Google parçada konuşma bulamadı")
+        except Exception as e:
+            logging.warning(f"Google API hatası: {str(e)}")
+        
+        # 2. Sphinx (Offline - fallback, süreç başına paylaşılan decoder);
+        # başka dilin modeliyle çözmek yalnızca anlamsız metin üretir
+        try:
+            sphinx_result = None
+            if has_offline_fallback(language_code):
+                sphinx_result = get_offline_recognizer().recognize(audio_data)
+            if sphinx_result:
+                results.append({
+                    'engine': 'Sphinx',
+                    'text': sphinx_result,
+                    'confidence': 0.6  # Sphinx için düşük güven skoru
+                })
+                logging.info(f"Sphinx başarılı: {len(sphinx_result)} karakter")
+        except Exception as e:
+            logging.warning(f"Sphinx hatası: {str(e)}")
+        
+        # Google kullanılamıyorsa ve bu dil için yedek motor yoksa parça ertelenir
+        if google_unavailable and not has_offline_fallback(language_code):
+            raise google_unavailable
+        
+        # En iyi sonucu seç
+        if results:
+            # Güven skoruna ve metin uzunluğuna göre sıralama
+            best_result = max(results, key=lambda x: (x['confidence'], len(x['text'])))
+            
+            # Eğer birden fazla sonuç varsa, en uzun ve güvenilir olanı seç
+            filtered_results = [r for r in results if len(r['text']) > 10]  # Çok kısa metinleri filtrele
+            if filtered_results:
+                best_result = max(filtered_results, key=lambda x: x['confidence'])
+            
+            logging.info(f"En iyi sonuç: {best_result['engine']} (güven: {best_result['confidence']})")
+            return best_result['text'], True
+        else:
+            return None, False
+            
+    except EngineUnavailable:
+        raise
+    except Exception as e:
+        logging.error(f"Transkripsiyon hatası: {str(e)}")
+        return None, False
+
+def collect_diarization(future):
+    """Paralel ayrıştırmanın sonucu; hata transkripsiyonu durdurmaz"""
+    if future is None:
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        logging.warning(f"Konuşmacı ayrıştırma hatası: {str(e)}")
+        return None
+
+def process_audio_transcription(audio_upload, persist=True):
+    """
+    Gelişmiş ses dosyası transkripsiyon fonksiyonu
+    - Ses kalitesi iyileştirme
+    - Birden fazla recognition engine
+    - Akıllı parçalama ve birleştirme
+    
+    ``persist`` False ise alanlar yalnızca nesne üzerinde güncellenir, kayıt
+    çağıran tarafından (ör. toplu yeniden işlemede bulk_update ile) yazılır.
+    """
+    diarization_executor = None
+    try:
+        logging.info(f"Transkripsiyon başlatıldı: {audio_upload.title}")
+        
+        # Dosya yolunu al
+        audio_path = audio_upload.audio_file.path
+        
+        # Audio dosyasını tek seferde hedef hıza (16kHz) ve mono'ya çöz
+        samples, sample_rate = decode_audio(audio_path)
+        
+        # Ses dosyasının süresini hesapla
+        duration_seconds = len(samples) / sample_rate
+        audio_upload.duration = duration_seconds
+        
+        # Oynatıcının dalga formu aynı buffer'dan, dosya yeniden okunmadan çıkarılır
+        audio_upload.waveform_peaks = encode_peaks(compute_peaks(samples), sample_rate)
+        
+        # Dil tam işlemden önce kısa bir konuşma klibinden algılanır
+        apply_language_detection(audio_upload, samples, sample_rate)
+        if persist:
+            # Yalnızca pipeline'ın yazdığı alanlar kaydedilir; dosya alanları bu sırada
+            # aynı dosyayı paylaşan başka bir kayıt üzerinden değişmiş olabilir
+            audio_upload.save(update_fields=[
+                'duration', 'waveform_peaks', 'language', 'detected_language', 'language_confidence', 'updated_at',
+            ])
+        
+        logging.info(f"Dosya süresi: {duration_seconds:.2f} saniye ({sample_rate}Hz mono)")
+        
+        # Konuşmacı ayrıştırma aynı buffer üzerinde tanımayla paralel çalışır
+        # (tanıma çoğunlukla ağ/Sphinx beklerken NumPy GIL'i bırakır)
+        diarization_executor = diarization_future = None
+        if getattr(settings, 'DIARIZATION_ENABLED', True):
+            diarization_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='diarization')
+            diarization_future = diarization_executor.submit(diarize, samples, sample_rate)
+        
+        # Gürültü eşiği dosya başına bir kez, tüm buffer üzerinden hesaplanır;
+        # eşiği aşmayan (sessiz) parçalar hiçbir motora gönderilmez
+        energy_threshold = estimate_energy_threshold(samples)
+        logging.info(f"Enerji eşiği: {energy_threshold:.1f}")
+        
+        # Adaptif parçalama - ses kalitesine göre parça boyutu ayarla
+        base_chunk_length = 45 if duration_seconds > 300 else 60  # 5dk+ dosyalar için daha kısa parçalar
+        chunk_length = base_chunk_length * sample_rate
+        
+        # Overlap ekle - parçalar arası bilgi kaybını engelle
+        overlap = int(CHUNK_OVERLAP_SECONDS * sample_rate)  # 5 saniye overlap
+        
+        chunks = []
+        chunk_starts = []
+        for i in range(0, len(samples), chunk_length - overlap):
+            end_pos = min(i + chunk_length, len(samples))
+            chunk = samples[i:end_pos]
+            if len(chunk) > 10 * sample_rate:  # 10 saniyeden uzun parçaları al
+                chunks.append(chunk)
+                chunk_starts.append(i / sample_rate)
+        
+        logging.info(f"Ses dosyası {len(chunks)} parçaya bölündü (parça boyutu: {base_chunk_length}s)")
+        
+        # Parçaları tanımaya hazırla
+        audio_datas = []
+        for i, chunk in enumerate(chunks):
+            if not has_speech_energy(chunk, energy_threshold):
+                logging.info(f"Parça {i+1} sessiz, tanımaya gönderilmedi")
+                audio_datas.append(None)
+                continue
+            
+            # Ses kalitesini optimize et
+            optimized_chunk = chunk
+            chunk_dbfs = dbfs(chunk)
+            
+            # Ses seviyesi çok düşükse yükselt
+            if chunk_dbfs < -30:
+                optimized_chunk = apply_gain(chunk, abs(chunk_dbfs) - 20)
+                logging.info(f"Parça {i+1} ses seviyesi yükseltildi")
+            
+            # Çok yüksek ses seviyesini düşür
+            elif chunk_dbfs > -6:
+                optimized_chunk = apply_gain(chunk, -(chunk_dbfs + 10))
+                logging.info(f"Parça {i+1} ses seviyesi düşürüldü")
+            
+            try:
+                audio_datas.append(prepare_audio_data(optimized_chunk, sample_rate))
+            except Exception as e:
+                logging.error(f"Parça {i+1} hazırlama hatası: {str(e)}")
+                audio_datas.append(None)
+        
+        # Her parçayı gelişmiş transkripsiyon ile işle
+        # (tanınamayan parçalar None kalır; birleştirmede komşuluk bilgisi korunur)
+        transcriptions = [None] * len(chunks)
+        successful_chunks = 0
+        
+        def recognize_chunk(i):
+            """Parçayı tanır; motor kullanılamıyorsa EngineUnavailable fırlatır"""
+            nonlocal successful_chunks
+            try:
+                text, success = transcribe_with_multiple_engines(audio_datas[i], audio_upload.language)
+            except EngineUnavailable:
+                raise
+            except Exception as e:
+                logging.error(f"Parça {i+1} transkripsiyon hatası: {str(e)}")
+                return
+            
+            if success and text and len(text.strip()) > 0:
+                # Metin temizleme ve iyileştirme
+                cleaned_text = clean_and_improve_text(text, audio_upload.language)
+                transcriptions[i] = cleaned_text
+                successful_chunks += 1
+                logging.info(f"Parça {i+1} başarılı: {len(cleaned_text)} karakter")
+            else:
+                logging.warning(f"Parça {i+1} sessiz veya tanınamadı")
+        
+        # Motor kullanılamadığı için ertelenen parçalar
+        deferred = []
+        for i, audio_data in enumerate(audio_datas):
+            logging.info(f"Parça {i+1}/{len(chunks)} işleniyor...")
+            
+            if audio_data is None:
+                continue
+            
+            try:
+                recognize_chunk(i)
+            except EngineUnavailable as e:
+                deferred.append(i)
+                logging.info(f"Parça {i+1} ertelendi: {str(e)}")
+        
+        # Ertelenen parçalar devre yeniden denenebilir olduğunda işlenir; her parça
+        # ayrı ayrı zaman aşımına uğramak yerine hepsi aynı bekleme süresini paylaşır
+        deadline = time.monotonic() + getattr(settings, 'ENGINE_DEFER_MAX_SECONDS', 300)
+        while deferred and time.monotonic() < deadline:
+            try:
+                recognize_chunk(deferred[0])
+                deferred.pop(0)
+            except EngineUnavailable as e:
+                time.sleep(max(0.0, min(e.retry_after, deadline - time.monotonic())))
+        if deferred:
+            logging.warning(f"{len(deferred)} parça tanıma motoru kullanılamadığı için tanınamadı")
+        
+        # Sonuçları değerlendir ve birleştir
+        if successful_chunks:
+            # Akıllı metin birleştirme (örtüşen bölgeler kelime düzeyinde hizalanır);
+            # kelimeler parçaların zaman aralıklarıyla dışa aktarma bölümlerine ayrılır
+            timed_words = timed_text_joining(
+                transcriptions,
+                chunk_starts,
+                [len(chunk) / sample_rate for chunk in chunks],
+                overlap_seconds=CHUNK_OVERLAP_SECONDS
+            )
+            full_text = ' '.join(word for word, _, _ in timed_words)
+            speakers = assign_speakers(timed_words, collect_diarization(diarization_future))
+            audio_upload.segments = build_segments(timed_words, speakers=speakers)
+            audio_upload.speaker_count = len(set(speakers)) if speakers else None
+            
+            success_rate = (successful_chunks / len(chunks)) * 100
+            text_stats = text_statistics(full_text)
+            quality_score = calculate_quality_score(text_stats, success_rate, duration_seconds)
+            
+            # İstatistikleri veritabanına kaydet (listelemeler yeniden hesaplamaz)
+            audio_upload.success_rate = success_rate
+            audio_upload.set_quality(quality_score)
+            audio_upload.word_count = text_stats['words']
+            audio_upload.total_chunks = len(chunks)
+            audio_upload.successful_chunks = successful_chunks
+            audio_upload.processing_method = "Enhanced Multi-Engine"
+            if persist:
+                # Tanıma dakikalar sürebilir; bu sürede kopan ya da ömrü dolan
+                # bağlantı kullanılmadan önce denetlenip yenilenir
+                close_old_connections()
+                audio_upload.save(update_fields=[
+                    'segments', 'speaker_count', 'success_rate', 'quality_score', 'quality_level', 'word_count',
+                    'total_chunks', 'successful_chunks', 'processing_method', 'updated_at',
+                ])
+            
+            logging.info(f"Transkripsiyon tamamlandı. Başarı oranı: {success_rate:.1f}%, Kalite: {quality_score:.1f}")
+            logging.info(f"Toplam metin uzunluğu: {len(full_text)} karakter")
+            
+            return {
+                'success': True,
+                'text': full_text,
+                'stats': {
+                    'total_chunks': len(chunks),
+                    'successful_chunks': successful_chunks,
+                    'success_rate': success_rate,
+                    'text_length': len(full_text)
+                }
+            }
+        else:
+            return {
+                'success': False,
+                'error': 'Ses dosyasında hiç metin tespit edilemedi. Lütfen dosyanın konuşma içerdiğinden ve ses kalitesinin yeterli olduğundan emin olun.'
+            }
+    
+    except Exception as e:
+        logging.error(f"Ana transkripsiyon hatası: {str(e)}")
+        return {
+            'success': False,
+            'error': f'Ses dosyası işlenirken beklenmeyen hata oluştu: {str(e)}'
+        }
+    finally:
+        if diarization_executor is not None:
+            diarization_executor.shutdown(wait=True, cancel_futures=True)
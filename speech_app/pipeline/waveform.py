@@ -0,0 +1,113 @@
+"""
+Detay sayfasındaki oynatıcı için dalga formu tepe değerleri
+
+Transkripsiyon sırasında çözülmüş buffer'dan çok çözünürlüklü min/max
+tepe değerleri çıkarılır ve küçük bir ikili blob olarak saklanır. Blob
+düzeni (little-endian):
+
+    başlık:  4s magic ('PEAK'), B sürüm, B seviye sayısı, H ayrılmış, I örnekleme hızı
+    seviye:  I tepe başına örnek, I tepe sayısı            (her seviye için)
+    veri:    int8 min, int8 max çiftleri                   (seviyeler sırayla)
+
+İlk seviye en ayrıntılı olandır; sonrakiler bir öncekinin ``LEVEL_FACTOR``
+kat kaba halidir.
+"""
+import struct
+
+import numpy as np
+
+PEAKS_MAGIC = b'PEAK'
+PEAKS_VERSION = 1
+HEADER = struct.Struct('<4sBBHI')
+LEVEL_HEADER = struct.Struct('<II')
+
+# En ayrıntılı seviyede tepe başına en az örnek (16 kHz'de ~62 tepe/saniye)
+MIN_SAMPLES_PER_PEAK = 256
+# En ayrıntılı seviyedeki tepe sayısı sınırı (uzun dosyalarda blob ~64 KB'ı aşmaz)
+MAX_PEAKS = 32768
+# Seviyeler arası kabalaştırma oranı ve en kaba seviyenin alt sınırı
+LEVEL_FACTOR = 4
+MIN_LEVEL_PEAKS = 256
+
+
+def _frame_min_max(samples, samples_per_peak):
+    """Buffer'ı sabit boylu çerçevelere bölüp her çerçevenin min/max'ını alır"""
+    full_count = len(samples) // samples_per_peak
+    body = samples[:full_count * samples_per_peak].reshape(full_count, samples_per_peak)
+    mins, maxs = body.min(axis=1), body.max(axis=1)
+    tail = samples[full_count * samples_per_peak:]
+    if tail.size:
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    return mins, maxs
+
+
+def _coarsen(mins, maxs, factor):
+    """Bir seviyeyi ``factor`` komşu tepeyi birleştirerek kabalaştırır"""
+    padding = -len(mins) % factor
+    if padding:
+        # Son değeri tekrarlamak min/max sonucunu değiştirmez
+        mins = np.append(mins, np.repeat(mins[-1], padding))
+        maxs = np.append(maxs, np.repeat(maxs[-1], padding))
+    return mins.reshape(-1, factor).min(axis=1), maxs.reshape(-1, factor).max(axis=1)
+
+
+def _quantize(values):
+    return np.clip(np.round(values * 127), -127, 127).astype(np.int8)
+
+
+def compute_peaks(samples):
+    """
+    float32 buffer'dan çok çözünürlüklü tepe değerlerini hesaplar.
+
+    Döndürür: [(tepe başına örnek, int8 min dizisi, int8 max dizisi), ...]
+    """
+    if samples.size == 0:
+        return []
+
+    samples_per_peak = max(MIN_SAMPLES_PER_PEAK, -(-len(samples) // MAX_PEAKS))
+    mins, maxs = _frame_min_max(samples, samples_per_peak)
+    mins, maxs = _quantize(mins), _quantize(maxs)
+
+    levels = [(samples_per_peak, mins, maxs)]
+    while len(mins) > MIN_LEVEL_PEAKS * LEVEL_FACTOR:
+        mins, maxs = _coarsen(mins, maxs, LEVEL_FACTOR)
+        samples_per_peak *= LEVEL_FACTOR
+        levels.append((samples_per_peak, mins, maxs))
+    return levels
+
+
+def encode_peaks(levels, sample_rate):
+    """``compute_peaks`` çıktısını saklanacak ikili blob'a çevirir"""
+    parts = [HEADER.pack(PEAKS_MAGIC, PEAKS_VERSION, len(levels), 0, sample_rate)]
+    parts.extend(LEVEL_HEADER.pack(samples_per_peak, len(mins)) for samples_per_peak, mins, _ in levels)
+    for _, mins, maxs in levels:
+        interleaved = np.empty(len(mins) * 2, dtype=np.int8)
+        interleaved[0::2] = mins
+        interleaved[1::2] = maxs
+        parts.append(interleaved.tobytes())
+    return b''.join(parts)
+
+
+def decode_peaks(blob):
+    """
+    ``encode_peaks`` blob'unu çözer.
+
+    Döndürür: (sample_rate, [(tepe başına örnek, int8 min, int8 max), ...])
+    """
+    magic, version, level_count, _, sample_rate = HEADER.unpack_from(blob)
+    if magic != PEAKS_MAGIC or version != PEAKS_VERSION:
+        raise ValueError("Geçersiz dalga formu verisi")
+
+    offset = HEADER.size
+    headers = []
+    for _ in range(level_count):
+        headers.append(LEVEL_HEADER.unpack_from(blob, offset))
+        offset += LEVEL_HEADER.size
+
+    levels = []
+    for samples_per_peak, count in headers:
+        data = np.frombuffer(blob, dtype=np.int8, count=count * 2, offset=offset)
+        levels.append((samples_per_peak, data[0::2], data[1::2]))
+        offset += count * 2
+    return sample_rate, levels
@@ -0,0 +1,116 @@
+"""
+Dosya yanıtları için HTTP yardımcıları
+"""
+import mimetypes
+import os
+import re
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Ogg/Opus'u tarayıcılar 'audio/ogg' olarak oynatır
+AUDIO_CONTENT_TYPES = {
+    '.ogg': 'audio/ogg',
+    '.opus': 'audio/ogg',
+    '.m4a': 'audio/mp4',
+    '.flac': 'audio/flac',
+    '.wav': 'audio/wav',
+}
+
+
+def guess_audio_content_type(name):
+    extension = os.path.splitext(name)[1].lower()
+    return AUDIO_CONTENT_TYPES.get(extension) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def open_file_size(file):
+    """Açık dosyanın diskteki gerçek boyutu; dosya tanımlayıcısı yoksa (ör. S3) None"""
+    try:
+        return os.fstat(file.fileno()).st_size
+    except (AttributeError, OSError):
+        return None
+
+
+def parse_range(header, size):
+    """
+    Tek aralıklı 'bytes=' başlığını çözer.
+
+    Döndürür: (start, end) - end dahil; başlık yoksa ya da desteklenmiyorsa
+    None. Karşılanamayan aralıkta ValueError fırlatır.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        # Çoklu aralıklar desteklenmez, tüm dosya döner
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 'bytes=-500': son 500 byte
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _iter_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def ranged_file_response(request, file, size, filename, as_attachment=False):
+    """
+    Açık dosyayı Range isteklerine (206) uyarak döndürür; tarayıcıdaki
+    oynatıcı dosyanın tamamını indirmeden ileri sarabilir.
+    """
+    content_type = guess_audio_content_type(filename)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(_iter_range(file, start, length), status=status, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Cache-Control'] = 'private'
+    return response
+
+
+def accel_redirect_response(uri, filename, as_attachment=False):
+    """
+    Aktarımı nginx'e bırakan boş yanıt. nginx dosyayı internal location'dan
+    sendfile ile gönderir ve Range isteklerini kendisi karşılar.
+    """
+    response = HttpResponse(content_type=guess_audio_content_type(filename))
+    response['X-Accel-Redirect'] = uri
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    response['Cache-Control'] = 'private'
+    return response
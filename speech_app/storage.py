@@ -0,0 +1,227 @@
+"""
+Orijinal ses dosyaları için katmanlı depolama
+
+Yeni yüklemeler sıcak katmanda (MEDIA_ROOT) durur. Eskiyen dosyalar
+``settings.AUDIO_COLD_STORAGE`` ile tanımlanan soğuk katmana (yerel dizin ya
+da S3 uyumlu bir depolama) taşınır; saklama süresi dolanlar silinir. Dosya
+adı katmanı belirler: 'cold/' önekli adlar soğuk katmandadır.
+"""
+import logging
+import os
+from datetime import timedelta
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+COLD_PREFIX = 'cold/'
+
+# Katman değişikliği yalnızca biten işlerde yapılır
+FINISHED_STATUSES = ('completed', 'error')
+# Bu durumdaki kayıtların dosyası worker tarafından okunuyor ya da okunacak
+ACTIVE_STATUSES = ('pending', 'processing')
+
+
+@lru_cache(maxsize=None)
+def get_cold_storage():
+    """settings.AUDIO_COLD_STORAGE'dan soğuk katman depolamasını oluşturur"""
+    config = settings.AUDIO_COLD_STORAGE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+@deconstructible
+class TieredAudioStorage(Storage):
+    """Adın önekine göre sıcak (varsayılan) ya da soğuk depolamaya yönlendirir"""
+
+    def _route(self, name):
+        if name.startswith(COLD_PREFIX):
+            return get_cold_storage(), name[len(COLD_PREFIX):], COLD_PREFIX
+        return default_storage, name, ''
+
+    def _open(self, name, mode='rb'):
+        storage, name, _ = self._route(name)
+        return storage.open(name, mode)
+
+    def _save(self, name, content):
+        storage, name, prefix = self._route(name)
+        return prefix + storage.save(name, content)
+
+    def delete(self, name):
+        storage, name, _ = self._route(name)
+        storage.delete(name)
+
+    def exists(self, name):
+        storage, name, _ = self._route(name)
+        return storage.exists(name)
+
+    def size(self, name):
+        storage, name, _ = self._route(name)
+        return storage.size(name)
+
+    def path(self, name):
+        storage, name, _ = self._route(name)
+        return storage.path(name)
+
+    def url(self, name):
+        storage, name, _ = self._route(name)
+        return storage.url(name)
+
+    def listdir(self, path):
+        storage, path, _ = self._route(path)
+        return storage.listdir(path)
+
+    def get_modified_time(self, name):
+        storage, name, _ = self._route(name)
+        return storage.get_modified_time(name)
+
+
+audio_storage = TieredAudioStorage()
+
+
+def get_audio_storage():
+    """AudioUpload.audio_file alanının depolaması"""
+    return audio_storage
+
+
+def is_cold(name):
+    return bool(name) and name.startswith(COLD_PREFIX)
+
+
+def get_accel_redirect_uri(name):
+    """
+    Dosyanın nginx internal location'ındaki URI'si (X-Accel-Redirect için).
+    Katmanın location'ı tanımlı değilse (ör. S3) None döner.
+    """
+    locations = getattr(settings, 'AUDIO_ACCEL_REDIRECT_LOCATIONS', {})
+    if is_cold(name):
+        location, name = locations.get('cold'), name[len(COLD_PREFIX):]
+    else:
+        location = locations.get('hot')
+    if not location:
+        return None
+    return location + quote(name)
+
+
+def is_in_use(name, exclude_pk=None):
+    """Dosyayı bekleyen ya da işlenen başka bir kayıt gösteriyorsa True"""
+    from .models import AudioUpload
+
+    return AudioUpload.objects.filter(audio_file=name, status__in=ACTIVE_STATUSES).exclude(pk=exclude_pk).exists()
+
+
+def replace_audio_file(audio_upload, content, name, storage_tier=None):
+    """
+    Kaydın ses dosyasını ``content`` ile değiştirir, kaydı günceller ve eski
+    dosyayı siler. Eski dosya ancak kayıt yeni adı gösterdikten sonra silinir.
+
+    Dosyayı paylaşan kayıtlardan biri bekliyor ya da işleniyorsa hiçbir şey
+    yapılmaz ve None döner; değişiklik o iş bittikten sonra yeniden denenir.
+    """
+    from .models import AudioUpload
+
+    old_name = audio_upload.audio_file.name
+    if old_name and is_in_use(old_name, audio_upload.pk):
+        logging.info(f"#{audio_upload.pk} dosyası işlenmekte olan başka bir kayıtla paylaşılıyor, ertelendi")
+        return None
+    new_name = audio_storage.save(name, content)
+
+    audio_upload.audio_file.name = new_name
+    audio_upload.stored_size = audio_storage.size(new_name)
+    audio_upload.storage_tier = storage_tier or ('cold' if is_cold(new_name) else 'hot')
+    audio_upload.save(update_fields=['audio_file', 'stored_size', 'storage_tier', 'audio_compressed', 'updated_at'])
+    if old_name:
+        # Tekrar eden yüklemelerle aynı dosyayı paylaşan kayıtlar da yeni dosyayı gösterir
+        AudioUpload.objects.filter(audio_file=old_name).exclude(pk=audio_upload.pk).update(
+            audio_file=new_name, stored_size=audio_upload.stored_size, storage_tier=audio_upload.storage_tier,
+            audio_compressed=audio_upload.audio_compressed, updated_at=timezone.now(),
+        )
+
+    if old_name and old_name != new_name:
+        try:
+            audio_storage.delete(old_name)
+        except OSError as e:
+            logging.warning(f"Eski ses dosyası silinemedi ({old_name}): {str(e)}")
+    return new_name
+
+
+def move_to_cold(audio_upload):
+    """Ses dosyasını soğuk katmana taşır"""
+    name = audio_upload.audio_file.name
+    if name and not audio_storage.exists(name):
+        # Paylaşılan dosya başka bir kayıt üzerinden taşınmış olabilir
+        audio_upload.refresh_from_db(fields=['audio_file', 'stored_size', 'storage_tier', 'audio_compressed'])
+        name = audio_upload.audio_file.name
+    if not name or is_cold(name):
+        return False
+    with audio_storage.open(name, 'rb') as source:
+        return replace_audio_file(audio_upload, File(source), COLD_PREFIX + name, storage_tier='cold') is not None
+
+
+def release_audio_file(name, exclude_pk):
+    """Dosyayı, ``exclude_pk`` dışında onu gösteren kayıt yoksa siler"""
+    from .models import AudioUpload
+
+    if name and not AudioUpload.objects.filter(audio_file=name).exclude(pk=exclude_pk).exists():
+        audio_storage.delete(name)
+
+
+def delete_audio(audio_upload):
+    """
+    Kaydın ses dosyasını bırakır; dosya başka bir kayıtla paylaşılmıyorsa
+    silinir. Transkripsiyon ve istatistikler korunur.
+    """
+    release_audio_file(audio_upload.audio_file.name, audio_upload.pk)
+    audio_upload.audio_file.name = ''
+    audio_upload.stored_size = None
+    audio_upload.storage_tier = 'deleted'
+    audio_upload.save(update_fields=['audio_file', 'stored_size', 'storage_tier', 'updated_at'])
+
+
+def apply_retention(now=None, dry_run=False):
+    """
+    Saklama politikasını uygular: süresi dolan dosyaları siler, eskiyenleri
+    soğuk katmana taşır.
+
+    Döndürür: {'deleted': ..., 'moved': ...}
+    """
+    from .models import AudioUpload
+
+    now = now or timezone.now()
+    retention_days = getattr(settings, 'AUDIO_RETENTION_DAYS', 0)
+    cold_after_days = getattr(settings, 'AUDIO_COLD_AFTER_DAYS', 0)
+    result = {'deleted': 0, 'moved': 0}
+
+    finished = AudioUpload.objects.filter(status__in=FINISHED_STATUSES).exclude(audio_file='')
+
+    if retention_days:
+        expired = finished.filter(created_at__lt=now - timedelta(days=retention_days))
+        for audio_upload in expired.iterator(chunk_size=100):
+            if not dry_run:
+                delete_audio(audio_upload)
+            result['deleted'] += 1
+
+    if cold_after_days:
+        stale = finished.filter(
+            storage_tier='hot', created_at__lt=now - timedelta(days=cold_after_days)
+        )
+        if retention_days:
+            # Silinecek dosyalar taşınmaz (dry_run'da da iki kez sayılmaz)
+            stale = stale.filter(created_at__gte=now - timedelta(days=retention_days))
+        for audio_upload in stale.iterator(chunk_size=100):
+            try:
+                if dry_run or move_to_cold(audio_upload):
+                    result['moved'] += 1
+            except OSError as e:
+                logging.error(f"#{audio_upload.pk} soğuk katmana taşınamadı: {str(e)}")
+
+    return result
+
+
+def compressed_name(name):
+    """Ses dosyası adının Opus karşılığı"""
+    return os.path.splitext(name)[0] + '.ogg'
@@ -0,0 +1,295 @@
+"""
+Transkripsiyon worker süreçlerini yük durumuna göre ölçekleyen denetleyici
+
+Denetleyici belirli aralıklarla kuyruktaki ses süresini ve CPU kullanımını
+ölçer, ``transcription_worker`` süreç sayısını [min, max] aralığında
+ayarlar. Küçültmede süreçlere SIGTERM gönderilir; worker elindeki dosyayı
+bitirip çıkar, iş yarıda bırakılmaz. Kararlar Prometheus metin biçiminde
+``/metrics`` adresinden yayınlanır.
+"""
+import logging
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Q, Sum
+
+from .models import AudioUpload
+from .usage import estimate_bytes_per_second
+
+
+def get_autoscale_settings():
+    return {
+        'min_workers': getattr(settings, 'TRANSCRIPTION_WORKERS_MIN', 1),
+        'max_workers': getattr(settings, 'TRANSCRIPTION_WORKERS_MAX', 0) or os.cpu_count() or 1,
+        'audio_seconds_per_worker': getattr(settings, 'TRANSCRIPTION_AUDIO_SECONDS_PER_WORKER', 900),
+        'max_cpu': getattr(settings, 'TRANSCRIPTION_SCALE_MAX_CPU', 0.85),
+        'scale_down_delay': getattr(settings, 'TRANSCRIPTION_SCALE_DOWN_DELAY', 120),
+    }
+
+
+def queue_backlog():
+    """
+    Kuyruk durumu. Bekleyen kayıtların süresi worker dosyayı çözene kadar
+    bilinmediğinden dosya boyutundan tahmin edilir.
+
+    Döndürür: {'pending': ..., 'processing': ..., 'pending_audio_seconds': ...}
+    """
+    pending = AudioUpload.objects.filter(status='pending').aggregate(
+        count=Count('pk'),
+        known_seconds=Sum('duration'),
+        unknown_bytes=Sum('file_size', filter=Q(duration__isnull=True)),
+    )
+    audio_seconds = pending['known_seconds'] or 0.0
+    if pending['unknown_bytes']:
+        audio_seconds += pending['unknown_bytes'] / estimate_bytes_per_second()
+    return {
+        'pending': pending['count'],
+        'processing': AudioUpload.objects.filter(status='processing').count(),
+        'pending_audio_seconds': audio_seconds,
+    }
+
+
+class CpuSampler:
+    """Ardışık örnekler arasındaki sistem CPU kullanımı (0-1)"""
+
+    def __init__(self):
+        self._last = self._read()
+
+    @staticmethod
+    def _read():
+        try:
+            with open('/proc/stat') as f:
+                values = [int(value) for value in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        return idle, sum(values)
+
+    def sample(self):
+        current = self._read()
+        if current is None or self._last is None:
+            # /proc yoksa yük ortalamasından yaklaşık değer
+            return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+        idle = current[0] - self._last[0]
+        total = current[1] - self._last[1]
+        self._last = current
+        return 1.0 - idle / total if total > 0 else 0.0
+
+
+def process_cpu_ticks(pid):
+    """Sürecin toplam CPU tick'i (utime + stime); okunamazsa None"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def desired_workers(backlog, cpu, current, config):
+    """
+    Ölçek kararı: işlenen her kayıt bir worker'ı meşgul eder; bekleyen ses
+    ``audio_seconds_per_worker`` saniye başına bir worker ister. CPU doluyken
+    ``min_workers`` üstüne büyütülmez (doymuş işlemciye süreç eklemek kuyruğu
+    hızlandırmaz).
+
+    Döndürür: (hedef worker sayısı, gerekçe)
+    """
+    demand = backlog['processing'] + math.ceil(
+        backlog['pending_audio_seconds'] / config['audio_seconds_per_worker']
+    )
+    target = max(config['min_workers'], min(config['max_workers'], demand))
+    if target > current and cpu >= config['max_cpu']:
+        # Alt sınır CPU'dan bağımsız korunur (ör. çöken worker yerine yenisi)
+        held = max(current, config['min_workers'])
+        return held, 'cpu' if held == current else 'min'
+    if target > current:
+        return target, 'backlog' if demand > current else 'min'
+    if target < current:
+        return target, 'idle'
+    return target, 'steady'
+
+
+class WorkerSupervisor:
+    """``transcription_worker`` süreçlerini başlatır, ölçekler ve boşaltır"""
+
+    def __init__(self, config=None, worker_args=()):
+        self.config = config or get_autoscale_settings()
+        self.worker_args = list(worker_args)
+        self.workers = {}  # pid -> Popen
+        self.draining = {}  # pid -> Popen
+        self.cpu_ticks = {}  # pid -> son CPU tick
+        self.cpu = CpuSampler()
+        self.below_since = None
+        self.lock = threading.Lock()
+        self.metrics = {
+            'desired': 0, 'cpu': 0.0, 'pending': 0, 'processing': 0, 'pending_audio_seconds': 0.0,
+            'scale_up_total': 0, 'scale_down_total': 0, 'held_by_cpu_total': 0, 'restarts_total': 0,
+            'last_decision_timestamp': 0.0, 'last_reason': 'start',
+        }
+
+    def spawn(self):
+        command = [sys.executable, '-m', 'django', 'transcription_worker', *self.worker_args]
+        process = subprocess.Popen(command, cwd=str(settings.BASE_DIR))
+        self.workers[process.pid] = process
+        logging.info(f"Worker başlatıldı (pid {process.pid})")
+
+    def drain(self, count):
+        """
+        ``count`` worker'a SIGTERM gönderir. Son aralıkta en az CPU harcayan
+        (büyük olasılıkla boşta bekleyen) worker'lar önce seçilir.
+        """
+        ticks = {pid: process_cpu_ticks(pid) for pid in self.workers}
+        usage = {
+            pid: (ticks[pid] - self.cpu_ticks.get(pid, 0)) if ticks[pid] is not None else 0
+            for pid in self.workers
+        }
+        for pid in sorted(self.workers, key=lambda pid: (usage[pid], -pid))[:count]:
+            process = self.workers.pop(pid)
+            process.send_signal(signal.SIGTERM)
+            self.draining[pid] = process
+            logging.info(f"Worker boşaltılıyor (pid {pid}), elindeki iş bitince çıkacak")
+
+    def reap(self):
+        """Çıkan süreçleri listeden düşer; beklenmedik çıkışlar yeniden başlatma sayılır"""
+        for pid, process in list(self.workers.items()):
+            if process.poll() is not None:
+                logging.warning(f"Worker beklenmedik şekilde çıktı (pid {pid}, kod {process.returncode})")
+                del self.workers[pid]
+                self.metrics['restarts_total'] += 1
+        for pid, process in list(self.draining.items()):
+            if process.poll() is not None:
+                del self.draining[pid]
+                logging.info(f"Worker boşaltıldı (pid {pid})")
+        for pid in list(self.cpu_ticks):
+            if pid not in self.workers:
+                del self.cpu_ticks[pid]
+
+    def tick(self):
+        """Bir ölçüm ve ölçek kararı"""
+        close_old_connections()
+        self.reap()
+        backlog = queue_backlog()
+        cpu = self.cpu.sample()
+        current = len(self.workers)
+        target, reason = desired_workers(backlog, cpu, current, self.config)
+
+        now = time.monotonic()
+        if target < current:
+            # Küçültme, talep bir süre düşük kalınca yapılır (dalgalanmada süreç harcanmaz)
+            self.below_since = self.below_since or now
+            if now - self.below_since < self.config['scale_down_delay']:
+                target, reason = current, 'cooldown'
+        else:
+            self.below_since = None
+
+        if target > current:
+            for _ in range(target - current):
+                self.spawn()
+            self.metrics['scale_up_total'] += target - current
+        elif target < current:
+            self.drain(current - target)
+            self.metrics['scale_down_total'] += current - target
+            self.below_since = None
+        if reason == 'cpu':
+            self.metrics['held_by_cpu_total'] += 1
+
+        for pid in self.workers:
+            ticks = process_cpu_ticks(pid)
+            if ticks is not None:
+                self.cpu_ticks[pid] = ticks
+
+        with self.lock:
+            self.metrics.update(backlog, desired=target, cpu=cpu, last_reason=reason,
+                                last_decision_timestamp=time.time())
+        if target != current:
+            logging.info(
+                f"Ölçek: {current} -> {target} worker ({reason}; bekleyen {backlog['pending']} kayıt / "
+                f"{backlog['pending_audio_seconds']:.0f}s ses, işlenen {backlog['processing']}, CPU %{cpu * 100:.0f})"
+            )
+        return target, reason
+
+    def run(self, interval=10.0, should_stop=None):
+        while not (should_stop and should_stop()):
+            try:
+                self.tick()
+            except Exception as e:
+                logging.error(f"Ölçek kararı verilemedi: {str(e)}")
+            # Kısa adımlarla beklenir, durdurma sinyaline hızlı yanıt verilir
+            deadline = time.monotonic() + interval
+            while time.monotonic() < deadline and not (should_stop and should_stop()):
+                time.sleep(min(0.5, interval))
+        self.shutdown()
+
+    def shutdown(self):
+        """Tüm worker'ları boşaltır ve çıkmalarını bekler"""
+        self.drain(len(self.workers))
+        for pid, process in list(self.draining.items()):
+            process.wait()
+            del self.draining[pid]
+        logging.info("Tüm worker'lar boşaltıldı")
+
+    def render_metrics(self):
+        """Prometheus metin biçiminde metrikler"""
+        with self.lock:
+            metrics = dict(self.metrics)
+            running, draining = len(self.workers), len(self.draining)
+        lines = [
+            '# TYPE speechtotext_workers gauge',
+            f'speechtotext_workers{{state="running"}} {running}',
+            f'speechtotext_workers{{state="draining"}} {draining}',
+            '# TYPE speechtotext_workers_desired gauge',
+            f"speechtotext_workers_desired {metrics['desired']}",
+            f"speechtotext_workers_min {self.config['min_workers']}",
+            f"speechtotext_workers_max {self.config['max_workers']}",
+            '# TYPE speechtotext_queue_jobs gauge',
+            f"speechtotext_queue_jobs{{status=\"pending\"}} {metrics['pending']}",
+            f"speechtotext_queue_jobs{{status=\"processing\"}} {metrics['processing']}",
+            '# TYPE speechtotext_queue_audio_seconds gauge',
+            f"speechtotext_queue_audio_seconds {metrics['pending_audio_seconds']:.1f}",
+            '# TYPE speechtotext_cpu_utilization gauge',
+            f"speechtotext_cpu_utilization {metrics['cpu']:.3f}",
+            '# TYPE speechtotext_scale_events_total counter',
+            f"speechtotext_scale_events_total{{direction=\"up\"}} {metrics['scale_up_total']}",
+            f"speechtotext_scale_events_total{{direction=\"down\"}} {metrics['scale_down_total']}",
+            '# TYPE speechtotext_scale_held_by_cpu_total counter',
+            f"speechtotext_scale_held_by_cpu_total {metrics['held_by_cpu_total']}",
+            '# TYPE speechtotext_worker_restarts_total counter',
+            f"speechtotext_worker_restarts_total {metrics['restarts_total']}",
+            '# TYPE speechtotext_scale_last_decision gauge',
+            f"speechtotext_scale_last_decision{{reason=\"{metrics['last_reason']}\"}} "
+            f"{metrics['last_decision_timestamp']:.0f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(supervisor, port, host='127.0.0.1'):
+    """Metrikleri arka planda ``host:port/metrics`` adresinden yayınlar"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = supervisor.render_metrics().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logging.info(f"Ölçek metrikleri: http://{host}:{port}/metrics")
+    return server
@@ -19,3 +19,11 @@ def percentage(value, total):
         return round((float(value) / float(total)) * 100, 1)
     except (ValueError, TypeError, ZeroDivisionError):
         return 0
+
+@register.filter
+def minutes(seconds):
+    """Converts seconds to minutes (one decimal)."""
+    try:
+        return round(float(seconds) / 60, 1)
+    except (ValueError, TypeError):
+        return 0
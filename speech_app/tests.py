@@ -1,3 +1,902 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import unicodedata
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import speech_recognition as sr
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.checks import registry
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import exports
+from .checks import check_database_connection_reuse
+from .loadtest import compare_with_baseline
+from .management.commands.benchmark_pipeline import synthetic_conversation
+from .models import AudioUpload, DailyUsage
+from .pipeline import diarization, engines
+from .pipeline.engines import EngineGuard, EngineUnavailable
+from .pipeline.language import apply_language_detection
+from .pipeline.waveform import MAX_PEAKS, MIN_LEVEL_PEAKS, compute_peaks, decode_peaks, encode_peaks
+from .pipeline.transcription import transcribe_with_multiple_engines
+from .text_processing import clean_and_improve_text, find_overlap, get_text_normalizer, intelligent_text_joining
+from .responses import parse_range, ranged_file_response
+from .storage import apply_retention, audio_storage, delete_audio, get_cold_storage, move_to_cold
+from .supervisor import WorkerSupervisor, desired_workers
+from .uploads import build_linked_upload, find_shared_source
+from .usage import record_job, release_upload, reserve_upload, settle_reservation
+from .worker import claim_next_job, recover_stale_jobs, run_worker
+
+
+class OverlapMergeTests(SimpleTestCase):
+    """Örtüşen parça metinlerinin birleştirilmesi"""
+
+    def test_duplicated_overlap_is_emitted_once(self):
+        merged = intelligent_text_joining([
+            'bugün toplantıda bütçe planını ve yeni projeleri konuştuk',
+            'bütçe planını ve yeni projeleri konuştuk ardından sorulara geçtik',
+        ])
+        self.assertEqual(
+            merged, 'bugün toplantıda bütçe planını ve yeni projeleri konuştuk ardından sorulara geçtik'
+        )
+
+    def test_damaged_edge_words_still_align(self):
+        # Parça sınırında kesilen kelimeler ("gü", "nle") eşleşmeyi bozmaz
+        merged = intelligent_text_joining([
+            'sabah erkenden çıktık bugün hava çok güzel ve gü',
+            'nle hava çok güzel ve güneşli bir gün geçirdik',
+        ])
+        self.assertEqual(merged, 'sabah erkenden çıktık bugün hava çok güzel ve güneşli bir gün geçirdik')
+
+    def test_partial_overlap_keeps_following_words(self):
+        prev = 'bir iki üç dört beş altı'.split()
+        curr = 'dört beş altı yedi sekiz'.split()
+        self.assertEqual(find_overlap(prev, curr, window=10), (6, 3))
+
+    def test_missing_chunk_prevents_merge_across_gap(self):
+        merged = intelligent_text_joining([
+            'rapor hazır ve gönderildi',
+            None,
+            'hazır ve gönderildi diye not düştüm',
+        ])
+        self.assertEqual(merged, 'rapor hazır ve gönderildi hazır ve gönderildi diye not düştüm')
+
+    def test_unrelated_chunks_are_not_merged(self):
+        # Tek ortak kelime ("ve") örtüşme sayılmaz
+        prev = 'elma armut ve kiraz aldık'
+        curr = 've sonra eve döndük akşam oldu'
+        self.assertIsNone(find_overlap(prev.split(), curr.split(), window=10))
+        self.assertEqual(intelligent_text_joining([prev, curr]), f'{prev} {curr}')
+
+    def test_turkish_case_and_diacritics_are_normalized(self):
+        # İ/i ve I/ı büyük-küçük harf farkı ile ayrışık yazılmış harfler eşleşmeyi bozmaz
+        prev = "yarın sabah İZMİR'E GİDİYORUZ".split()
+        curr = "izmir'e gidiyoruz ve akşam dönüyoruz".split()
+        self.assertEqual(find_overlap(prev, curr, window=10), (4, 2))
+        prev = 'salonda IŞIK YANIYOR'.split()
+        curr = 'ışık yanıyor mu diye baktık'.split()
+        self.assertEqual(find_overlap(prev, curr, window=10), (3, 2))
+        prev = 'ders çalışmaya başladık'.split()
+        curr = unicodedata.normalize('NFD', 'çalışmaya başladık sonra mola verdik').split()
+        self.assertEqual(find_overlap(prev, curr, window=10), (3, 2))
+
+    def test_merged_text_keeps_previous_chunk_spelling(self):
+        merged = intelligent_text_joining([
+            "yarın İstanbul'da IŞIK festivali",
+            "istanbul'da ışık festivali başlıyor",
+        ])
+        self.assertEqual(merged, "yarın İstanbul'da IŞIK festivali başlıyor")
+
+
+class TextNormalizationTests(SimpleTestCase):
+    """Dil bazında metin normalizasyonu"""
+
+    def setUp(self):
+        get_text_normalizer.cache_clear()
+
+    def tearDown(self):
+        get_text_normalizer.cache_clear()
+
+    def test_code_like_numbers_are_left_alone(self):
+        text = 'posta kodu 34000 numara 123456789 dönem 2019 2024'
+        self.assertEqual(clean_and_improve_text(text, 'tr-TR'), 'Posta kodu 34000 numara 123456789 dönem 2019 2024')
+        self.assertEqual(clean_and_improve_text('order 123456789', 'en-US'), 'Order 123456789')
+
+    @override_settings(TEXT_NORMALIZATION={'tr': ['whitespace', 'numbers']})
+    def test_number_formatting_is_opt_in(self):
+        self.assertEqual(clean_and_improve_text('toplam 1250000 lira', 'tr-TR'), 'toplam 1.250.000 lira')
+
+    def test_turkish_text_is_cleaned(self):
+        text = 'i\u0307stanbul  ve ankara \u2019da , dedi'
+        self.assertEqual(clean_and_improve_text(text, 'tr-TR'), "İstanbul ve ankara 'da, dedi")
+
+
+class StaleJobRecoveryTests(TestCase):
+    """Worker'ı ölen 'processing' kayıtların geri alınması"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='worker-test')
+
+    def claimed_upload(self, heartbeat_age):
+        AudioUpload.objects.create(user=self.user, title='ses', status='pending')
+        audio_upload = claim_next_job()
+        AudioUpload.objects.filter(pk=audio_upload.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age)
+        )
+        return audio_upload
+
+    def test_stale_job_is_requeued(self):
+        audio_upload = self.claimed_upload(heartbeat_age=600)
+        self.assertEqual(recover_stale_jobs(stale_timeout=300, max_attempts=3), (1, 0))
+        audio_upload.refresh_from_db()
+        self.assertEqual(audio_upload.status, 'pending')
+        self.assertEqual(claim_next_job().pk, audio_upload.pk)
+
+    def test_live_job_is_left_alone(self):
+        audio_upload = self.claimed_upload(heartbeat_age=10)
+        self.assertEqual(recover_stale_jobs(stale_timeout=300, max_attempts=3), (0, 0))
+        audio_upload.refresh_from_db()
+        self.assertEqual(audio_upload.status, 'processing')
+
+    def test_job_failing_repeatedly_is_marked_error(self):
+        audio_upload = self.claimed_upload(heartbeat_age=600)
+        AudioUpload.objects.filter(pk=audio_upload.pk).update(attempts=3)
+        self.assertEqual(recover_stale_jobs(stale_timeout=300, max_attempts=3), (0, 1))
+        audio_upload.refresh_from_db()
+        self.assertEqual(audio_upload.status, 'error')
+
+
+@override_settings(USAGE_DAILY_UPLOAD_LIMIT=0, USAGE_DAILY_AUDIO_SECONDS_LIMIT=600)
+class UsageQuotaTests(TestCase):
+    """Yüklemede tahmini süre ayrılması ve iş bitince mutabakat"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='quota-test')
+        self.today = timezone.localdate()
+
+    def usage(self):
+        return DailyUsage.objects.get(user=self.user, date=self.today)
+
+    def reserve(self, seconds):
+        error = reserve_upload(self.user, seconds, self.today)
+        if error:
+            return None
+        return AudioUpload.objects.create(user=self.user, title='ses', reserved_audio_seconds=seconds,
+                                          reserved_on=self.today)
+
+    def test_pending_uploads_count_against_audio_limit(self):
+        # İlk iş bitmeden kuyruğa eklenen yüklemeler de sınıra sayılır
+        self.assertIsNotNone(self.reserve(300))
+        self.assertIsNotNone(self.reserve(250))
+        self.assertIsNone(self.reserve(100))
+        self.assertEqual(self.usage().uploads, 2)
+        self.assertEqual(self.usage().reserved_audio_seconds, 550)
+
+    def test_finished_job_replaces_estimate_with_actual_duration(self):
+        audio_upload = self.reserve(300)
+        audio_upload.duration = 120
+        record_job(audio_upload, success=True)
+        usage = self.usage()
+        self.assertEqual((usage.audio_seconds, usage.reserved_audio_seconds), (120, 0))
+        # Aynı rezervasyon ikinci kez düşülmez
+        settle_reservation(audio_upload.pk)
+        self.assertEqual(self.usage().reserved_audio_seconds, 0)
+        self.assertIsNotNone(self.reserve(450))
+
+    def test_crashed_job_is_recorded_as_failure(self):
+        audio_upload = self.reserve(300)
+        with mock.patch('speech_app.worker.Heartbeat'), \
+                mock.patch('speech_app.worker.run_job', side_effect=RuntimeError('decode failed')), \
+                self.assertLogs(level='ERROR'):
+            self.assertEqual(run_worker(once=True), 1)
+        audio_upload.refresh_from_db()
+        self.assertEqual((audio_upload.status, audio_upload.reserved_audio_seconds), ('error', 0))
+        usage = self.usage()
+        self.assertEqual((usage.jobs_completed, usage.jobs_failed, usage.reserved_audio_seconds), (0, 1, 0))
+        self.assertGreaterEqual(usage.cpu_seconds, 0)
+
+    def test_failed_save_refunds_reservation(self):
+        self.assertIsNone(reserve_upload(self.user, 500, self.today))
+        release_upload(self.user.pk, 500, self.today)
+        usage = self.usage()
+        self.assertEqual((usage.uploads, usage.reserved_audio_seconds), (0, 0))
+        self.assertIsNotNone(self.reserve(500))
+
+
+class DuplicateUploadTests(TestCase):
+    """Başka kullanıcının yüklediği aynı dosyanın paylaşılması"""
+
+    def setUp(self):
+        owner = User.objects.create(username='dedup-owner')
+        self.user = User.objects.create(username='dedup-user')
+        # Kaynak 'auto' ile yüklendi; worker dili algılayıp kayda yazdı
+        self.source = AudioUpload.objects.create(
+            user=owner, title='kaynak', audio_file='audio_files/kaynak.wav', content_hash='a' * 64,
+            language='tr-TR', detected_language='tr-TR', language_confidence=0.92,
+            transcription='merhaba dünya', duration=42.0, status='completed',
+        )
+
+    def test_auto_language_reuses_completed_transcript(self):
+        source = find_shared_source('a' * 64, self.user, 'auto')
+        audio_upload = build_linked_upload(source, self.user, 'kopya', 'auto')
+        self.assertEqual(audio_upload.status, 'completed')
+        self.assertEqual(audio_upload.language, 'tr-TR')
+        self.assertEqual(audio_upload.detected_language, 'tr-TR')
+        self.assertEqual(audio_upload.language_confidence, 0.92)
+        self.assertEqual(audio_upload.transcription, 'merhaba dünya')
+        self.assertEqual(audio_upload.audio_file.name, 'audio_files/kaynak.wav')
+
+    def test_other_language_is_reprocessed(self):
+        source = find_shared_source('a' * 64, self.user, 'en-US')
+        audio_upload = build_linked_upload(source, self.user, 'kopya', 'en-US')
+        self.assertEqual(audio_upload.status, 'pending')
+        self.assertEqual(audio_upload.language, 'en-US')
+        self.assertIsNone(audio_upload.transcription)
+
+
+class MonitoringEndpointTests(TestCase):
+    """Sağlık denetimi, veritabanı metrikleri ve bağlantı denetimi"""
+
+    def test_health_returns_generic_status(self):
+        response = self.client.get('/health/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok', 'database': 'ok'})
+
+    def test_health_hides_database_error(self):
+        with mock.patch('speech_app.views.ping', return_value=(False, 0.0, 'FATAL: password authentication failed')), \
+                self.assertLogs(level='ERROR'):
+            response = self.client.get('/health/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn('password', response.content.decode())
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_require_staff_or_token(self):
+        self.assertEqual(self.client.get('/metrics/db/', HTTP_HOST='localhost').status_code, 404)
+        response = self.client.get('/metrics/db/', HTTP_HOST='localhost', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/metrics/db/', HTTP_HOST='localhost', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.client.force_login(User.objects.create(username='metrics-admin', is_staff=True))
+        self.assertEqual(self.client.get('/metrics/db/', HTTP_HOST='localhost').status_code, 200)
+
+    def test_connection_reuse_check_runs_with_deploy(self):
+        checks = registry.registry.get_checks(include_deployment_checks=True)
+        self.assertIn(check_database_connection_reuse, checks)
+        self.assertIn('performance', check_database_connection_reuse.tags)
+
+
+class EngineGuardTests(SimpleTestCase):
+    """Motor devre kesicisi: açılma, tek deneme isteği ve soğuma süresi"""
+
+    def setUp(self):
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir)
+        override = override_settings(ENGINE_STATE_DIR=state_dir, ENGINE_FAILURE_THRESHOLD=3,
+                                     ENGINE_COOLDOWN_SECONDS=30, ENGINE_MAX_COOLDOWN_SECONDS=100)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        # Saat elle ilerletilir; token beklemesi gerçekten uyumaz
+        self.now = 1000.0
+        clock = mock.patch.object(engines, 'time', mock.Mock(time=lambda: self.now, sleep=lambda seconds: None))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.guard = EngineGuard('test')
+
+    def call_failing(self, message='recognition connection failed: timed out'):
+        with self.assertRaises(sr.RequestError):
+            self.guard.call(mock.Mock(side_effect=sr.RequestError(message)))
+
+    def assertUnavailable(self, reason):
+        engine = mock.Mock()
+        with self.assertRaises(EngineUnavailable) as cm:
+            self.guard.call(engine)
+        engine.assert_not_called()
+        self.assertEqual(cm.exception.reason, reason)
+
+    def test_circuit_opens_after_failure_threshold(self):
+        self.call_failing()
+        self.call_failing()
+        self.assertEqual(self.guard.snapshot()['circuit'], 'closed')
+        self.call_failing()
+        self.assertEqual(self.guard.snapshot()['circuit'], 'open')
+        self.assertUnavailable('open')
+
+    def test_throttle_opens_circuit_immediately(self):
+        self.call_failing('recognition request failed: Too Many Requests')
+        state = self.guard.snapshot()
+        self.assertEqual((state['circuit'], state['cooldown']), ('open', 30))
+        self.assertUnavailable('open')
+
+    def test_only_one_probe_passes_after_cooldown(self):
+        self.call_failing('recognition request failed: Too Many Requests')
+        self.now += 31
+        self.guard.acquire()
+        self.assertUnavailable('half_open')
+        self.guard.record_success()
+        self.assertEqual(self.guard.call(lambda: 'ok'), 'ok')
+
+    def test_failed_probe_doubles_cooldown(self):
+        self.call_failing('recognition request failed: Too Many Requests')
+        for cooldown in (60, 100, 100):
+            self.now += self.guard.snapshot()['cooldown'] + 1
+            self.call_failing()
+            self.assertEqual(self.guard.snapshot()['cooldown'], cooldown)
+        self.now += 99
+        self.assertUnavailable('open')
+
+
+@override_settings(SPHINX_LANGUAGE='en-US')
+class EngineDeferTests(SimpleTestCase):
+    """Google kullanılamadığında parçanın ertelenmesi ya da Sphinx'e düşmesi"""
+
+    def setUp(self):
+        self.audio_data = sr.AudioData(bytes(3200), 16000, 2)
+        google = mock.patch('speech_app.pipeline.transcription.recognize_google',
+                            side_effect=EngineUnavailable('google', 30, 'open'))
+        google.start()
+        self.addCleanup(google.stop)
+        self.offline = mock.Mock()
+        self.offline.recognize.return_value = 'hello world again'
+        sphinx = mock.patch('speech_app.pipeline.transcription.get_offline_recognizer', return_value=self.offline)
+        sphinx.start()
+        self.addCleanup(sphinx.stop)
+
+    def test_chunk_is_deferred_when_sphinx_does_not_cover_language(self):
+        with self.assertRaises(EngineUnavailable):
+            transcribe_with_multiple_engines(self.audio_data, 'tr-TR')
+        self.offline.recognize.assert_not_called()
+
+    def test_sphinx_covers_matching_language(self):
+        self.assertEqual(transcribe_with_multiple_engines(self.audio_data, 'en-GB'), ('hello world again', True))
+
+
+class DiarizationTests(SimpleTestCase):
+    """Konuşmacı ayrıştırma: kısa tek konuşmacılı kayıtlar ve blok halinde VAD"""
+
+    sample_rate = 16000
+
+    def speakers(self, seconds, speakers, seed=0):
+        samples, _ = synthetic_conversation(seconds, self.sample_rate, speakers=speakers, seed=seed)
+        with self.assertLogs(level='INFO'):
+            turns = diarization.diarize(samples, self.sample_rate, max_speakers=2)
+        return {speaker for _, _, speaker in turns}
+
+    def test_short_monologue_stays_single_speaker(self):
+        # Az pencerede k-means tek konuşmacıyı da belirgin biçimde ikiye böler
+        for seconds in (10, 30):
+            for seed in range(2):
+                with self.subTest(seconds=seconds, seed=seed):
+                    self.assertEqual(self.speakers(seconds, speakers=1, seed=seed), {0})
+
+    def test_short_dialogue_has_two_speakers(self):
+        for seconds in (10, 30):
+            with self.subTest(seconds=seconds):
+                self.assertEqual(self.speakers(seconds, speakers=2), {0, 1})
+
+    def test_speech_mask_does_not_depend_on_block_size(self):
+        samples, _ = synthetic_conversation(20, self.sample_rate, speakers=2)
+        expected, hop = diarization.detect_speech(samples, self.sample_rate)
+        with mock.patch.object(diarization, 'VAD_BLOCK_FRAMES', 7):
+            mask, _ = diarization.detect_speech(samples, self.sample_rate)
+        self.assertEqual(len(mask), (len(samples) - int(diarization.FRAME_SECONDS * self.sample_rate)) // hop + 1)
+        self.assertTrue(np.array_equal(mask, expected))
+
+
+class WorkerScalingTests(SimpleTestCase):
+    """Worker sayısı kararı: sınırlar, CPU tutması ve gecikmeli küçültme"""
+
+    config = {'min_workers': 2, 'max_workers': 4, 'audio_seconds_per_worker': 900,
+              'max_cpu': 0.85, 'scale_down_delay': 120}
+
+    def backlog(self, processing=0, pending_audio_seconds=0.0):
+        return {'pending': 0, 'processing': processing, 'pending_audio_seconds': pending_audio_seconds}
+
+    def test_target_is_clamped_to_min_and_max(self):
+        self.assertEqual(desired_workers(self.backlog(), 0.1, 2, self.config), (2, 'steady'))
+        self.assertEqual(desired_workers(self.backlog(), 0.1, 0, self.config), (2, 'min'))
+        self.assertEqual(desired_workers(self.backlog(3, 9000), 0.1, 2, self.config), (4, 'backlog'))
+        self.assertEqual(desired_workers(self.backlog(1), 0.1, 4, self.config), (2, 'idle'))
+
+    def test_busy_cpu_holds_scale_up_but_keeps_minimum(self):
+        self.assertEqual(desired_workers(self.backlog(3, 9000), 0.95, 3, self.config), (3, 'cpu'))
+        self.assertEqual(desired_workers(self.backlog(3, 9000), 0.95, 0, self.config), (2, 'min'))
+        # Küçültme CPU'dan etkilenmez
+        self.assertEqual(desired_workers(self.backlog(), 0.95, 4, self.config), (2, 'idle'))
+
+    def test_scale_down_waits_for_delay(self):
+        supervisor = WorkerSupervisor(config=self.config)
+        supervisor.cpu = mock.Mock(sample=mock.Mock(return_value=0.1))
+        supervisor.workers = {pid: mock.Mock(poll=mock.Mock(return_value=None)) for pid in (101, 102, 103)}
+        supervisor.drain = mock.Mock()
+        clock = mock.Mock(return_value=1000.0)
+        with mock.patch('speech_app.supervisor.queue_backlog', return_value=self.backlog()), \
+                mock.patch('speech_app.supervisor.process_cpu_ticks', return_value=None), \
+                mock.patch('speech_app.supervisor.close_old_connections'), \
+                mock.patch('speech_app.supervisor.time', mock.Mock(monotonic=clock, time=mock.Mock(return_value=0.0))), \
+                self.assertLogs(level='INFO'):
+            self.assertEqual(supervisor.tick(), (3, 'cooldown'))
+            clock.return_value += 119
+            self.assertEqual(supervisor.tick(), (3, 'cooldown'))
+            supervisor.drain.assert_not_called()
+            clock.return_value += 1
+            self.assertEqual(supervisor.tick(), (2, 'idle'))
+        supervisor.drain.assert_called_once_with(1)
+
+
+@override_settings(LANGUAGE_DETECTION_ENABLED=True, LANGUAGE_DETECTION_CANDIDATES=['tr-TR', 'en-US'])
+class LanguageDetectionTests(SimpleTestCase):
+    """Dil algılamanın yalnızca 'auto' için tanıyıcıya gitmesi ve önbellek anahtarı"""
+
+    result = {'language': 'en-US', 'confidence': 0.81, 'scores': {'tr-TR': 0.2, 'en-US': 0.81}}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        detect = mock.patch('speech_app.pipeline.language.detect_language', return_value=self.result)
+        self.detect_language = detect.start()
+        self.addCleanup(detect.stop)
+
+    def detect(self, audio_upload):
+        with self.assertLogs(level='INFO'):
+            return apply_language_detection(audio_upload, np.zeros(16000, dtype=np.float32), 16000)
+
+    def test_explicit_language_is_not_probed(self):
+        audio_upload = AudioUpload(pk=1, language='tr-TR', content_hash='b' * 64)
+        self.assertIsNone(apply_language_detection(audio_upload, np.zeros(16000, dtype=np.float32), 16000))
+        self.detect_language.assert_not_called()
+        self.assertEqual(audio_upload.language, 'tr-TR')
+        self.assertFalse(audio_upload.has_language_mismatch())
+
+    def test_explicit_language_uses_cached_result(self):
+        self.detect(AudioUpload(pk=1, language='auto', content_hash='b' * 64))
+        audio_upload = AudioUpload(pk=2, language='tr-TR', content_hash='b' * 64)
+        self.detect(audio_upload)
+        self.assertEqual(self.detect_language.call_count, 1)
+        self.assertEqual(audio_upload.language, 'tr-TR')
+        self.assertTrue(audio_upload.has_language_mismatch())
+
+    def test_auto_language_without_hash_does_not_read_file(self):
+        updated_at = timezone.now()
+        audio_upload = AudioUpload(pk=3, language='auto', updated_at=updated_at)
+        self.assertEqual(self.detect(audio_upload), self.result)
+        self.assertEqual(audio_upload.language, 'en-US')
+        # Aynı kayıt değişmeden yeniden işlenirse önbellek kullanılır, değişince yeniden algılanır
+        self.detect(AudioUpload(pk=3, language='auto', updated_at=updated_at))
+        self.assertEqual(self.detect_language.call_count, 1)
+        self.detect(AudioUpload(pk=3, language='auto', updated_at=updated_at + timedelta(seconds=1)))
+        self.assertEqual(self.detect_language.call_count, 2)
+
+
+class TemporaryMediaMixin:
+    """Sıcak ve soğuk katmanı geçici dizinlere yönlendirir"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.cold_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.addCleanup(shutil.rmtree, self.cold_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, AUDIO_COLD_STORAGE={
+            'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': self.cold_root},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+        get_cold_storage.cache_clear()
+        self.addCleanup(get_cold_storage.cache_clear)
+
+    def create_upload(self, user, content=b'RIFF' + bytes(1000), name='audio_files/ses.wav', **fields):
+        name = audio_storage.save(name, ContentFile(content))
+        fields.setdefault('status', 'completed')
+        return AudioUpload.objects.create(user=user, title='ses', audio_file=name, file_size=len(content),
+                                          stored_size=len(content), **fields)
+
+
+@override_settings(AUDIO_RETENTION_DAYS=365, AUDIO_COLD_AFTER_DAYS=30)
+class TieredStorageTests(TemporaryMediaMixin, TestCase):
+    """'cold/' önekli adların yönlendirilmesi, saklama politikası ve paylaşılan dosyalar"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='storage-test')
+
+    def age(self, audio_upload, days):
+        AudioUpload.objects.filter(pk=audio_upload.pk).update(created_at=timezone.now() - timedelta(days=days))
+
+    def test_cold_prefix_routes_to_cold_storage(self):
+        hot = audio_storage.save('audio_files/a.wav', ContentFile(b'hot'))
+        cold = audio_storage.save('cold/audio_files/b.wav', ContentFile(b'cold'))
+        self.assertEqual(cold, 'cold/audio_files/b.wav')
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, hot)))
+        self.assertTrue(os.path.exists(os.path.join(self.cold_root, 'audio_files', 'b.wav')))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'cold')))
+        self.assertEqual(audio_storage.size(cold), 4)
+        with audio_storage.open(cold) as f:
+            self.assertEqual(f.read(), b'cold')
+
+    def test_retention_moves_stale_and_deletes_expired_files(self):
+        expired = self.create_upload(self.user, name='audio_files/eski.wav')
+        stale = self.create_upload(self.user, name='audio_files/bayat.wav')
+        pending = self.create_upload(self.user, name='audio_files/bekleyen.wav', status='pending')
+        fresh = self.create_upload(self.user, name='audio_files/yeni.wav')
+        self.age(expired, 400)
+        self.age(stale, 40)
+        self.age(pending, 40)
+
+        self.assertEqual(apply_retention(dry_run=True), {'deleted': 1, 'moved': 1})
+        self.assertEqual(apply_retention(), {'deleted': 1, 'moved': 1})
+        for audio_upload in (expired, stale, pending, fresh):
+            audio_upload.refresh_from_db()
+        self.assertEqual((expired.storage_tier, expired.audio_file.name), ('deleted', ''))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'audio_files', 'eski.wav')))
+        self.assertEqual((stale.storage_tier, stale.audio_file.name), ('cold', 'cold/audio_files/bayat.wav'))
+        self.assertTrue(os.path.exists(os.path.join(self.cold_root, 'audio_files', 'bayat.wav')))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'audio_files', 'bayat.wav')))
+        self.assertEqual(pending.storage_tier, 'hot')
+        self.assertEqual(fresh.storage_tier, 'hot')
+
+    def test_shared_file_is_deleted_with_last_record(self):
+        first = self.create_upload(self.user)
+        second = AudioUpload.objects.create(user=User.objects.create(username='storage-other'), title='kopya',
+                                            audio_file=first.audio_file.name, status='completed')
+        path = os.path.join(self.media_root, first.audio_file.name)
+        delete_audio(first)
+        self.assertTrue(os.path.exists(path))
+        delete_audio(second)
+        self.assertFalse(os.path.exists(path))
+
+    def test_shared_file_in_use_is_not_moved(self):
+        first = self.create_upload(self.user)
+        AudioUpload.objects.create(user=User.objects.create(username='storage-other'), title='kopya',
+                                   audio_file=first.audio_file.name, status='processing')
+        with self.assertLogs(level='INFO'):
+            self.assertFalse(move_to_cold(first))
+        first.refresh_from_db()
+        self.assertEqual((first.storage_tier, first.audio_file.name), ('hot', 'audio_files/ses.wav'))
+
+
+class RangeResponseTests(SimpleTestCase):
+    """Range başlığının çözülmesi ve 206/416 yanıtları"""
+
+    def test_parse_range(self):
+        self.assertIsNone(parse_range(None, 1000))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+        # Sondan aralıklar; dosyadan uzun olan tüm dosyayı verir
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        for header in ('bytes=1000-', 'bytes=20-10', 'bytes=-0'):
+            with self.subTest(header=header), self.assertRaises(ValueError):
+                parse_range(header, 1000)
+
+    def response(self, header, content=bytes(range(200))):
+        request = RequestFactory().get('/', HTTP_RANGE=header) if header else RequestFactory().get('/')
+        return ranged_file_response(request, io.BytesIO(content), len(content), 'ses.ogg')
+
+    def test_partial_content(self):
+        response = self.response('bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/200')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Content-Type'], 'audio/ogg')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_suffix_range(self):
+        response = self.response('bytes=-5')
+        self.assertEqual(response['Content-Range'], 'bytes 195-199/200')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(195, 200)))
+
+    def test_full_and_unsatisfiable_ranges(self):
+        response = self.response(None)
+        self.assertEqual((response.status_code, response['Accept-Ranges']), (200, 'bytes'))
+        self.assertEqual(len(b''.join(response.streaming_content)), 200)
+        response = self.response('bytes=300-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */200')
+
+
+class AudioServingTests(TemporaryMediaMixin, TestCase):
+    """Ses dosyası görünümü: sahiplik, gerçek boyut ve X-Accel-Redirect eşlemesi"""
+
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='audio-owner')
+        self.client.force_login(self.user)
+        self.audio_upload = self.create_upload(self.user, content=self.content)
+        self.url = f'/transcription/{self.audio_upload.pk}/audio/'
+
+    def get(self, **headers):
+        return self.client.get(self.url, HTTP_HOST='localhost', **headers)
+
+    def test_other_users_file_is_not_served(self):
+        self.client.force_login(User.objects.create(username='audio-other'))
+        self.assertEqual(self.get().status_code, 404)
+
+    def test_range_uses_real_file_size(self):
+        # Kayıttaki boyut eskimiş olsa da yanıt diskteki dosyaya göre kurulur
+        for stored_size in (len(self.content) // 2, len(self.content) * 2):
+            AudioUpload.objects.filter(pk=self.audio_upload.pk).update(stored_size=stored_size)
+            with self.subTest(stored_size=stored_size):
+                response = self.get(HTTP_RANGE='bytes=1000-')
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes 1000-1023/{len(self.content)}')
+                self.assertEqual(b''.join(response.streaming_content), self.content[1000:])
+
+    @override_settings(AUDIO_ACCEL_REDIRECT=True)
+    def test_accel_redirect_maps_tier_to_location(self):
+        response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/media/audio_files/ses.wav')
+        self.assertEqual(response.content, b'')
+        self.assertTrue(move_to_cold(self.audio_upload))
+        response = self.get(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/cold_media/audio_files/ses.wav')
+
+    @override_settings(AUDIO_ACCEL_REDIRECT=True, AUDIO_ACCEL_REDIRECT_LOCATIONS={'hot': '/protected/media/'})
+    def test_tier_without_location_is_streamed(self):
+        # Soğuk katman S3 gibi nginx'in okuyamadığı bir depolamadaysa Django akıtır
+        self.assertTrue(move_to_cold(self.audio_upload))
+        response = self.get(HTTP_RANGE='bytes=0-9')
+        self.assertNotIn('X-Accel-Redirect', response)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+
+
+class WaveformPeaksTests(SimpleTestCase):
+    """Çok çözünürlüklü tepe değerleri ve blob kodlaması"""
+
+    def test_round_trip(self):
+        samples = np.sin(np.linspace(0, 400 * np.pi, 16000 * 30, dtype=np.float32))
+        levels = compute_peaks(samples)
+        sample_rate, decoded = decode_peaks(encode_peaks(levels, 16000))
+        self.assertEqual(sample_rate, 16000)
+        self.assertEqual(len(decoded), len(levels))
+        for (spp, mins, maxs), (decoded_spp, decoded_mins, decoded_maxs) in zip(levels, decoded):
+            self.assertEqual(spp, decoded_spp)
+            self.assertTrue(np.array_equal(mins, decoded_mins))
+            self.assertTrue(np.array_equal(maxs, decoded_maxs))
+        # Tam ölçekli sinüs int8 sınırlarına oturur
+        self.assertEqual((decoded[0][1].min(), decoded[0][2].max()), (-127, 127))
+
+    def test_levels_are_coarsened_consistently(self):
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(-1, 1, 16000 * 60).astype(np.float32)
+        levels = compute_peaks(samples)
+        self.assertEqual(levels[0][0], 256)
+        self.assertEqual(len(levels[0][1]), -(-len(samples) // 256))
+        for (spp, mins, maxs), (coarse_spp, coarse_mins, coarse_maxs) in zip(levels, levels[1:]):
+            self.assertEqual(coarse_spp, spp * 4)
+            self.assertEqual(coarse_mins[0], mins[:4].min())
+            self.assertEqual(coarse_maxs[-1], maxs[(len(coarse_maxs) - 1) * 4:].max())
+        self.assertLessEqual(len(levels[-1][1]), MIN_LEVEL_PEAKS * 4)
+
+    def test_long_recording_is_capped(self):
+        levels = compute_peaks(np.zeros(16000 * 3600, dtype=np.float32))
+        self.assertLessEqual(len(levels[0][1]), MAX_PEAKS)
+
+    def test_empty_and_invalid_blobs(self):
+        self.assertEqual(decode_peaks(encode_peaks(compute_peaks(np.zeros(0, dtype=np.float32)), 8000)), (8000, []))
+        with self.assertRaises(ValueError):
+            decode_peaks(b'WAVE' + bytes(8))
+
+
+class ConditionalResponseTests(TestCase):
+    """ETag/Last-Modified ile 304 yanıtları ve sahiplik kontrolü"""
+
+    def setUp(self):
+        self.owner = User.objects.create(username='conditional-owner')
+        self.other = User.objects.create(username='conditional-other')
+        self.audio_upload = AudioUpload.objects.create(
+            user=self.owner, title='toplantı', transcription='merhaba dünya', status='completed', duration=2.0,
+            word_count=2, waveform_peaks=encode_peaks(compute_peaks(np.zeros(16000, dtype=np.float32)), 16000),
+        )
+        self.client.force_login(self.owner)
+
+    def get(self, path, **headers):
+        return self.client.get(f'/transcription/{self.audio_upload.pk}/{path}', HTTP_HOST='localhost', **headers)
+
+    def test_unchanged_record_returns_304(self):
+        for path in ('', 'waveform/', 'export/txt/'):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_export_honours_if_modified_since(self):
+        response = self.get('export/srt/')
+        self.assertEqual(self.get('export/srt/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_changed_record_is_rendered_again(self):
+        etag = self.get('export/txt/')['ETag']
+        self.audio_upload.transcription = 'güncellenmiş metin'
+        self.audio_upload.save()
+        response = self.get('export/txt/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), 'güncellenmiş metin\n')
+
+    def test_ownership_is_checked_before_304(self):
+        # Sahibin ETag'ini bilen başka kullanıcı 304 ile kaydın varlığını öğrenemez
+        etags = {path: self.get(path)['ETag'] for path in ('', 'waveform/', 'export/txt/')}
+        last_modified = self.get('export/txt/')['Last-Modified']
+        self.client.force_login(self.other)
+        for path, etag in etags.items():
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+        self.assertEqual(self.get('export/txt/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 404)
+
+    def test_detail_etag_is_per_user(self):
+        # Sayfa kullanıcı menüsünü içerdiğinden yöneticinin kopyası sahibinkiyle karışmaz
+        etag = self.get('')['ETag']
+        self.client.force_login(User.objects.create(username='conditional-admin', is_staff=True))
+        response = self.get('', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ExportTests(TestCase):
+    """Dışa aktarma biçimleri ve toplu ZIP akışı"""
+
+    segments = [
+        {'start': 0.0, 'end': 1.5, 'text': 'Merhaba.', 'speaker': 1},
+        {'start': 1.5, 'end': 3725.25, 'text': 'Hoş geldiniz, başlayalım.', 'speaker': 2},
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create(username='export-test')
+        self.audio_upload = AudioUpload.objects.create(
+            user=self.user, title='Haftalık Toplantı', transcription='Merhaba. Hoş geldiniz, başlayalım.',
+            segments=self.segments, duration=3726.0, word_count=4, speaker_count=2, status='completed',
+        )
+
+    def export(self, export_format, audio_upload=None):
+        generator, _ = exports.EXPORT_FORMATS[export_format]
+        return ''.join(generator(audio_upload or self.audio_upload))
+
+    def test_txt(self):
+        self.assertEqual(self.export('txt'), 'Merhaba. Hoş geldiniz, başlayalım.\n')
+
+    def test_srt(self):
+        self.assertEqual(self.export('srt'), (
+            '1\n00:00:00,000 --> 00:00:01,500\n[Konuşmacı 1] Merhaba.\n\n'
+            '2\n00:00:01,500 --> 01:02:05,250\n[Konuşmacı 2] Hoş geldiniz, başlayalım.\n\n'
+        ))
+
+    def test_vtt(self):
+        self.assertEqual(self.export('vtt'), (
+            'WEBVTT\n\n'
+            '00:00:00.000 --> 00:00:01.500\n<v Konuşmacı 1>Merhaba.\n\n'
+            '00:00:01.500 --> 01:02:05.250\n<v Konuşmacı 2>Hoş geldiniz, başlayalım.\n\n'
+        ))
+
+    def test_json(self):
+        data = json.loads(self.export('json'))
+        self.assertEqual(data['id'], self.audio_upload.pk)
+        self.assertEqual(data['text'], 'Merhaba. Hoş geldiniz, başlayalım.')
+        self.assertEqual((data['speaker_count'], data['segments']), (2, self.segments))
+
+    def test_record_without_segments_is_split_over_duration(self):
+        audio_upload = AudioUpload(pk=5, transcription='bir iki üç dört', duration=8.0,
+                                   created_at=timezone.now())
+        self.assertTrue(self.export('srt', audio_upload).startswith('1\n00:00:00,000 --> '))
+        segments = json.loads(self.export('json', audio_upload))['segments']
+        self.assertEqual(' '.join(segment['text'] for segment in segments), 'bir iki üç dört')
+        self.assertLessEqual(segments[-1]['end'], 8.0)
+
+    def test_large_export_is_streamed(self):
+        self.audio_upload.transcription = 'kelime ' * 30000
+        self.audio_upload.word_count = 30000
+        response = exports.export_response(self.audio_upload, 'txt')
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content).decode(), self.audio_upload.transcription + '\n')
+        self.assertEqual(response['Content-Disposition'], "attachment; filename*=utf-8''haftal%C4%B1k-toplant%C4%B1.txt")
+
+    def test_zip_stream_is_valid_archive(self):
+        # Sıkıştırılamayan metin, akışın birden çok parçaya bölünmesini sağlar
+        words = ' '.join(f'{n:x}' for n in np.random.default_rng(0).integers(0, 2 ** 32, 5000))
+        second = AudioUpload.objects.create(user=self.user, title='İkinci', transcription=words,
+                                            duration=600.0, status='completed')
+        with mock.patch.object(exports, 'ZIP_CHUNK_SIZE', 1024):
+            parts = list(exports.iter_zip(iter([self.audio_upload, second]), 'srt'))
+        self.assertGreater(len(parts), 1)
+        with zipfile.ZipFile(io.BytesIO(b''.join(parts))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), [
+                f'{self.audio_upload.pk}-haftalık-toplantı.srt', f'{second.pk}-ikinci.srt',
+            ])
+            self.assertEqual(archive.read(archive.namelist()[0]).decode(), self.export('srt'))
+
+    def test_bulk_download_contains_only_own_completed_uploads(self):
+        AudioUpload.objects.create(user=self.user, title='bekleyen', status='pending')
+        AudioUpload.objects.create(user=User.objects.create(username='export-other'), title='başkası',
+                                   transcription='gizli', status='completed')
+        self.client.force_login(self.user)
+        response = self.client.get('/transcriptions/export/?format=vtt', HTTP_HOST='localhost')
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), [f'{self.audio_upload.pk}-haftalık-toplantı.vtt'])
+
+
+class LoadTestBaselineTests(TestCase):
+    """Yük testinin referansa göre gerileme ve hata oranı kapısı"""
+
+    baseline = {
+        'rps': 100.0,
+        'endpoints': {
+            'detail': {'p50': 40.0, 'p95': 100.0, 'p99': 200.0},
+            'status': {'p50': 2.0, 'p95': 3.0, 'p99': 4.0},
+        },
+    }
+
+    def summary(self, rps=100.0, error_rate=0.0, **endpoints):
+        result = {
+            'rps': rps, 'requests': 1000, 'error_rate': error_rate, 'duration': 10.0, 'errors': {},
+            'endpoints': {name: dict(stats) for name, stats in self.baseline['endpoints'].items()},
+        }
+        for name, stats in endpoints.items():
+            if stats is None:
+                del result['endpoints'][name]
+            else:
+                result['endpoints'][name].update(stats)
+        for stats in result['endpoints'].values():
+            stats.update(requests=500, failures=0, rps=rps / 2)
+        return result
+
+    def test_within_limits_passes(self):
+        summary = self.summary(rps=80.0, detail={'p95': 124.0})
+        self.assertEqual(compare_with_baseline(summary, self.baseline, max_regression=0.25), [])
+
+    def test_slower_percentile_and_lower_throughput_fail(self):
+        summary = self.summary(rps=70.0, detail={'p95': 130.0})
+        regressions = compare_with_baseline(summary, self.baseline, max_regression=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('detail p95: 130.0 ms > 100.0 ms'))
+        self.assertTrue(regressions[1].startswith('toplam istek/s: 70.0 < 100.0'))
+        # Daha geniş bir sınırla aynı çalıştırma geçer
+        self.assertEqual(compare_with_baseline(summary, self.baseline, max_regression=0.5), [])
+
+    def test_small_absolute_changes_are_ignored(self):
+        # 3 ms -> 7.9 ms iki katından fazla ama fark 5 ms tabanının altında
+        summary = self.summary(status={'p95': 7.9, 'p99': 8.9})
+        self.assertEqual(compare_with_baseline(summary, self.baseline), [])
+        summary = self.summary(status={'p99': 9.0})
+        self.assertEqual(compare_with_baseline(summary, self.baseline), ['status p99: 9.0 ms > 4.0 ms (+%25 sınırı)'])
+
+    def test_missing_endpoint_fails(self):
+        self.assertEqual(compare_with_baseline(self.summary(status=None), self.baseline),
+                         ['status: bu çalıştırmada hiç istek yok'])
+
+    def run_command(self, summary, **options):
+        baseline_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, baseline_dir)
+        path = os.path.join(baseline_dir, 'baseline.json')
+        with open(path, 'w') as f:
+            json.dump(self.baseline, f)
+        output = io.StringIO()
+        with mock.patch('speech_app.management.commands.load_test.run_load_test', return_value=summary), \
+                mock.patch('speech_app.management.commands.load_test.signal.signal'):
+            call_command('load_test', url='http://127.0.0.1:1', users=1, baseline=path, stdout=output, **options)
+        return output.getvalue()
+
+    def test_command_enforces_error_rate_and_baseline(self):
+        self.assertIn('Referansa göre gerileme yok', self.run_command(self.summary()))
+        with self.assertRaisesMessage(CommandError, 'Hata oranı %2.0 (sınır %1.0)'):
+            self.run_command(self.summary(error_rate=0.02))
+        self.assertIn('gerileme yok', self.run_command(self.summary(error_rate=0.02), max_error_rate=0.05))
+        with self.assertRaisesMessage(CommandError, 'detail p99: 300.0 ms > 200.0 ms'):
+            self.run_command(self.summary(detail={'p99': 300.0}))
+        self.assertIn('gerileme yok', self.run_command(self.summary(detail={'p99': 300.0}), max_regression=0.6))
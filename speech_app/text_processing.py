@@ -0,0 +1,389 @@
+"""
+Transkripsiyon metni için yardımcılar
+
+Bu modül ses işleme kütüphanelerine bağımlı değildir; web tarafı da
+numpy/librosa yüklemeden içe aktarabilir.
+"""
+import math
+import re
+import string
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+
+# Parça başına örtüşme süresi (saniye) - process_audio_transcription ile aynı
+CHUNK_OVERLAP_SECONDS = 5.0
+# Konuşma hızı bilinmiyorsa kullanılan üst sınır (kelime/saniye)
+MAX_WORDS_PER_SECOND = 4.0
+# Ölçülen konuşma hızına eklenen pay
+WORD_RATE_MARGIN = 1.5
+# Örtüşme sayılması için gereken en az ardışık ortak kelime
+MIN_OVERLAP_MATCH = 2
+# Dışa aktarılan bölümlerin (SRT/VTT altyazı satırları) üst sınırları
+SEGMENT_MAX_SECONDS = 7.0
+SEGMENT_MAX_CHARACTERS = 84
+
+SENTENCE_ENDINGS = ('.', '!', '?')
+SENTENCE_ENDING_RE = re.compile(r'[.!?]')
+
+# Normalizasyon adımlarında kullanılan, modül yüklenirken bir kez derlenen ifadeler
+# Boşluk adımından sonra çalıştığı için yalnızca düz boşluk aranır
+SPACE_BEFORE_PUNCTUATION_RE = re.compile(r' +(?=[.,!?;:])')
+REPEATED_PUNCTUATION_RE = re.compile(r'([,!?;:])\1+')
+LARGE_NUMBER_RE = re.compile(r'(?<![\d.,])[1-9]\d{4,8}(?![\d.,]*\d)')
+
+# Tipografik karakterleri sadeleştiren tablo
+PUNCTUATION_TABLE = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u02bc': "'",
+    '\u201c': '"', '\u201d': '"',
+    '\u00a0': ' ', '\u2009': ' ', '\u202f': ' ',
+    '\u2013': '-', '\u2014': '-',
+})
+# Çoğu metinde bu karakterler yoktur; translate yalnızca gerektiğinde çalışır
+PUNCTUATION_TABLE_RE = re.compile('[' + ''.join(chr(code) for code in PUNCTUATION_TABLE) + ']')
+# Türkçe büyük harf kuralı: i -> İ, ı -> I
+TURKISH_UPPER_TABLE = str.maketrans({'i': 'İ', 'ı': 'I'})
+# Dillere göre binlik ayırıcı
+THOUSANDS_SEPARATORS = {'tr': '.', 'en': ','}
+
+
+def _normalize_token(token):
+    """
+    Karşılaştırma için kelimeyi küçük harfe çevirip noktalamadan arındırır.
+    Türkçe İ/ı farkı ve aksanlar (ayrışık yazılmışlar dahil) yok sayılır.
+    """
+    token = token.strip(string.punctuation).lower()
+    if token.isascii():
+        return token
+    token = unicodedata.normalize('NFD', token).replace('ı', 'i')
+    return ''.join(char for char in token if not unicodedata.combining(char))
+
+
+def _overlap_window(curr_tokens, overlap_seconds, prev_duration=None, curr_duration=None, prev_count=0):
+    """Örtüşme bölgesinde beklenen en fazla kelime sayısı"""
+    words_per_second = MAX_WORDS_PER_SECOND
+    rates = [
+        count / duration
+        for count, duration in ((prev_count, prev_duration), (len(curr_tokens), curr_duration))
+        if duration
+    ]
+    if rates:
+        words_per_second = max(rates) * WORD_RATE_MARGIN
+    return math.ceil(overlap_seconds * words_per_second) + MIN_OVERLAP_MATCH
+
+
+def find_overlap(prev_tokens, curr_tokens, window, min_match=MIN_OVERLAP_MATCH):
+    """
+    ``prev_tokens``'ın son ve ``curr_tokens``'ın ilk ``window`` kelimesi
+    arasındaki en uzun ardışık ortak diziyi bulur.
+
+    Döndürür: (prev_end, curr_end) - eşleşmenin her iki listedeki bitiş
+    indeksi (hariç) ya da örtüşme yoksa None. Pencere sabit olduğundan
+    maliyet toplam kelime sayısından bağımsızdır.
+    """
+    offset = max(len(prev_tokens) - window, 0)
+    tail = [_normalize_token(token) for token in prev_tokens[offset:]]
+    head = [_normalize_token(token) for token in curr_tokens[:window]]
+
+    best_length, best_prev_end, best_curr_end = 0, 0, 0
+    previous_row = [0] * (len(head) + 1)
+    for i, prev_word in enumerate(tail, start=1):
+        row = [0] * (len(head) + 1)
+        for j, curr_word in enumerate(head, start=1):
+            if prev_word and prev_word == curr_word:
+                row[j] = previous_row[j - 1] + 1
+                # Eşit uzunlukta sonraki eşleşme tercih edilir (önceki parçanın sonuna daha yakın)
+                if row[j] >= best_length:
+                    best_length, best_prev_end, best_curr_end = row[j], i, j
+        previous_row = row
+
+    if best_length < min_match:
+        return None
+    return offset + best_prev_end, best_curr_end
+
+
+def _join_tokens(text_segments, overlap_seconds, chunk_durations):
+    """
+    Parça metinlerini birleştirir.
+
+    Döndürür: (kelimeler, kökenler) - her kelime için (parça indeksi,
+    parçadaki kelime indeksi)
+    """
+    tokens = []
+    origins = []
+    previous_count = 0
+    previous_duration = None
+    adjacent = False
+
+    for i, segment in enumerate(text_segments):
+        duration = chunk_durations[i] if chunk_durations else None
+        segment_tokens = segment.split() if segment else []
+        if not segment_tokens:
+            adjacent = False
+            continue
+
+        overlap = None
+        if adjacent and tokens:
+            window = _overlap_window(segment_tokens, overlap_seconds, previous_duration, duration, previous_count)
+            overlap = find_overlap(tokens, segment_tokens, window)
+
+        if overlap:
+            # Örtüşme bulundu: önceki metni eşleşmenin sonunda kes, yeni parçaya oradan devam et
+            prev_end, curr_end = overlap
+            del tokens[prev_end:]
+            del origins[prev_end:]
+        else:
+            curr_end = 0
+            # Cümle sonu kontrolü
+            if tokens and not tokens[-1].endswith(SENTENCE_ENDINGS) and segment_tokens[0][0].isupper():
+                tokens[-1] += '.'
+        tokens.extend(segment_tokens[curr_end:])
+        origins.extend((i, j) for j in range(curr_end, len(segment_tokens)))
+
+        previous_count = len(segment_tokens)
+        previous_duration = duration
+        adjacent = True
+
+    return tokens, origins
+
+
+def intelligent_text_joining(text_segments, overlap_seconds=CHUNK_OVERLAP_SECONDS, chunk_durations=None):
+    """
+    Örtüşen parçaların metinlerini kelime düzeyinde hizalayarak birleştirir.
+
+    ``text_segments`` ses parçalarıyla aynı sıradadır; tanınamayan parçalar
+    için None verilebilir (bu durumda komşular arasında örtüşme aranmaz).
+    ``chunk_durations`` verilirse örtüşme penceresi parçaların ölçülen
+    konuşma hızından hesaplanır.
+    """
+    tokens, _ = _join_tokens(text_segments, overlap_seconds, chunk_durations)
+    return ' '.join(tokens)
+
+
+def timed_text_joining(text_segments, chunk_starts, chunk_durations, overlap_seconds=CHUNK_OVERLAP_SECONDS):
+    """
+    ``intelligent_text_joining`` ile aynı birleştirmeyi yapar ve her kelimeye
+    yaklaşık zaman aralığı verir. Tanıyıcılar kelime zamanı döndürmediği için
+    kelimeler parçanın süresine eşit aralıklarla yayılır.
+
+    Döndürür: [(kelime, başlangıç, bitiş), ...] (saniye)
+    """
+    tokens, origins = _join_tokens(text_segments, overlap_seconds, chunk_durations)
+    counts = [len(segment.split()) if segment else 0 for segment in text_segments]
+
+    words = []
+    for token, (i, j) in zip(tokens, origins):
+        step = chunk_durations[i] / counts[i]
+        start = chunk_starts[i] + j * step
+        words.append((token, round(start, 3), round(start + step, 3)))
+    return words
+
+
+def build_segments(timed_words, max_seconds=SEGMENT_MAX_SECONDS, max_characters=SEGMENT_MAX_CHARACTERS,
+                   speakers=None):
+    """
+    Zamanlı kelimeleri altyazı/dışa aktarma bölümlerine ayırır. Bölüm cümle
+    sonunda, süre/uzunluk sınırı aşılınca ya da konuşmacı değişince kapanır.
+    ``speakers`` verilirse (kelime başına konuşmacı) bölümlere 'speaker' eklenir.
+
+    Döndürür: [{'start': ..., 'end': ..., 'text': ...[, 'speaker': ...]}, ...]
+    """
+    segments = []
+    current = []
+    length = 0
+    speaker = None
+
+    for index, (word, start, end) in enumerate(timed_words):
+        word_speaker = speakers[index] if speakers else None
+        if current and (end - current[0][1] > max_seconds or length + 1 + len(word) > max_characters
+                        or word_speaker != speaker):
+            segments.append(_make_segment(current, speaker))
+            current, length = [], 0
+        current.append((word, start, end))
+        speaker = word_speaker
+        length += len(word) + (1 if length else 0)
+        if word.endswith(SENTENCE_ENDINGS):
+            segments.append(_make_segment(current, speaker))
+            current, length = [], 0
+
+    if current:
+        segments.append(_make_segment(current, speaker))
+    return segments
+
+
+def _make_segment(words, speaker=None):
+    segment = {
+        'start': words[0][1],
+        'end': words[-1][2],
+        'text': ' '.join(word for word, _, _ in words),
+    }
+    if speaker is not None:
+        segment['speaker'] = speaker
+    return segment
+
+
+def text_statistics(text):
+    """
+    Kalite skoru için gereken metin istatistiklerini tek geçişte toplar
+    """
+    if not text:
+        return {'characters': 0, 'words': 0, 'unique_words': 0, 'sentences': 0}
+
+    words = text.split()
+    return {
+        'characters': len(text),
+        'words': len(words),
+        'unique_words': len(set(words)),
+        'sentences': len(SENTENCE_ENDING_RE.findall(text)),
+    }
+
+
+def calculate_quality_score(stats, success_rate, duration):
+    """
+    Transkripsiyon kalite skorunu ``text_statistics`` çıktısından hesaplar
+    """
+    if not stats['characters']:
+        return 0.0
+
+    # Temel skor başarı oranından
+    base_score = success_rate
+
+    # Metin uzunluğu bonusu (daha uzun metin genellikle daha iyi)
+    text_length_bonus = min(stats['characters'] / 1000 * 10, 20)  # Max 20 puan
+
+    # Kelime sayısı ve çeşitliliği
+    word_count = stats['words']
+    if word_count > 0:
+        word_diversity = (stats['unique_words'] / word_count) * 100
+        diversity_bonus = min(word_diversity / 10, 15)  # Max 15 puan
+    else:
+        diversity_bonus = 0
+
+    # Cümle yapısı kontrolü
+    sentence_count = stats['sentences']
+    if sentence_count > 0:
+        avg_sentence_length = word_count / sentence_count
+        # İdeal cümle uzunluğu 10-20 kelime
+        if 10 <= avg_sentence_length <= 20:
+            sentence_bonus = 10
+        elif 5 <= avg_sentence_length <= 30:
+            sentence_bonus = 5
+        else:
+            sentence_bonus = 0
+    else:
+        sentence_bonus = 0
+
+    # Süre bazında kalite (dakika başına kelime sayısı)
+    if duration > 0:
+        words_per_minute = (word_count / duration) * 60
+        # Normal konuşma hızı 150-160 kelime/dakika
+        if 120 <= words_per_minute <= 200:
+            pace_bonus = 10
+        elif 80 <= words_per_minute <= 250:
+            pace_bonus = 5
+        else:
+            pace_bonus = 0
+    else:
+        pace_bonus = 0
+
+    # Toplam skoru hesapla (max 100)
+    total_score = min(
+        base_score + text_length_bonus + diversity_bonus + sentence_bonus + pace_bonus,
+        100.0
+    )
+
+    return round(total_score, 1)
+
+
+def _normalize_punctuation_characters(text, language):
+    if PUNCTUATION_TABLE_RE.search(text):
+        return text.translate(PUNCTUATION_TABLE)
+    return text
+
+
+def _normalize_unicode(text, language):
+    # Ayrışık yazılmış harfleri (ör. g + U+0306) tek karaktere birleştirir
+    if unicodedata.is_normalized('NFC', text):
+        return text
+    return unicodedata.normalize('NFC', text)
+
+
+def _normalize_turkish_dotted_i(text, language):
+    # 'İ'.lower() sonucu oluşan i + birleşik nokta (U+0307) Türkçede 'i' olmalı
+    return text.replace('i\u0307', 'i')
+
+
+def _normalize_whitespace(text, language):
+    # Çoklu boşlukları tek boşluğa çevirir ve baştaki/sondaki boşlukları atar
+    return ' '.join(text.split())
+
+
+def _normalize_punctuation_spacing(text, language):
+    text = SPACE_BEFORE_PUNCTUATION_RE.sub('', text)
+    return REPEATED_PUNCTUATION_RE.sub(r'\1', text)
+
+
+def _format_numbers(text, language):
+    separator = THOUSANDS_SEPARATORS.get(language)
+    if not separator:
+        return text
+    return LARGE_NUMBER_RE.sub(lambda match: f'{int(match.group()):,}'.replace(',', separator), text)
+
+
+def _capitalize_first(text, language):
+    if not text:
+        return text
+    first = text[0]
+    if language == 'tr':
+        first = first.translate(TURKISH_UPPER_TABLE)
+    return first.upper() + text[1:]
+
+
+NORMALIZATION_STEPS = {
+    'punctuation_characters': _normalize_punctuation_characters,
+    'unicode': _normalize_unicode,
+    'turkish_dotted_i': _normalize_turkish_dotted_i,
+    'whitespace': _normalize_whitespace,
+    'punctuation_spacing': _normalize_punctuation_spacing,
+    'numbers': _format_numbers,
+    'capitalize': _capitalize_first,
+}
+
+# Dil başına uygulanacak adımlar; settings.TEXT_NORMALIZATION ile değiştirilebilir.
+# 'numbers' (binlik ayırıcı) tanıyıcının metnini değiştirdiğinden (posta kodu, telefon,
+# numara) varsayılan olarak uygulanmaz, yalnızca ayarla açılır.
+DEFAULT_NORMALIZATION = {
+    'tr': ['punctuation_characters', 'unicode', 'turkish_dotted_i', 'whitespace',
+           'punctuation_spacing', 'capitalize'],
+    'default': ['punctuation_characters', 'unicode', 'whitespace',
+                'punctuation_spacing', 'capitalize'],
+}
+
+
+@lru_cache(maxsize=None)
+def get_text_normalizer(language_code):
+    """
+    Dil koduna (ör. 'tr-TR') ait normalizasyon fonksiyonunu döndürür.
+    Adım listesi dil başına bir kez çözülür ve önbelleğe alınır.
+    """
+    language = (language_code or '').split('-')[0].lower()
+    pipeline = getattr(settings, 'TEXT_NORMALIZATION', None) or DEFAULT_NORMALIZATION
+    step_names = pipeline.get(language, pipeline.get('default', []))
+    steps = tuple(NORMALIZATION_STEPS[name] for name in step_names)
+
+    def normalize(text):
+        for step in steps:
+            text = step(text, language)
+        return text
+
+    return normalize
+
+
+def clean_and_improve_text(text, language_code='tr-TR'):
+    """
+    Transkripsiyon metnini temizler ve iyileştirir
+    """
+    if not text:
+        return ""
+    return get_text_normalizer(language_code)(text)
@@ -0,0 +1,92 @@
+"""
+Yüklenen dosyaların içerik özeti ve tekrar eden yüklemelerin birleştirilmesi
+
+Özet, dosya alınırken upload handler'da hesaplanır (dosya ikinci kez
+okunmaz). Aynı kullanıcının aynı dosyası mevcut kayda yönlendirilir;
+başka bir kullanıcının daha önce yüklediği dosya yeniden saklanmaz, yeni
+kayıt mevcut ses dosyasını gösterir ve bitmiş transkripsiyon kopyalanır.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .models import AudioUpload
+
+# Bitmiş bir kayıttan kopyalanan sonuç alanları
+DUPLICATE_RESULT_FIELDS = [
+    'language', 'transcription', 'duration', 'detected_language', 'language_confidence', 'waveform_peaks',
+    'segments', 'speaker_count', 'success_rate', 'quality_score', 'quality_level', 'word_count',
+    'total_chunks', 'successful_chunks', 'processing_method',
+]
+# Worker'ın dili algılamasını isteyen seçim (pipeline/language.py ile aynı)
+AUTO_LANGUAGE = 'auto'
+# Paylaşılan ses dosyasının depolama alanları
+SHARED_STORAGE_FIELDS = ['file_size', 'stored_size', 'storage_tier', 'audio_compressed']
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Dosya parçalarını değiştirmeden sonraki handler'a aktarırken SHA-256
+    özetini hesaplar; sonuç ``request.upload_hashes[alan adı]`` olarak okunur.
+    FILE_UPLOAD_HANDLERS listesinde ilk sırada olmalıdır.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_hashes'):
+            self.request.upload_hashes = {}
+        self.request.upload_hashes[self.field_name] = self.digest.hexdigest()
+        # Dosya nesnesini sonraki handler (bellek/geçici dosya) oluşturur
+        return None
+
+
+def find_shared_source(content_hash, exclude_user, language=AUTO_LANGUAGE):
+    """
+    Aynı içeriğin başka bir kullanıcıya ait, ses dosyası hâlâ saklanan kaydı.
+    Sonucu kopyalanabilecek (``language`` için tamamlanmış) kayıtlar ve en
+    yenisi tercih edilir.
+    """
+    if not content_hash or not getattr(settings, 'UPLOAD_DEDUP_ACROSS_USERS', True):
+        return None
+    candidates = (
+        AudioUpload.objects.filter(content_hash=content_hash)
+        .exclude(user=exclude_user)
+        .exclude(audio_file='')
+        .defer('waveform_peaks', 'segments', 'transcription')
+    )
+    completed = candidates.filter(status='completed')
+    if language != AUTO_LANGUAGE:
+        completed = completed.filter(language=language)
+    return completed.order_by('-created_at').first() or candidates.order_by('-created_at').first()
+
+
+def build_linked_upload(source, user, title, language):
+    """
+    Mevcut ses dosyasını gösteren yeni kayıt (kaydedilmemiş). Kaynak aynı dil
+    için tamamlanmışsa sonuçlar kopyalanır ve kayıt işlenmeden tamamlanır;
+    aksi halde kayıt paylaşılan dosya ile kuyruğa girer. 'auto' seçildiyse
+    kaynağın (algılanmış) dili alınır.
+    """
+    audio_upload = AudioUpload(
+        user=user,
+        title=title,
+        audio_file=source.audio_file.name,
+        language=language,
+        content_hash=source.content_hash,
+        status='pending',
+        **{field: getattr(source, field) for field in SHARED_STORAGE_FIELDS},
+    )
+    if source.status == 'completed' and language in (source.language, AUTO_LANGUAGE):
+        source = AudioUpload.objects.only(*DUPLICATE_RESULT_FIELDS).get(pk=source.pk)
+        for field in DUPLICATE_RESULT_FIELDS:
+            setattr(audio_upload, field, getattr(source, field))
+        audio_upload.status = 'completed'
+    return audio_upload
@@ -8,6 +8,13 @@ urlpatterns = [
     path('logout/', views.user_logout, name='logout'),
     path('upload/', views.upload_audio, name='upload_audio'),
     path('transcription/<int:pk>/', views.transcription_detail, name='transcription_detail'),
+    path('transcription/<int:pk>/status/', views.transcription_status, name='transcription_status'),
+    path('transcription/<int:pk>/audio/', views.transcription_audio, name='transcription_audio'),
+    path('transcription/<int:pk>/waveform/', views.transcription_waveform, name='transcription_waveform'),
+    path('transcription/<int:pk>/export/<str:export_format>/', views.transcription_export, name='transcription_export'),
     path('transcriptions/', views.transcription_list, name='transcription_list'),
+    path('transcriptions/export/', views.transcription_export_all, name='transcription_export_all'),
     path('api/live-transcription/', views.live_transcription, name='live_transcription'),
+    path('health/', views.health, name='health'),
+    path('metrics/db/', views.database_metrics, name='database_metrics'),
 ]
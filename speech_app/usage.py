@@ -0,0 +1,134 @@
+"""
+Kullanıcı başına günlük kullanım toplamları ve kotalar
+
+Toplamlar olay anında artırılır (yükleme, iş bitişi); kota denetimi geçmiş
+kayıtları taramaz, yalnızca kullanıcının bugünkü DailyUsage satırını okur.
+Sesin süresi worker dosyayı çözene kadar bilinmediğinden yüklemede tahmini
+süre ayrılır (reserved_audio_seconds) ve iş bitince gerçek süreyle değiştirilir.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import AudioUpload, DailyUsage
+
+# Süresi henüz bilinmeyen (çözülmemiş) dosyalar için bayt/saniye varsayımı
+# (16 kHz 16-bit mono WAV); mümkünse son işlerden öğrenilir
+DEFAULT_BYTES_PER_SECOND = 32000
+BYTES_PER_SECOND_WINDOW_DAYS = 30
+
+# Öğrenilen bayt/saniye değeri her yüklemede yeniden hesaplanmaz
+BYTES_PER_SECOND_CACHE_KEY = 'usage:bytes_per_second'
+BYTES_PER_SECOND_CACHE_TIMEOUT = 600
+
+
+def _usage_row(user_id, date=None):
+    usage, _ = DailyUsage.objects.get_or_create(user_id=user_id, date=date or timezone.localdate())
+    return usage
+
+
+def increment_usage(user_id, date=None, **deltas):
+    """Günün satırındaki sayaçları atomik olarak artırır (F ifadeleriyle, yarış olmadan)"""
+    usage = _usage_row(user_id, date)
+    updates = {field: F(field) + value for field, value in deltas.items() if value}
+    if updates:
+        DailyUsage.objects.filter(pk=usage.pk).update(**updates)
+
+
+def get_quota_limits():
+    return {
+        'uploads': getattr(settings, 'USAGE_DAILY_UPLOAD_LIMIT', 0),
+        'audio_seconds': getattr(settings, 'USAGE_DAILY_AUDIO_SECONDS_LIMIT', 0),
+    }
+
+
+def estimate_bytes_per_second():
+    """Son tamamlanan işlerden orijinal dosyaların ortalama bayt/saniye değeri"""
+    totals = AudioUpload.objects.filter(
+        status='completed', duration__gt=0, file_size__gt=0,
+        created_at__gte=timezone.now() - timedelta(days=BYTES_PER_SECOND_WINDOW_DAYS),
+    ).aggregate(size=Sum('file_size'), duration=Sum('duration'))
+    if totals['size'] and totals['duration']:
+        return totals['size'] / totals['duration']
+    return DEFAULT_BYTES_PER_SECOND
+
+
+def estimate_audio_seconds(file_size):
+    """Dosya boyutundan, son işlerden öğrenilen bayt/saniye ile tahmini ses süresi"""
+    bytes_per_second = cache.get_or_set(
+        BYTES_PER_SECOND_CACHE_KEY, estimate_bytes_per_second, BYTES_PER_SECOND_CACHE_TIMEOUT
+    )
+    return (file_size or 0) / bytes_per_second
+
+
+def reserve_upload(user, audio_seconds=0.0, date=None):
+    """
+    Kota izin veriyorsa günün yükleme sayacını artırır ve ``audio_seconds``
+    kadar tahmini süre ayırır. İşlenmiş ve ayrılmış süre ile bu dosyanın
+    tahmini süresi toplamı sınırı aşamaz.
+
+    Denetim ve artırma tek bir koşullu UPDATE'tir; eşzamanlı yüklemeler
+    kotayı aşamaz. Döndürür: kota aşıldıysa kullanıcıya gösterilecek mesaj, yoksa None
+    """
+    usage = _usage_row(user.pk, date)
+    limits = get_quota_limits()
+    condition = Q(pk=usage.pk)
+    if not user.is_staff:
+        if limits['uploads']:
+            condition &= Q(uploads__lt=limits['uploads'])
+        if limits['audio_seconds']:
+            condition &= Q(audio_seconds__lte=limits['audio_seconds'] - audio_seconds - F('reserved_audio_seconds'))
+    if DailyUsage.objects.filter(condition).update(
+        uploads=F('uploads') + 1, reserved_audio_seconds=F('reserved_audio_seconds') + audio_seconds
+    ):
+        return None
+
+    usage.refresh_from_db()
+    if limits['uploads'] and usage.uploads >= limits['uploads']:
+        return f"Günlük yükleme kotanız ({limits['uploads']} dosya) doldu. Yarın tekrar deneyebilirsiniz."
+    return (f"Günlük işleme kotanız ({limits['audio_seconds'] // 60} dakika ses) bu dosya için yetmiyor. "
+            f"Yarın tekrar deneyebilirsiniz.")
+
+
+def release_upload(user_id, audio_seconds=0.0, date=None):
+    """Kaydı oluşturulamayan yüklemenin ayırdığı kotayı geri verir"""
+    increment_usage(user_id, date, uploads=-1, reserved_audio_seconds=-audio_seconds)
+
+
+def settle_reservation(pk):
+    """
+    Kaydın yüklemede ayırdığı tahmini süreyi ayrıldığı günün toplamından
+    düşer. Koşullu UPDATE sayesinde aynı rezervasyon iki kez düşülmez.
+    """
+    row = AudioUpload.objects.filter(pk=pk).values('user_id', 'reserved_audio_seconds', 'reserved_on').first()
+    if not row or not row['reserved_audio_seconds']:
+        return
+    if AudioUpload.objects.filter(pk=pk, reserved_audio_seconds=row['reserved_audio_seconds']).update(
+        reserved_audio_seconds=0
+    ):
+        increment_usage(row['user_id'], row['reserved_on'], reserved_audio_seconds=-row['reserved_audio_seconds'])
+
+
+def record_job(audio_upload, success, cpu_seconds=0.0, engine_calls=0):
+    """
+    Biten bir işin kaynak kullanımını işin bittiği günün toplamına ekler;
+    yüklemede ayrılan tahmini süre gerçek süreyle değiştirilir.
+    """
+    try:
+        settle_reservation(audio_upload.pk)
+        increment_usage(
+            audio_upload.user_id,
+            jobs_completed=int(success),
+            jobs_failed=int(not success),
+            audio_seconds=audio_upload.duration or 0.0,
+            chunks=audio_upload.total_chunks or 0,
+            engine_calls=engine_calls,
+            cpu_seconds=cpu_seconds,
+        )
+    except Exception as e:
+        # Muhasebe hatası işin sonucunu etkilemez
+        logging.warning(f"#{audio_upload.pk} kullanım kaydı yazılamadı: {str(e)}")
@@ -1,40 +1,52 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from django.utils.cache import patch_cache_control
+from django.utils.http import content_disposition_header
 from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-import speech_recognition as sr
+import hmac
 import os
-import time
-import numpy as np
-import librosa
-import noisereduce as nr
-from scipy.io import wavfile
-from pydub import AudioSegment
+from .database import ping, render_metrics
 from .models import AudioUpload
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
-import tempfile
+from .exports import EXPORT_FIELDS, EXPORT_FORMATS, export_response, iter_zip
+from .responses import accel_redirect_response, open_file_size, ranged_file_response
+from .storage import get_accel_redirect_uri
+from .uploads import build_linked_upload, find_shared_source
+from .usage import estimate_audio_seconds, release_upload, reserve_upload, settle_reservation
 import logging
 
 # Logging konfigürasyonu
 logging.basicConfig(level=logging.INFO)
 
+# Dalga formu yanıtlarının tarayıcıda saklanma süresi (saniye)
+WAVEFORM_MAX_AGE = 7 * 24 * 3600
+# Toplu dışa aktarmada veritabanından tek seferde çekilen kayıt sayısı
+# (bellekte aynı anda en fazla bu kadar transkript bulunur)
+EXPORT_ITERATOR_CHUNK_SIZE = 10
+
 def home(request):
     """Ana sayfa view'i"""
     if request.user.is_authenticated:
         if request.user.is_staff:
             # Admin kullanıcı tüm transcriptions'ları görebilir
-            recent_transcriptions = AudioUpload.objects.filter(status='completed')[:5]
+            recent_transcriptions = AudioUpload.objects.filter(status='completed').defer('waveform_peaks', 'segments')[:5]
         else:
             # Normal kullanıcı sadece kendi transcriptions'larını görebilir
             recent_transcriptions = AudioUpload.objects.filter(
                 user=request.user, 
                 status='completed'
-            )[:5]
+            ).defer('waveform_peaks', 'segments')[:5]
     else:
         recent_transcriptions = []
     
@@ -114,45 +126,95 @@ def upload_audio(request):
                 messages.error(request, f'Dosya boyutu çok büyük. Maksimum {max_file_size // (1024*1024)}MB olmalıdır.')
                 return redirect('upload_audio')
             
-            # AudioUpload objesi oluştur
-            audio_upload = AudioUpload.objects.create(
-                user=request.user,  # Kullanıcıyı ekle
-                title=title or audio_file.name,
-                audio_file=audio_file,
-                language=language,
-                file_size=audio_file.size,
-                status='processing'
-            )
+            # Aynı dosya bu kullanıcı tarafından daha önce yüklendiyse yeniden saklanmaz
+            content_hash = getattr(request, 'upload_hashes', {}).get('audio_file')
+            existing = None
+            if content_hash:
+                existing = (AudioUpload.objects.filter(user=request.user, content_hash=content_hash)
+                            .only('status', 'audio_file').first())
+            if existing and existing.status != 'error':
+                messages.info(request, 'Bu dosyayı daha önce yüklediniz; mevcut transkripsiyon gösteriliyor.')
+                return redirect('transcription_detail', pk=existing.pk)
+            
+            if existing:
+                # Hatayla biten aynı dosya yeniden sıraya alınır
+                audio_upload = existing
+                source = None
+                settle_reservation(existing.pk)
+                # Saklama süresi dolup silinen dosya yeni yüklenen baytlarla geri konur
+                stores_new_file = not existing.audio_file
+            else:
+                # Başka bir kullanıcının yüklediği aynı dosya paylaşılır, bitmiş sonuç kopyalanır
+                source = find_shared_source(content_hash, request.user, language)
+                stores_new_file = source is None
+                if source:
+                    audio_upload = build_linked_upload(source, request.user, title or audio_file.name, language)
+                else:
+                    # AudioUpload objesi oluştur (transkripsiyon worker'ı kuyruktan alır)
+                    audio_upload = AudioUpload(
+                        user=request.user,  # Kullanıcıyı ekle
+                        title=title or audio_file.name,
+                        audio_file=audio_file,
+                        language=language,
+                        file_size=audio_file.size,
+                        stored_size=audio_file.size,
+                        content_hash=content_hash,
+                        status='pending'
+                    )
+            
+            # Günlük kota yalnızca bugünün kullanım toplamından denetlenir; işlenecek
+            # dosyanın tahmini süresi ayrılır, iş bitince gerçek süreyle değiştirilir
+            reserved_on = timezone.localdate()
+            reserved_seconds = estimate_audio_seconds(audio_file.size) if audio_upload.status != 'completed' else 0.0
+            quota_error = reserve_upload(request.user, reserved_seconds, reserved_on)
+            if quota_error:
+                messages.error(request, quota_error)
+                return redirect('upload_audio')
+            audio_upload.reserved_audio_seconds = reserved_seconds
+            audio_upload.reserved_on = reserved_on
+            
+            try:
+                with transaction.atomic():
+                    if existing:
+                        existing.status = 'pending'
+                        existing.error_message = None
+                        existing.attempts = 0
+                        update_fields = ['status', 'error_message', 'attempts', 'reserved_audio_seconds',
+                                         'reserved_on', 'updated_at']
+                        if stores_new_file:
+                            existing.audio_file = audio_file
+                            existing.stored_size = audio_file.size
+                            existing.storage_tier = 'hot'
+                            existing.audio_compressed = False
+                            update_fields += ['audio_file', 'stored_size', 'storage_tier', 'audio_compressed']
+                        existing.save(update_fields=update_fields)
+                    else:
+                        audio_upload.save()
+            except Exception as e:
+                # Kayıt oluşturulamadı: ayrılan kota geri verilir, saklanan dosya silinir
+                release_upload(request.user.pk, reserved_seconds, reserved_on)
+                if stores_new_file and audio_upload.audio_file._committed:
+                    audio_upload.audio_file.delete(save=False)
+                if isinstance(e, IntegrityError) and not existing:
+                    # Aynı dosya eşzamanlı olarak iki kez yüklendi; ilk kayıt kullanılır
+                    existing = AudioUpload.objects.only('pk').get(user=request.user, content_hash=content_hash)
+                    return redirect('transcription_detail', pk=existing.pk)
+                raise
+            
+            if existing:
+                messages.success(request, 'Bu dosya daha önce işlenemedi; yeniden işlem sırasına alındı.')
+                return redirect('transcription_detail', pk=existing.pk)
+            
+            if audio_upload.status == 'completed':
+                messages.success(request, 'Bu dosya daha önce işlenmiş; transkripsiyon hazır.')
+                return redirect('transcription_detail', pk=audio_upload.pk)
             
             # Dosya boyutu uyarısı
             file_size_mb = audio_file.size / (1024 * 1024)
             if file_size_mb > 10:
                 messages.info(request, f'Büyük dosya ({file_size_mb:.1f}MB) yüklendi. İşlem birkaç dakika sürebilir.')
             
-            # Transkripsiyon işlemini başlat
-            transcription_result = process_audio_transcription(audio_upload)
-            
-            if transcription_result['success']:
-                audio_upload.transcription = transcription_result['text']
-                audio_upload.status = 'completed'
-                
-                # İstatistikleri kullanıcıya göster
-                if 'stats' in transcription_result:
-                    stats = transcription_result['stats']
-                    success_rate = stats.get('success_rate', 0)
-                    if success_rate >= 90:
-                        messages.success(request, f'Ses dosyası mükemmel kalitede işlendi! (Başarı oranı: %{success_rate:.1f})')
-                    elif success_rate >= 70:
-                        messages.success(request, f'Ses dosyası başarıyla işlendi! (Başarı oranı: %{success_rate:.1f})')
-                    else:
-                        messages.warning(request, f'Ses dosyası işlendi ancak kalite orta seviyede. (Başarı oranı: %{success_rate:.1f})')
-                else:
-                    messages.success(request, 'Ses dosyası başarıyla işlendi!')
-            else:
-                audio_upload.status = 'error'
-                messages.error(request, f'Transkripsiyon hatası: {transcription_result["error"]}')
-            
-            audio_upload.save()
+            messages.success(request, 'Ses dosyası yüklendi ve işlem sırasına alındı.')
             return redirect('transcription_detail', pk=audio_upload.pk)
             
         except Exception as e:
@@ -161,447 +223,173 @@ def upload_audio(request):
     
     return render(request, 'speech_app/upload.html')
 
+def _upload_updated_at(request, pk):
+    """
+    Koşullu yanıtlar için kaydın updated_at değeri. Sahiplik kontrolü burada
+    da yapılır; başkasının kaydı için 304 dönülmez.
+    """
+    cached = getattr(request, '_upload_updated_at', None)
+    if cached and cached[0] == pk:
+        return cached[1]
+    queryset = AudioUpload.objects.filter(pk=pk)
+    if not request.user.is_staff:
+        queryset = queryset.filter(user=request.user)
+    updated_at = queryset.values_list('updated_at', flat=True).first()
+    request._upload_updated_at = (pk, updated_at)
+    return updated_at
+
+def _upload_etag(request, pk, **kwargs):
+    updated_at = _upload_updated_at(request, pk)
+    return f'{pk}-{updated_at.timestamp()}' if updated_at else None
+
+def _upload_last_modified(request, pk, **kwargs):
+    return _upload_updated_at(request, pk)
+
+def _detail_etag(request, pk):
+    # Sayfa kullanıcı menüsünü ve bekleyen mesajları da içerir
+    if len(messages.get_messages(request)):
+        return None
+    etag = _upload_etag(request, pk)
+    return f'{etag}-{request.user.pk}' if etag else None
+
+def _detail_last_modified(request, pk):
+    if len(messages.get_messages(request)):
+        return None
+    return _upload_updated_at(request, pk)
+
 @login_required
+@condition(etag_func=_detail_etag, last_modified_func=_detail_last_modified)
 def transcription_detail(request, pk):
     """Kullanıcı bazlı transkripsiyon detay view'i"""
     if request.user.is_staff:
         # Admin kullanıcı tüm transcriptions'ları görebilir
-        audio_upload = get_object_or_404(AudioUpload, pk=pk)
+        audio_upload = get_object_or_404(AudioUpload.objects.defer('waveform_peaks', 'segments'), pk=pk)
     else:
         # Normal kullanıcı sadece kendi transcriptions'larını görebilir
-        audio_upload = get_object_or_404(AudioUpload, pk=pk, user=request.user)
+        audio_upload = get_object_or_404(AudioUpload.objects.defer('waveform_peaks', 'segments'), pk=pk, user=request.user)
     
-    return render(request, 'speech_app/detail.html', {
-        'audio_upload': audio_upload
+    response = render(request, 'speech_app/detail.html', {
+        'audio_upload': audio_upload,
+        'cache_timeout': settings.TRANSCRIPTION_CACHE_TIMEOUT,
+        'export_formats': EXPORT_FORMATS,
     })
+    # Tarayıcı her seferinde ETag ile doğrular; kayıt değişmediyse 304 döner
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 @login_required
-def transcription_list(request):
-    """Kullanıcıya göre transkripsiyonları listele"""
+def transcription_status(request, pk):
+    """Detay sayfasının işlem durumunu sorguladığı API endpoint"""
     if request.user.is_staff:
-        # Admin kullanıcı tüm transcriptions'ları görebilir
-        transcriptions = AudioUpload.objects.all()
+        audio_upload = get_object_or_404(AudioUpload.objects.only('status', 'updated_at'), pk=pk)
     else:
-        # Normal kullanıcı sadece kendi transcriptions'larını görebilir
-        transcriptions = AudioUpload.objects.filter(user=request.user)
+        audio_upload = get_object_or_404(AudioUpload.objects.only('status', 'updated_at'), pk=pk, user=request.user)
     
-    return render(request, 'speech_app/list.html', {
-        'transcriptions': transcriptions
+    return JsonResponse({
+        'status': audio_upload.status,
+        'status_display': audio_upload.get_status_display(),
+        'updated_at': audio_upload.updated_at.isoformat(),
     })
 
-def enhance_audio_quality(audio_path):
-    """
-    Ses kalitesini iyileştiren fonksiyon
-    """
-    try:
-        # Ses dosyasını yükle
-        y, sr_rate = librosa.load(audio_path, sr=16000)  # 16kHz standardı
-        
-        # 1. Gürültü azaltma
-        reduced_noise = nr.reduce_noise(y=y, sr=sr_rate, prop_decrease=0.8)
-        
-        # 2. Ses normalizasyonu
-        normalized_audio = librosa.util.normalize(reduced_noise)
-        
-        # 3. Sessizlik temizleme
-        trimmed_audio, _ = librosa.effects.trim(normalized_audio, top_db=20)
-        
-        # 4. Ses seviyesi dengeleme
-        # RMS tabanlı ses seviyesi ayarı
-        rms = librosa.feature.rms(y=trimmed_audio)[0]
-        mean_rms = np.mean(rms)
-        if mean_rms > 0:
-            trimmed_audio = trimmed_audio / mean_rms * 0.1
-        
-        # İyileştirilmiş ses dosyasını geçici dosyaya kaydet
-        enhanced_path = audio_path.replace('.wav', '_enhanced.wav')
-        wavfile.write(enhanced_path, sr_rate, (trimmed_audio * 32767).astype(np.int16))
-        
-        return enhanced_path, True
-        
-    except Exception as e:
-        logging.error(f"Ses iyileştirme hatası: {str(e)}")
-        return audio_path, False
-
-def transcribe_with_multiple_engines(audio_path, language_code):
-    """
-    Birden fazla speech recognition engine kullanarak transkripsiyon yapar
-    """
-    results = []
-    recognizer = sr.Recognizer()
+@login_required
+def transcription_audio(request, pk):
+    """Ses dosyasını oynatma/indirme için Range desteğiyle döndürür"""
+    fields = ('title', 'audio_file', 'stored_size')
+    if request.user.is_staff:
+        audio_upload = get_object_or_404(AudioUpload.objects.only(*fields), pk=pk)
+    else:
+        audio_upload = get_object_or_404(AudioUpload.objects.only(*fields), pk=pk, user=request.user)
     
-    # Ses kalitesini iyileştir
-    enhanced_path, enhanced = enhance_audio_quality(audio_path)
-    final_audio_path = enhanced_path if enhanced else audio_path
+    if not audio_upload.audio_file:
+        raise Http404('Ses dosyası bulunamadı')
     
-    try:
-        with sr.AudioFile(final_audio_path) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio_data = recognizer.record(source)
-        
-        # 1. Google Speech Recognition (Ana)
-        try:
-            google_result = recognizer.recognize_google(
-                audio_data, 
-                language=language_code,
-                show_all=False
-            )
-            if google_result:
-                results.append({
-                    'engine': 'Google',
-                    'text': google_result,
-                    'confidence': 0.9  # Google için varsayılan güven skoru
-                })
-                logging.info(f"Google başarılı: {len(google_result)} karakter")
-        except Exception as e:
-            logging.warning(f"Google API hatası: {str(e)}")
-        
-        # 2. Google Speech Recognition (Alternative)
-        try:
-            google_alt = recognizer.recognize_google(
-                audio_data,
-                language=language_code,
-                show_all=True
-            )
-            if google_alt and 'alternative' in google_alt:
-                for alt in google_alt['alternative'][:2]:  # İlk 2 alternatif
-                    if 'transcript' in alt and alt['transcript']:
-                        confidence = alt.get('confidence', 0.7)
-                        results.append({
-                            'engine': 'Google_Alt',
-                            'text': alt['transcript'],
-                            'confidence': confidence
-                        })
-        except Exception as e:
-            logging.warning(f"Google alternatif API hatası: {str(e)}")
-        
-        # 3. Sphinx (Offline - fallback)
-        try:
-            sphinx_result = recognizer.recognize_sphinx(audio_data)
-            if sphinx_result:
-                results.append({
-                    'engine': 'Sphinx',
-                    'text': sphinx_result,
-                    'confidence': 0.6  # Sphinx için düşük güven skoru
-                })
-                logging.info(f"Sphinx başarılı: {len(sphinx_result)} karakter")
-        except Exception as e:
-            logging.warning(f"Sphinx hatası: {str(e)}")
-        
-        # En iyi sonucu seç
-        if results:
-            # Güven skoruna ve metin uzunluğuna göre sıralama
-            best_result = max(results, key=lambda x: (x['confidence'], len(x['text'])))
-            
-            # Eğer birden fazla sonuç varsa, en uzun ve güvenilir olanı seç
-            filtered_results = [r for r in results if len(r['text']) > 10]  # Çok kısa metinleri filtrele
-            if filtered_results:
-                best_result = max(filtered_results, key=lambda x: x['confidence'])
-            
-            logging.info(f"En iyi sonuç: {best_result['engine']} (güven: {best_result['confidence']})")
-            return best_result['text'], True
-        else:
-            return None, False
-            
-    except Exception as e:
-        logging.error(f"Transkripsiyon hatası: {str(e)}")
-        return None, False
+    filename = os.path.basename(audio_upload.audio_file.name)
+    as_attachment = 'download' in request.GET
+    
+    # Üretimde baytları nginx gönderir; gunicorn worker'ı yalnızca yetkiyi kontrol eder
+    if settings.AUDIO_ACCEL_REDIRECT:
+        uri = get_accel_redirect_uri(audio_upload.audio_file.name)
+        if uri:
+            return accel_redirect_response(uri, filename, as_attachment)
     
-    finally:
-        # Geçici enhanced dosyayı temizle
-        if enhanced and os.path.exists(enhanced_path):
-            try:
-                os.unlink(enhanced_path)
-            except:
-                pass
-
-def process_audio_transcription(audio_upload):
-    """
-    Gelişmiş ses dosyası transkripsiyon fonksiyonu
-    - Ses kalitesi iyileştirme
-    - Birden fazla recognition engine
-    - Akıllı parçalama ve birleştirme
-    """
     try:
-        logging.info(f"Transkripsiyon başlatıldı: {audio_upload.title}")
-        
-        # Dosya yolunu al
-        audio_path = audio_upload.audio_file.path
-        
-        # Audio dosyasını yükle
-        audio = AudioSegment.from_file(audio_path)
-        
-        # Ses dosyasının süresini hesapla
-        duration_seconds = len(audio) / 1000.0
-        audio_upload.duration = duration_seconds
-        audio_upload.save()
-        
-        logging.info(f"Dosya süresi: {duration_seconds:.2f} saniye")
-        
-        # Ses kalitesi ön kontrolü ve düzeltme
-        if audio.frame_rate < 16000:
-            audio = audio.set_frame_rate(16000)
-            logging.info("Ses dosyası 16kHz'e çevrildi")
-        
-        if audio.channels > 1:
-            audio = audio.set_channels(1)  # Mono'ya çevir
-            logging.info("Ses dosyası mono'ya çevrildi")
-        
-        # Adaptif parçalama - ses kalitesine göre parça boyutu ayarla
-        base_chunk_length = 45 if duration_seconds > 300 else 60  # 5dk+ dosyalar için daha kısa parçalar
-        chunk_length_ms = base_chunk_length * 1000
-        
-        # Overlap ekle - parçalar arası bilgi kaybını engelle
-        overlap_ms = 5 * 1000  # 5 saniye overlap
-        
-        chunks = []
-        for i in range(0, len(audio), chunk_length_ms - overlap_ms):
-            end_pos = min(i + chunk_length_ms, len(audio))
-            chunk = audio[i:end_pos]
-            if len(chunk) > 10000:  # 10 saniyeden uzun parçaları al
-                chunks.append(chunk)
-        
-        logging.info(f"Ses dosyası {len(chunks)} parçaya bölündü (parça boyutu: {base_chunk_length}s)")
-        
-        # Her parçayı gelişmiş transkripsiyon ile işle
-        transcriptions = []
-        temp_files = []
-        successful_chunks = 0
-        
-        try:
-            for i, chunk in enumerate(chunks):
-                logging.info(f"Parça {i+1}/{len(chunks)} işleniyor...")
-                
-                # Geçici WAV dosyası oluştur
-                with tempfile.NamedTemporaryFile(suffix=f'_chunk_{i}.wav', delete=False) as temp_wav:
-                    # Ses kalitesini optimize et
-                    optimized_chunk = chunk
-                    
-                    # Ses seviyesi çok düşükse yükselt
-                    if chunk.dBFS < -30:
-                        optimized_chunk = chunk + (abs(chunk.dBFS) - 20)
-                        logging.info(f"Parça {i+1} ses seviyesi yükseltildi")
-                    
-                    # Çok yüksek ses seviyesini düşür
-                    elif chunk.dBFS > -6:
-                        optimized_chunk = chunk - (chunk.dBFS + 10)
-                        logging.info(f"Parça {i+1} ses seviyesi düşürüldü")
-                    
-                    optimized_chunk.export(temp_wav.name, format='wav')
-                    temp_wav_path = temp_wav.name
-                    temp_files.append(temp_wav_path)
-                
-                # Gelişmiş transkripsiyon uygula
-                try:
-                    text, success = transcribe_with_multiple_engines(temp_wav_path, audio_upload.language)
-                    
-                    if success and text and len(text.strip()) > 0:
-                        # Metin temizleme ve iyileştirme
-                        cleaned_text = clean_and_improve_text(text.strip())
-                        transcriptions.append(cleaned_text)
-                        successful_chunks += 1
-                        logging.info(f"Parça {i+1} başarılı: {len(cleaned_text)} karakter")
-                    else:
-                        logging.warning(f"Parça {i+1} sessiz veya tanınamadı")
-                        
-                except Exception as e:
-                    logging.error(f"Parça {i+1} transkripsiyon hatası: {str(e)}")
-                    continue
-                
-                # Çok büyük dosyalar için kısa bir mola
-                if i > 0 and i % 10 == 0:
-                    time.sleep(1)
-            
-            # Sonuçları değerlendir ve birleştir
-            if transcriptions:
-                # Akıllı metin birleştirme
-                full_text = intelligent_text_joining(transcriptions)
-                
-                success_rate = (successful_chunks / len(chunks)) * 100
-                quality_score = calculate_quality_score(full_text, success_rate, duration_seconds)
-                
-                # İstatistikleri veritabanına kaydet
-                audio_upload.success_rate = success_rate
-                audio_upload.quality_score = quality_score
-                audio_upload.total_chunks = len(chunks)
-                audio_upload.successful_chunks = successful_chunks
-                audio_upload.processing_method = "Enhanced Multi-Engine"
-                audio_upload.save()
-                
-                logging.info(f"Transkripsiyon tamamlandı. Başarı oranı: {success_rate:.1f}%, Kalite: {quality_score:.1f}")
-                logging.info(f"Toplam metin uzunluğu: {len(full_text)} karakter")
-                
-                return {
-                    'success': True,
-                    'text': full_text,
-                    'stats': {
-                        'total_chunks': len(chunks),
-                        'successful_chunks': successful_chunks,
-                        'success_rate': success_rate,
-                        'text_length': len(full_text)
-                    }
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': 'Ses dosyasında hiç metin tespit edilemedi. Lütfen dosyanın konuşma içerdiğinden ve ses kalitesinin yeterli olduğundan emin olun.'
-                }
-                
-        finally:
-            # Tüm geçici dosyaları temizle
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    try:
-                        os.unlink(temp_file)
-                    except Exception as e:
-                        logging.warning(f"Geçici dosya silinemedi {temp_file}: {str(e)}")
+        audio_file = audio_upload.audio_file.open('rb')
+        # Range yanıtı dosyanın gerçek boyutuna göre kurulur; kayıttaki boyut
+        # yalnızca boyutu sorgulamanın istek gerektirdiği depolamalarda kullanılır
+        size = open_file_size(audio_file.file)
+        if size is None:
+            size = audio_upload.stored_size or audio_upload.audio_file.size
+    except (FileNotFoundError, OSError):
+        raise Http404('Ses dosyası bulunamadı')
     
-    except Exception as e:
-        logging.error(f"Ana transkripsiyon hatası: {str(e)}")
-        return {
-            'success': False,
-            'error': f'Ses dosyası işlenirken beklenmeyen hata oluştu: {str(e)}'
-        }
+    return ranged_file_response(request, audio_file.file, size, filename, as_attachment)
 
-def clean_and_improve_text(text):
-    """
-    Transkripsiyon metnini temizler ve iyileştirir
-    """
-    if not text:
-        return ""
-    
-    # Temel temizlik
-    cleaned = text.strip()
-    
-    # Çoklu boşlukları tek boşluğa çevir
-    import re
-    cleaned = re.sub(r'\s+', ' ', cleaned)
-    
-    # Türkçe karakterleri düzelt
-    replacements = {
-        'ğ': 'ğ', 'Ğ': 'Ğ',
-        'ü': 'ü', 'Ü': 'Ü',
-        'ş': 'ş', 'Ş': 'Ş',
-        'ı': 'ı', 'İ': 'İ',
-        'ö': 'ö', 'Ö': 'Ö',
-        'ç': 'ç', 'Ç': 'Ç'
-    }
-    
-    for old, new in replacements.items():
-        cleaned = cleaned.replace(old, new)
+@login_required
+@condition(etag_func=_upload_etag)
+def transcription_waveform(request, pk):
+    """Oynatıcının dalga formu için önceden hesaplanmış tepe değerleri"""
+    if request.user.is_staff:
+        audio_upload = get_object_or_404(AudioUpload.objects.only('waveform_peaks'), pk=pk)
+    else:
+        audio_upload = get_object_or_404(AudioUpload.objects.only('waveform_peaks'), pk=pk, user=request.user)
     
-    # İlk harfi büyük yap
-    if cleaned:
-        cleaned = cleaned[0].upper() + cleaned[1:] if len(cleaned) > 1 else cleaned.upper()
+    if not audio_upload.waveform_peaks:
+        raise Http404('Dalga formu bulunamadı')
     
-    return cleaned
+    response = HttpResponse(bytes(audio_upload.waveform_peaks), content_type='application/octet-stream')
+    # URL kaydın güncellenme zamanıyla sürümlendiğinden tarayıcı yeniden sormadan kullanabilir
+    patch_cache_control(response, private=True, max_age=WAVEFORM_MAX_AGE)
+    return response
 
-def calculate_quality_score(text, success_rate, duration):
-    """
-    Transkripsiyon kalite skorunu hesaplar
-    """
-    if not text:
-        return 0.0
-    
-    # Temel skor başarı oranından
-    base_score = success_rate
-    
-    # Metin uzunluğu bonusu (daha uzun metin genellikle daha iyi)
-    text_length_bonus = min(len(text) / 1000 * 10, 20)  # Max 20 puan
-    
-    # Kelime sayısı ve çeşitliliği
-    words = text.split()
-    word_count = len(words)
-    unique_words = len(set(words))
-    
-    if word_count > 0:
-        word_diversity = (unique_words / word_count) * 100
-        diversity_bonus = min(word_diversity / 10, 15)  # Max 15 puan
-    else:
-        diversity_bonus = 0
+@login_required
+@condition(etag_func=_upload_etag, last_modified_func=_upload_last_modified)
+def transcription_export(request, pk, export_format):
+    """Transkripsiyonu TXT/SRT/JSON olarak indirir"""
+    if export_format not in EXPORT_FORMATS:
+        raise Http404('Bilinmeyen biçim')
     
-    # Cümle yapısı kontrolü
-    sentence_count = text.count('.') + text.count('!') + text.count('?')
-    if sentence_count > 0:
-        avg_sentence_length = word_count / sentence_count
-        # İdeal cümle uzunluğu 10-20 kelime
-        if 10 <= avg_sentence_length <= 20:
-            sentence_bonus = 10
-        elif 5 <= avg_sentence_length <= 30:
-            sentence_bonus = 5
-        else:
-            sentence_bonus = 0
+    queryset = AudioUpload.objects.defer('waveform_peaks').filter(status='completed')
+    if request.user.is_staff:
+        audio_upload = get_object_or_404(queryset, pk=pk)
     else:
-        sentence_bonus = 0
+        audio_upload = get_object_or_404(queryset, pk=pk, user=request.user)
     
-    # Süre bazında kalite (dakika başına kelime sayısı)
-    if duration > 0:
-        words_per_minute = (word_count / duration) * 60
-        # Normal konuşma hızı 150-160 kelime/dakika
-        if 120 <= words_per_minute <= 200:
-            pace_bonus = 10
-        elif 80 <= words_per_minute <= 250:
-            pace_bonus = 5
-        else:
-            pace_bonus = 0
-    else:
-        pace_bonus = 0
+    response = export_response(audio_upload, export_format)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def transcription_export_all(request):
+    """Kullanıcının tüm tamamlanmış transkripsiyonlarını ZIP olarak akıtır"""
+    export_format = request.GET.get('format', 'txt')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404('Bilinmeyen biçim')
     
-    # Toplam skoru hesapla (max 100)
-    total_score = min(
-        base_score + text_length_bonus + diversity_bonus + sentence_bonus + pace_bonus,
-        100.0
+    audio_uploads = (
+        AudioUpload.objects.filter(user=request.user, status='completed')
+        .only(*EXPORT_FIELDS)
+        .order_by('created_at')
+        .iterator(chunk_size=EXPORT_ITERATOR_CHUNK_SIZE)
     )
-    
-    return round(total_score, 1)
+    response = StreamingHttpResponse(iter_zip(audio_uploads, export_format), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, f'transkriptler-{export_format}.zip')
+    patch_cache_control(response, private=True, no_store=True)
+    return response
 
-def intelligent_text_joining(text_segments):
-    """
-    Metin parçalarını akıllıca birleştirir
-    """
-    if not text_segments:
-        return ""
-    
-    if len(text_segments) == 1:
-        return text_segments[0]
-    
-    result = []
-    
-    for i, segment in enumerate(text_segments):
-        if not segment:
-            continue
-            
-        if i == 0:
-            result.append(segment)
-        else:
-            # Önceki segmentle overlap kontrolü
-            prev_segment = result[-1] if result else ""
-            
-            # Son kelimeler benzer mi kontrol et
-            prev_words = prev_segment.split()[-3:] if prev_segment else []
-            curr_words = segment.split()[:3] if segment else []
-            
-            # Overlap varsa tekrarı kaldır
-            overlap_found = False
-            if prev_words and curr_words:
-                for j in range(1, min(len(prev_words), len(curr_words)) + 1):
-                    if prev_words[-j:] == curr_words[:j]:
-                        # Overlap bulundu, tekrarı kaldır
-                        segment = ' '.join(curr_words[j:])
-                        overlap_found = True
-                        break
-            
-            if segment.strip():
-                # Cümle sonu kontrolü
-                if result and not result[-1].endswith(('.', '!', '?')):
-                    if not segment[0].isupper():
-                        result.append(' ' + segment)
-                    else:
-                        result.append('. ' + segment)
-                else:
-                    result.append(' ' + segment)
+@login_required
+def transcription_list(request):
+    """Kullanıcıya göre transkripsiyonları listele"""
+    if request.user.is_staff:
+        # Admin kullanıcı tüm transcriptions'ları görebilir
+        transcriptions = AudioUpload.objects.defer('waveform_peaks', 'segments')
+    else:
+        # Normal kullanıcı sadece kendi transcriptions'larını görebilir
+        transcriptions = AudioUpload.objects.filter(user=request.user).defer('waveform_peaks', 'segments')
     
-    return ''.join(result).strip()
+    return render(request, 'speech_app/list.html', {
+        'transcriptions': transcriptions,
+        'export_formats': EXPORT_FORMATS,
+    })
 
 @csrf_exempt
 def live_transcription(request):
@@ -614,3 +402,32 @@ def live_transcription(request):
             return JsonResponse({'status': 'error', 'message': str(e)})
     
     return JsonResponse({'status': 'error', 'message': 'Sadece POST istekleri kabul edilir'})
+
+@never_cache
+def health(request):
+    """
+    Yük dengeleyici/izleme için sağlık denetimi. Kimlik doğrulaması olmadan
+    erişilebildiğinden yalnızca genel durum döner; hata ayrıntısı loglanır.
+    """
+    ok, latency_ms, error = ping()
+    if error:
+        logging.error(f"Sağlık denetimi: veritabanına erişilemedi ({error})")
+    return JsonResponse(
+        {'status': 'ok' if ok else 'error', 'database': 'ok' if ok else 'unavailable'},
+        status=200 if ok else 503,
+    )
+
+def _metrics_allowed(request):
+    """Yönetici oturumu ya da METRICS_TOKEN ile gönderilen Bearer başlığı"""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+
+@never_cache
+def database_metrics(request):
+    """Veritabanı bağlantı/havuz metrikleri (Prometheus metin biçimi)"""
+    if not _metrics_allowed(request):
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
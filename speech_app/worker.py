@@ -0,0 +1,303 @@
+"""
+Transkripsiyon worker'ı
+
+Yüklenen dosyalar 'pending' durumunda veritabanına yazılır; worker süreçleri
+bunları sırayla alıp işler. Ses işleme yığını (librosa, noisereduce, scipy,
+speech_recognition, Sphinx modelleri) süreç başında bir kez yüklenip
+ısıtılır, böylece ilk işin süresine soğuk import ve JIT maliyeti eklenmez.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import AudioUpload
+from .storage import compressed_name, replace_audio_file
+from .usage import record_job, settle_reservation
+
+# Kuyruktan tek seferde bakılan aday kayıt sayısı
+CLAIM_BATCH_SIZE = 10
+
+# Pipeline'ın yazdığı sonuç alanları; iş sonunda ve toplu yeniden işlemede yalnızca
+# bunlar kaydedilir (dosya alanları bu sırada paylaşan başka bir kayıt üzerinden değişmiş olabilir)
+REPROCESS_FIELDS = [
+    'transcription', 'status', 'error_message', 'language', 'detected_language', 'language_confidence',
+    'duration', 'waveform_peaks', 'segments', 'speaker_count', 'success_rate', 'quality_score',
+    'quality_level', 'word_count', 'total_chunks', 'successful_chunks', 'processing_method',
+]
+# Alt süreçlere gönderilen kayıtlarda yüklenen alanlar
+REPROCESS_LOAD_FIELDS = ('title', 'audio_file', 'language', 'detected_language', 'language_confidence', 'status',
+                         'processing_method', 'created_at')
+
+
+def warm_up():
+    """
+    Ses işleme yığınını yükler ve ısıtır.
+
+    Döndürür: adım adı -> süre (saniye)
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    import numpy as np
+    from .pipeline import transcription
+    from .pipeline.audio import get_target_sample_rate
+    from .pipeline.recognition import get_offline_recognizer
+    timings['import'] = time.perf_counter() - start
+
+    # Gürültü azaltma, normalizasyon, trim ve RMS yollarını bir kez çalıştırır
+    # (numba JIT derlemesi ve FFT hazırlığı kullanıcı işine denk gelmez)
+    start = time.perf_counter()
+    sample_rate = get_target_sample_rate()
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(sample_rate * 2) * 0.1).astype(np.float32)
+    transcription.prepare_audio_data(samples, sample_rate)
+    timings['dsp'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        get_offline_recognizer()
+    except Exception as e:
+        logging.warning(f"Sphinx ısıtılamadı: {str(e)}")
+    timings['sphinx'] = time.perf_counter() - start
+
+    return timings
+
+
+def claim_next_job():
+    """
+    Sıradaki 'pending' kaydı 'processing' durumuna alır ve döndürür.
+    Koşullu UPDATE sayesinde aynı kaydı iki worker alamaz.
+    """
+    candidates = (
+        AudioUpload.objects.filter(status='pending')
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:CLAIM_BATCH_SIZE]
+    )
+    for pk in candidates:
+        now = timezone.now()
+        claimed = AudioUpload.objects.filter(pk=pk, status='pending').update(
+            status='processing', heartbeat_at=now, attempts=F('attempts') + 1, updated_at=now
+        )
+        if claimed:
+            return AudioUpload.objects.get(pk=pk)
+    return None
+
+
+def recover_stale_jobs(stale_timeout=None, max_attempts=None, now=None):
+    """
+    Heartbeat'i ``stale_timeout`` saniyedir yenilenmeyen 'processing' kayıtları
+    (çöken, OOM ya da SIGKILL ile ölen worker) yeniden sıraya alır; worker'ı
+    ``max_attempts`` kez düşüren kayıt hata olarak işaretlenir. Koşullu UPDATE
+    sayesinde birden fazla worker aynı anda çağırabilir.
+
+    Döndürür: (yeniden sıraya alınan, hata olarak işaretlenen)
+    """
+    stale_timeout = stale_timeout or getattr(settings, 'TRANSCRIPTION_WORKER_STALE_TIMEOUT', 300)
+    max_attempts = max_attempts or getattr(settings, 'TRANSCRIPTION_WORKER_MAX_ATTEMPTS', 3)
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=stale_timeout)
+    # Heartbeat alanından önce alınmış kayıtlarda updated_at kullanılır
+    stale = AudioUpload.objects.filter(status='processing').filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, updated_at__lt=cutoff)
+    )
+    failed_pks = list(stale.filter(attempts__gte=max_attempts).values_list('pk', flat=True))
+    failed = AudioUpload.objects.filter(pk__in=failed_pks, status='processing').update(
+        status='error', error_message='İşlem yarıda kaldı ve deneme sınırına ulaşıldı.', updated_at=now
+    )
+    for pk in failed_pks:
+        settle_reservation(pk)
+    requeued = stale.filter(attempts__lt=max_attempts).update(status='pending', heartbeat_at=None, updated_at=now)
+    if requeued or failed:
+        logging.warning(f"Yarıda kalan işler: {requeued} yeniden sıraya alındı, {failed} hata olarak işaretlendi")
+    return requeued, failed
+
+
+class Heartbeat:
+    """İş sürdükçe kaydın heartbeat_at alanını arka planda yeniler"""
+
+    def __init__(self, pk, interval=None):
+        self.pk = pk
+        self.interval = interval or getattr(settings, 'TRANSCRIPTION_WORKER_HEARTBEAT_INTERVAL', 30.0)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f'heartbeat-{pk}', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    close_old_connections()
+                    AudioUpload.objects.filter(pk=self.pk, status='processing').update(heartbeat_at=timezone.now())
+                except Exception as e:
+                    logging.warning(f"#{self.pk} heartbeat yazılamadı: {str(e)}")
+        finally:
+            # İş parçacığının bağlantısı havuza/sunucuya geri verilir
+            connection.close()
+
+
+def run_job(audio_upload):
+    """Tek bir kaydı işler ve sonucu kayda yazar"""
+    from .pipeline.engines import request_count
+    from .pipeline.transcription import process_audio_transcription
+
+    # İş başına kaynak kullanımı; process_time ayrıştırma iş parçacığını da kapsar
+    cpu_start = time.process_time()
+    requests_start = request_count()
+    result = process_audio_transcription(audio_upload)
+    if result['success']:
+        audio_upload.transcription = result['text']
+        audio_upload.status = 'completed'
+        audio_upload.error_message = None
+    else:
+        audio_upload.status = 'error'
+        audio_upload.error_message = result['error']
+    close_old_connections()
+    audio_upload.save(update_fields=REPROCESS_FIELDS + ['updated_at'])
+    record_job(audio_upload, result['success'], cpu_seconds=time.process_time() - cpu_start,
+               engine_calls=request_count() - requests_start)
+
+    if result['success'] and getattr(settings, 'AUDIO_COMPRESS_ORIGINALS', True):
+        try:
+            compress_original(audio_upload)
+        except Exception as e:
+            # Sıkıştırma başarısızsa orijinal olduğu gibi kalır
+            logging.warning(f"#{audio_upload.pk} sıkıştırılamadı: {str(e)}")
+    return result
+
+
+def compress_original(audio_upload):
+    """
+    Orijinal dosyayı mono Ogg/Opus'a dönüştürüp yerine koyar. Sonuç
+    orijinalden küçük değilse dosyaya dokunulmaz.
+
+    Döndürür: dosya değiştirildiyse True
+    """
+    from .pipeline.audio import transcode_to_opus
+
+    # Paylaşılan dosya iş sürerken başka bir kayıt üzerinden değiştirilmiş olabilir
+    audio_upload.refresh_from_db(fields=['audio_file', 'stored_size', 'storage_tier', 'audio_compressed'])
+    if audio_upload.audio_compressed or not audio_upload.audio_file:
+        return False
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target_path = os.path.join(tmp_dir, 'audio.ogg')
+        transcode_to_opus(audio_upload.audio_file.path, target_path)
+
+        original_size = audio_upload.stored_size or audio_upload.audio_file.size
+        compressed_size = os.path.getsize(target_path)
+        audio_upload.audio_compressed = True
+        if compressed_size >= original_size:
+            audio_upload.save(update_fields=['audio_compressed', 'updated_at'])
+            return False
+
+        with open(target_path, 'rb') as compressed:
+            replaced = replace_audio_file(audio_upload, File(compressed), compressed_name(audio_upload.audio_file.name))
+        if replaced is None:
+            # Dosyayı kullanan diğer kaydın işi bitince o kayıt sıkıştırır
+            audio_upload.audio_compressed = False
+            return False
+
+    logging.info(
+        f"#{audio_upload.pk} sıkıştırıldı: {original_size / 1048576:.1f}MB -> {compressed_size / 1048576:.1f}MB"
+    )
+    return True
+
+
+def init_reprocess_process(warm=True):
+    """
+    Yeniden işleme havuzundaki süreçlerin başlangıcı. Kesme sinyali ana
+    süreçte ele alınır; alt süreçler yalnızca kendilerine verilen işi bitirir.
+    """
+    import signal
+
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if not apps.ready:
+        django.setup()
+    # fork ile devralınan bağlantılar ana süreçle paylaşılmamalı
+    connections.close_all()
+    if warm:
+        warm_up()
+
+
+def reprocess_job(audio_upload):
+    """
+    Kaydı veritabanına yazmadan yeniden işler (toplu yeniden işleme için).
+
+    Döndürür: (pk, başarılıysa REPROCESS_FIELDS değerleri yoksa None, hata mesajı)
+    """
+    from .pipeline.transcription import process_audio_transcription
+
+    try:
+        result = process_audio_transcription(audio_upload, persist=False)
+    except Exception as e:
+        return audio_upload.pk, None, str(e)
+    if not result['success']:
+        return audio_upload.pk, None, result['error']
+
+    audio_upload.transcription = result['text']
+    audio_upload.status = 'completed'
+    audio_upload.error_message = None
+    return audio_upload.pk, {field: getattr(audio_upload, field) for field in REPROCESS_FIELDS}, None
+
+
+def run_worker(poll_interval=2.0, once=False, should_stop=None):
+    """
+    Kuyruğu işler. ``once`` ise kuyruk boşalınca döner; ``should_stop``
+    True döndürdüğünde elindeki işi bitirip çıkar.
+
+    Döndürür: işlenen kayıt sayısı
+    """
+    from .pipeline.engines import request_count
+
+    processed = 0
+    stale_check_interval = getattr(settings, 'TRANSCRIPTION_WORKER_HEARTBEAT_INTERVAL', 30.0)
+    next_stale_check = 0.0
+    while not (should_stop and should_stop()):
+        close_old_connections()
+        # Başlangıçta ve ardından düzenli aralıklarla yarıda kalan işler toplanır
+        if time.monotonic() >= next_stale_check:
+            recover_stale_jobs()
+            next_stale_check = time.monotonic() + stale_check_interval
+        audio_upload = claim_next_job()
+        if audio_upload is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logging.info(f"İş alındı: #{audio_upload.pk} {audio_upload.title}")
+        cpu_start = time.process_time()
+        requests_start = request_count()
+        try:
+            with Heartbeat(audio_upload.pk):
+                run_job(audio_upload)
+        except Exception as e:
+            logging.error(f"İş #{audio_upload.pk} başarısız: {str(e)}")
+            AudioUpload.objects.filter(pk=audio_upload.pk).update(
+                status='error', error_message=str(e), updated_at=timezone.now()
+            )
+            # Yarıda kalan işin harcadığı CPU ve motor istekleri de kullanıma yazılır
+            record_job(audio_upload, False, cpu_seconds=time.process_time() - cpu_start,
+                       engine_calls=request_count() - requests_start)
+        processed += 1
+    return processed
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -83,6 +83,20 @@ WSGI_APPLICATION = 'speechtotext_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Bağlantılar süreç başına yeniden kullanılır: DB_POOL ile Django'nun psycopg 3
+# havuzu (süreç başına DB_POOL_MIN_SIZE-DB_POOL_MAX_SIZE bağlantı), aksi halde
+# DB_CONN_MAX_AGE saniyelik kalıcı bağlantı. Her iki durumda da bağlantı yeniden
+# kullanılmadan önce sağlığı denetlenir. pgbouncer transaction modunun arkasında
+# DB_PGBOUNCER=True sunucu taraflı cursor'ları kapatır.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=1, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=2, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10.0, cast=float)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=300, cast=int)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+# /metrics/db/ yalnızca yöneticilere ya da 'Authorization: Bearer <METRICS_TOKEN>' başlığıyla açılır
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Production PostgreSQL database (recommended)
 if not DEBUG:
     DATABASES = {
@@ -93,6 +107,17 @@ if not DEBUG:
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            # Havuz kalıcı bağlantılarla birlikte kullanılamaz
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': DB_POOL_MIN_SIZE,
+                    'max_size': DB_POOL_MAX_SIZE,
+                    'timeout': DB_POOL_TIMEOUT,
+                },
+            } if DB_POOL else {},
         }
     }
 else:
@@ -105,6 +130,30 @@ else:
     }
 
 
+# Cache
+# REDIS_URL tanımlıysa Redis (üretim), değilse süreç içi bellek (geliştirme)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'speechtotext',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'speechtotext',
+        }
+    }
+
+# Transkripsiyon sayfası ve dışa aktarmaların önbellekte kalma süresi (saniye).
+# Anahtarlar kaydın updated_at değerini içerir; kayıt değişince yenisi üretilir.
+TRANSCRIPTION_CACHE_TIMEOUT = config('TRANSCRIPTION_CACHE_TIMEOUT', default=24 * 3600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,6 +207,27 @@ if not DEBUG:
 else:
     MEDIA_ROOT = BASE_DIR / 'media'
 
+# Orijinal ses dosyaları için soğuk katman (eski dosyalar media/ dışına taşınır).
+# S3 uyumlu bir depolama için BACKEND olarak ör. storages.backends.s3.S3Storage verilebilir.
+AUDIO_COLD_STORAGE = {
+    'BACKEND': config('AUDIO_COLD_STORAGE_BACKEND', default='django.core.files.storage.FileSystemStorage'),
+    'OPTIONS': {
+        'location': config(
+            'AUDIO_COLD_STORAGE_ROOT',
+            default='/var/lib/speechtotext/cold_media' if not DEBUG else str(BASE_DIR / 'cold_media')
+        ),
+    },
+}
+
+# Ses dosyalarının aktarımı nginx'e bırakılır (X-Accel-Redirect). Katman -> internal
+# location eşlemesi nginx_speechtotext.conf ile aynı olmalıdır; location'ı olmayan
+# katmanlar (ör. S3) Django üzerinden Range destekli olarak akıtılır.
+AUDIO_ACCEL_REDIRECT = config('AUDIO_ACCEL_REDIRECT', default=False, cast=bool)
+AUDIO_ACCEL_REDIRECT_LOCATIONS = {
+    'hot': '/protected/media/',
+    'cold': '/protected/cold_media/',
+}
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=False, cast=bool)
@@ -170,8 +240,85 @@ if not DEBUG:
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
+# İçerik özeti dosya alınırken hesaplanır (tekrar eden yüklemeler için, bkz. speech_app/uploads.py)
+FILE_UPLOAD_HANDLERS = [
+    'speech_app.uploads.HashingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# Başka bir kullanıcının yüklediği aynı dosya yeniden saklanmaz ve işlenmez
+UPLOAD_DEDUP_ACROSS_USERS = config('UPLOAD_DEDUP_ACROSS_USERS', default=True, cast=bool)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Ses işleme ayarları
+# Dosyalar tek seferde bu hıza ve mono'ya çözülür (Google ve Sphinx 16kHz bekler)
+TRANSCRIPTION_SAMPLE_RATE = config('TRANSCRIPTION_SAMPLE_RATE', default=16000, cast=int)
+# soxr kalite ön ayarı: QQ (en hızlı), LQ, MQ, HQ, VHQ (en kaliteli)
+AUDIO_RESAMPLE_QUALITY = config('AUDIO_RESAMPLE_QUALITY', default='HQ')
+# Offline Sphinx tanıyıcısının dil modeli (speech_recognition ile yalnızca en-US gelir)
+SPHINX_LANGUAGE = config('SPHINX_LANGUAGE', default='en-US')
+# Transkripsiyon worker'ı kuyruk boşken bu kadar saniye bekler
+TRANSCRIPTION_WORKER_POLL_INTERVAL = config('TRANSCRIPTION_WORKER_POLL_INTERVAL', default=2.0, cast=float)
+# İşteki worker kaydın heartbeat_at alanını HEARTBEAT_INTERVAL saniyede bir yeniler; STALE_TIMEOUT
+# saniyedir yenilenmeyen 'processing' kayıt yeniden sıraya alınır, MAX_ATTEMPTS denemeden sonra hata olur
+TRANSCRIPTION_WORKER_HEARTBEAT_INTERVAL = config('TRANSCRIPTION_WORKER_HEARTBEAT_INTERVAL', default=30.0, cast=float)
+TRANSCRIPTION_WORKER_STALE_TIMEOUT = config('TRANSCRIPTION_WORKER_STALE_TIMEOUT', default=300, cast=int)
+TRANSCRIPTION_WORKER_MAX_ATTEMPTS = config('TRANSCRIPTION_WORKER_MAX_ATTEMPTS', default=3, cast=int)
+# transcription_supervisor worker sayısını [MIN, MAX] aralığında ölçekler (MAX 0: çekirdek sayısı).
+# Bekleyen her AUDIO_SECONDS_PER_WORKER saniyelik ses bir worker ister; CPU kullanımı
+# SCALE_MAX_CPU üzerindeyken büyütülmez, talep SCALE_DOWN_DELAY saniye düşük kalınca küçültülür.
+TRANSCRIPTION_WORKERS_MIN = config('TRANSCRIPTION_WORKERS_MIN', default=1, cast=int)
+TRANSCRIPTION_WORKERS_MAX = config('TRANSCRIPTION_WORKERS_MAX', default=0, cast=int)
+TRANSCRIPTION_AUDIO_SECONDS_PER_WORKER = config('TRANSCRIPTION_AUDIO_SECONDS_PER_WORKER', default=900, cast=int)
+TRANSCRIPTION_SCALE_MAX_CPU = config('TRANSCRIPTION_SCALE_MAX_CPU', default=0.85, cast=float)
+TRANSCRIPTION_SCALE_DOWN_DELAY = config('TRANSCRIPTION_SCALE_DOWN_DELAY', default=120, cast=int)
+TRANSCRIPTION_SUPERVISOR_INTERVAL = config('TRANSCRIPTION_SUPERVISOR_INTERVAL', default=10.0, cast=float)
+TRANSCRIPTION_SUPERVISOR_METRICS_PORT = config('TRANSCRIPTION_SUPERVISOR_METRICS_PORT', default=9105, cast=int)
+# Konuşmacı ayrıştırma tanıma ile paralel, CPU üzerinde çalışır (bkz. pipeline/diarization.py)
+DIARIZATION_ENABLED = config('DIARIZATION_ENABLED', default=True, cast=bool)
+DIARIZATION_MAX_SPEAKERS = config('DIARIZATION_MAX_SPEAKERS', default=2, cast=int)
+# Dil algılama: VAD ile seçilen kısa bir konuşma klibi aday dillerle tanınır,
+# sonuç dosya özetine göre önbelleğe alınır. Algılama isteği yalnızca 'auto'
+# seçildiğinde gönderilir; sonuç kararsızsa LANGUAGE_DETECTION_DEFAULT kullanılır.
+LANGUAGE_DETECTION_ENABLED = config('LANGUAGE_DETECTION_ENABLED', default=True, cast=bool)
+LANGUAGE_DETECTION_CANDIDATES = config('LANGUAGE_DETECTION_CANDIDATES', default='tr-TR,en-US', cast=Csv())
+LANGUAGE_DETECTION_DEFAULT = config('LANGUAGE_DETECTION_DEFAULT', default='tr-TR')
+LANGUAGE_DETECTION_SECONDS = config('LANGUAGE_DETECTION_SECONDS', default=8.0, cast=float)
+LANGUAGE_DETECTION_MIN_CONFIDENCE = config('LANGUAGE_DETECTION_MIN_CONFIDENCE', default=0.5, cast=float)
+LANGUAGE_DETECTION_CACHE_TIMEOUT = config('LANGUAGE_DETECTION_CACHE_TIMEOUT', default=30 * 24 * 3600, cast=int)
+# Harici tanıma motorları: süreçler arası token kovası (istek/saniye, patlama) ve
+# devre kesici (bkz. pipeline/engines.py). Ardışık FAILURE_THRESHOLD hata ya da bir
+# hız sınırı yanıtı devreyi COOLDOWN saniye açar; tekrar eden açılmalarda süre
+# MAX_COOLDOWN'a kadar ikiye katlanır. Yedeği olmayan parçalar en fazla
+# ENGINE_DEFER_MAX_SECONDS ertelenip yeniden denenir.
+RECOGNITION_ENGINES = {
+    'google': {
+        'rate': config('GOOGLE_RATE_LIMIT', default=5.0, cast=float),
+        'burst': config('GOOGLE_RATE_BURST', default=10, cast=int),
+        'timeout': config('GOOGLE_OPERATION_TIMEOUT', default=15.0, cast=float),
+        # Boş bırakılırsa speech_recognition'ın varsayılan adresi kullanılır
+        'endpoint': config('GOOGLE_SPEECH_ENDPOINT', default='') or None,
+    },
+}
+ENGINE_FAILURE_THRESHOLD = config('ENGINE_FAILURE_THRESHOLD', default=5, cast=int)
+ENGINE_COOLDOWN_SECONDS = config('ENGINE_COOLDOWN_SECONDS', default=30.0, cast=float)
+ENGINE_MAX_COOLDOWN_SECONDS = config('ENGINE_MAX_COOLDOWN_SECONDS', default=600.0, cast=float)
+ENGINE_MAX_WAIT_SECONDS = config('ENGINE_MAX_WAIT_SECONDS', default=5.0, cast=float)
+ENGINE_DEFER_MAX_SECONDS = config('ENGINE_DEFER_MAX_SECONDS', default=300.0, cast=float)
+# Motor durum dosyaları; aynı makinedeki tüm worker'lar aynı dizini kullanmalı
+ENGINE_STATE_DIR = config('ENGINE_STATE_DIR', default='')
+# Kullanıcı başına günlük kotalar (0: sınırsız, yöneticiler muaf). Yükleme sayısı
+# yüklemede, işlenen ses süresi iş bittiğinde günlük toplama eklenir.
+USAGE_DAILY_UPLOAD_LIMIT = config('USAGE_DAILY_UPLOAD_LIMIT', default=0, cast=int)
+USAGE_DAILY_AUDIO_SECONDS_LIMIT = config('USAGE_DAILY_AUDIO_SECONDS_LIMIT', default=0, cast=int)
+# Transkripsiyonu biten orijinaller mono Ogg/Opus'a dönüştürülür (kbit/s)
+AUDIO_COMPRESS_ORIGINALS = config('AUDIO_COMPRESS_ORIGINALS', default=True, cast=bool)
+AUDIO_COMPRESSION_BITRATE = config('AUDIO_COMPRESSION_BITRATE', default=32, cast=int)
+# Bu kadar günden eski orijinaller soğuk katmana taşınır, saklama süresi dolanlar
+# silinir (transkripsiyon korunur). 0 ilgili adımı kapatır.
+AUDIO_COLD_AFTER_DAYS = config('AUDIO_COLD_AFTER_DAYS', default=30, cast=int)
+AUDIO_RETENTION_DAYS = config('AUDIO_RETENTION_DAYS', default=365, cast=int)